@@ -0,0 +1,134 @@
+import os
+import sys
+import numpy as np
+
+# The backtester runs the live services' own rule, sizing and exit code. The
+# service directories go last on the path so their main.py never shadows ours.
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _service in ("ta-module", "strategy-engine", "risk-manager", "position-monitor", "signal-aggregator"):
+    sys.path.append(os.path.join(_ROOT, _service))
+
+from aggregator import default_align_seconds  # noqa: E402,F401
+from exits import exit_hits, position_pnl  # noqa: E402
+from rules import rsi_sentiment_long  # noqa: E402
+from sizing import size_position  # noqa: E402
+from vectorized import rsi, wilder_rsi  # noqa: E402
+
+# Bars scanned at a time when looking for a position's exit; doubled while
+# no exit is found so long holdings cost O(log n) numpy calls
+_EXIT_SCAN = 256
+
+
+def default_params():
+    """Strategy, risk and indicator parameters as the live services read them from the environment."""
+    return {
+        "rsi_period": int(os.environ.get("TA_RSI_PERIOD", 14)),
+        "rsi_method": os.environ.get("TA_RSI_METHOD", "wilder").lower(),
+        "rsi_below": float(os.environ.get("STRATEGY_RSI_BELOW", 30)),
+        "sentiment_above": float(os.environ.get("STRATEGY_SENTIMENT_ABOVE", 0.6)),
+        "capital": float(os.environ.get("CAPITAL", 10000)),
+        "risk_per_trade": float(os.environ.get("RISK_PER_TRADE", 0.01)),
+        "stop_loss_pct": float(os.environ.get("STOP_LOSS_PCT", 0.05)),
+        "take_profit_pct": float(os.environ.get("TAKE_PROFIT_PCT", 0.10))
+    }
+
+
+def compute_rsi(prices, period=14, method="wilder"):
+    """RSI matrix the way ta-module computes it for ``TA_RSI_METHOD``."""
+    return wilder_rsi(prices, period) if method == "wilder" else rsi(prices, period)
+
+
+def _find_exit(side, closes, start, stop_loss, take_profit):
+    """First bar at or after ``start`` where the position monitor would close, as (bar, status)."""
+    size = _EXIT_SCAN
+    while start < len(closes):
+        window = closes[start:start + size]
+        sl_hit, tp_hit = exit_hits(side, window, stop_loss, take_profit)
+        hits = sl_hit | tp_hit
+        if hits.any():
+            i = int(np.argmax(hits))
+            return start + i, "CLOSED_SL" if sl_hit[i] else "CLOSED_TP"
+        start += size
+        size *= 2
+    return len(closes) - 1, "OPEN"
+
+
+def simulate(prices, rsi_values, sentiment, rsi_below=30, sentiment_above=0.6, capital=10000,
+             risk_per_trade=0.01, stop_loss_pct=0.05, take_profit_pct=0.10):
+    """Replay the live LONG strategy over symbols x bars matrices of closes, RSI and sentiment.
+
+    The entry rule is evaluated for every bar at once. A position opens at the
+    close of a bar where it fires, sized by risk-manager's ``size_position``
+    from that close, and closes at the first later close where
+    position-monitor's checks hit the stop-loss or take-profit. Each symbol
+    holds at most one position; signals while it is open are ignored, and a
+    position still open at the end is closed at the last close.
+
+    Returns (trades, pnl) where ``trades`` is a dict of equal-length arrays
+    and ``pnl`` is the portfolio's mark-to-market PnL per bar.
+    """
+    signals = rsi_sentiment_long(rsi_values, sentiment, rsi_below, sentiment_above)
+    columns = {name: [] for name in ("symbol", "entry_bar", "exit_bar", "entry", "exit", "size", "pnl", "status")}
+    pnl = np.zeros(prices.shape[1])
+    for row in range(prices.shape[0]):
+        entries = np.flatnonzero(signals[row])
+        if not len(entries):
+            continue
+        closes = prices[row]
+        holding = np.zeros(len(closes))
+        i = 0
+        while i < len(entries):
+            entry_bar = int(entries[i])
+            order = size_position(closes[entry_bar], capital, risk_per_trade, stop_loss_pct, take_profit_pct)
+            exit_bar, status = _find_exit("LONG", closes, entry_bar + 1, order["stop_loss"], order["take_profit"])
+            exit_bar = max(exit_bar, entry_bar)
+            columns["symbol"].append(row)
+            columns["entry_bar"].append(entry_bar)
+            columns["exit_bar"].append(exit_bar)
+            columns["entry"].append(order["entry"])
+            columns["exit"].append(closes[exit_bar])
+            columns["size"].append(order["position_size"])
+            columns["pnl"].append(position_pnl("LONG", order["entry"], closes[exit_bar], order["position_size"]))
+            columns["status"].append(status)
+            holding[entry_bar:exit_bar] += order["position_size"]
+            i = int(np.searchsorted(entries, exit_bar, side="right"))
+        # A position held from bar t to t+1 earns size * (close[t+1] - close[t])
+        pnl[1:] += holding[:-1] * np.diff(closes)
+    trades = {name: np.asarray(values) for name, values in columns.items()}
+    return trades, pnl
+
+
+def summarize(trades, pnl, capital=10000, bar_seconds=60):
+    """PnL, drawdown and trade statistics."""
+    equity = capital + np.cumsum(pnl)
+    peak = np.maximum.accumulate(np.concatenate(([capital], equity)))[1:]
+    drawdown = peak - equity
+    worst = int(np.argmax(drawdown)) if len(drawdown) else 0
+    count = len(trades["pnl"])
+    wins = trades["pnl"][trades["pnl"] > 0]
+    losses = trades["pnl"][trades["pnl"] <= 0]
+    # Sharpe over daily mark-to-market PnL, annualized with 365 trading days
+    per_day = max(int(86400 // bar_seconds), 1)
+    daily = np.add.reduceat(pnl, np.arange(0, len(pnl), per_day)) / capital if len(pnl) else np.zeros(0)
+    sharpe = float(daily.mean() / daily.std() * np.sqrt(365)) if len(daily) > 1 and daily.std() > 0 else 0.0
+    return {
+        "total_pnl": float(equity[-1] - capital) if len(equity) else 0.0,
+        "return_pct": float((equity[-1] - capital) / capital * 100) if len(equity) else 0.0,
+        "max_drawdown": float(drawdown[worst]) if len(drawdown) else 0.0,
+        "max_drawdown_pct": float(drawdown[worst] / peak[worst] * 100) if len(drawdown) else 0.0,
+        "sharpe": sharpe,
+        "trades": count,
+        "win_rate": float(len(wins) / count) if count else 0.0,
+        "avg_pnl": float(trades["pnl"].mean()) if count else 0.0,
+        "profit_factor": float(wins.sum() / -losses.sum()) if losses.sum() < 0 else (float("inf") if len(wins) else 0.0),
+        "stop_losses": int((trades["status"] == "CLOSED_SL").sum()) if count else 0,
+        "take_profits": int((trades["status"] == "CLOSED_TP").sum()) if count else 0,
+        "open_at_end": int((trades["status"] == "OPEN").sum()) if count else 0,
+        "avg_bars_held": float((trades["exit_bar"] - trades["entry_bar"]).mean()) if count else 0.0
+    }
+
+
+def run_backtest(prices, sentiment, bar_seconds=60, rsi_period=14, rsi_method="wilder", **params):
+    """Compute RSI, simulate and summarize; ``params`` go to ``simulate``."""
+    trades, pnl = simulate(prices, compute_rsi(prices, rsi_period, rsi_method), sentiment, **params)
+    return trades, pnl, summarize(trades, pnl, params.get("capital", 10000), bar_seconds)
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+# Loaders for local history files (CSV, or Parquet when pyarrow is installed).
+# Ticks need symbol, price and timestamp columns, the shape market-data-collector
+# publishes; pre-aggregated bars in the same shape load the same way. Sentiment
+# needs asset, sentiment_score and timestamp, the shape nlp-sentiment-module
+# publishes. Timestamps may be epoch milliseconds, epoch seconds or ISO strings.
+
+
+def read_table(path):
+    if str(path).endswith(".parquet"):
+        return pd.read_parquet(path)
+    if str(path).endswith((".jsonl", ".json")):
+        return pd.read_json(path, lines=str(path).endswith(".jsonl"))
+    return pd.read_csv(path)
+
+
+def to_epoch_ms(values):
+    """Epoch milliseconds as int64 from epoch ms/s numbers or ISO strings."""
+    if pd.api.types.is_numeric_dtype(values):
+        values = values.to_numpy(dtype=float)
+        # Anything below ~1973 in milliseconds is taken to be seconds
+        return np.where(values < 1e11, values * 1000, values).astype(np.int64)
+    return pd.to_datetime(values, utc=True).to_numpy(dtype="datetime64[ms]").astype(np.int64)
+
+
+def forward_fill(matrix):
+    """Forward-fill NaNs along each row; also returns the column each value came from (-1 if none)."""
+    present = ~np.isnan(matrix)
+    source = np.where(present, np.arange(matrix.shape[1]), -1)
+    np.maximum.accumulate(source, axis=1, out=source)
+    rows = np.arange(matrix.shape[0])[:, None]
+    filled = matrix[rows, np.maximum(source, 0)]
+    filled[source < 0] = np.nan
+    return filled, source
+
+
+def _bin(frame, key, value, symbols, bar_ms, start_ms, bars):
+    """symbols x bars matrix of the last ``value`` per symbol and bar, NaN where a bar is empty."""
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    rows = frame[key].map(index)
+    keep = rows.notna().to_numpy()
+    ts = to_epoch_ms(frame[timestamp_column(frame)])[keep]
+    rows = rows.to_numpy()[keep].astype(np.int64)
+    values = frame[value].to_numpy(dtype=float)[keep]
+    cols = (ts - start_ms) // bar_ms
+    keep = (cols >= 0) & (cols < bars)
+    rows, cols, values, ts = rows[keep], cols[keep], values[keep], ts[keep]
+    # Stable sort by time so that, per cell, the last write is the last observation
+    order = np.argsort(ts, kind="stable")
+    matrix = np.full((len(symbols), bars), np.nan)
+    matrix[rows[order], cols[order]] = values[order]
+    return matrix
+
+
+def timestamp_column(frame):
+    for column in ("timestamp", "window_end", "time", "_time"):
+        if column in frame.columns:
+            return column
+    raise ValueError(f"No timestamp column in {list(frame.columns)}")
+
+
+def load_prices(path, bar_seconds=60, symbols=None):
+    """Return (symbols, bar start times in ms, prices) with one row of bar closes per symbol.
+
+    Like ta-module's ``fetch_price_matrix``, gaps are forward-filled and a
+    symbol's leading gap is back-filled with its first close.
+    """
+    frame = read_table(path)
+    frame["symbol"] = frame["symbol"].astype(str).str.upper()
+    symbols = sorted(frame["symbol"].unique()) if not symbols else [s.upper() for s in symbols]
+    bar_ms = int(bar_seconds * 1000)
+    ts = to_epoch_ms(frame[timestamp_column(frame)])
+    start_ms = int(ts.min()) - int(ts.min()) % bar_ms
+    bars = int((ts.max() - start_ms) // bar_ms) + 1
+    prices = _bin(frame, "symbol", "price", symbols, bar_ms, start_ms, bars)
+    prices, source = forward_fill(prices)
+    for i in range(len(symbols)):
+        first = np.flatnonzero(source[i] >= 0)
+        if len(first):
+            prices[i, :first[0]] = prices[i, first[0]]
+    bar_starts = start_ms + bar_ms * np.arange(bars, dtype=np.int64)
+    return symbols, bar_starts, prices
+
+
+def load_sentiment(path, symbols, bar_starts, bar_seconds=60, max_age_seconds=600):
+    """Latest sentiment score per symbol as of each bar's close, NaN once older than ``max_age_seconds``.
+
+    A score counts at a bar when its timestamp is at or before the bar's
+    close, which is when the TA signal for that bar is published.
+    """
+    frame = read_table(path)
+    frame["asset"] = frame["asset"].astype(str).str.upper()
+    bar_ms = int(bar_seconds * 1000)
+    # Binning ts - 1 ms puts a score in the first bar whose close is at or after it
+    frame[timestamp_column(frame)] = to_epoch_ms(frame[timestamp_column(frame)]) - 1
+    scores = _bin(frame, "asset", "sentiment_score", symbols, bar_ms, int(bar_starts[0]), len(bar_starts))
+    scores, source = forward_fill(scores)
+    age_bars = np.arange(len(bar_starts)) - source
+    scores[age_bars * bar_seconds > max_age_seconds] = np.nan
+    return scores
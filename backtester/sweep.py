@@ -0,0 +1,174 @@
+"""Parameter sweep over the backtester on a process pool.
+
+Usage: python sweep.py --prices ticks.csv --sentiment sentiment.jsonl \\
+           --param rsi_period=7,14,21 --param rsi_below=25,30 --param stop_loss_pct=0.02:0.08 \\
+           [--random 200] [--workers 4] [--sort sharpe [--ascending]] [--out sweep.csv]
+
+Every ``--param`` lists values (a,b,c) or, with ``--random``, a range (lo:hi)
+sampled uniformly. Without ``--random`` the full grid runs; with it, that many
+random combinations do. Parameters not given keep the live defaults.
+
+Closes and sentiment are loaded once and placed in shared memory, so workers
+map them instead of receiving a pickled copy per task. Each distinct RSI
+configuration is computed once, in parallel, into shared memory as well and
+reused by every combination that shares it.
+"""
+import argparse
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from backtest import compute_rsi, default_align_seconds, default_params, simulate, summarize
+from data import load_prices, load_sentiment
+
+INDICATOR_PARAMS = ("rsi_period", "rsi_method")
+
+# Per-worker views of the shared matrices, filled by _attach
+_shared = {}
+
+
+class SharedMatrix:
+    """A float64 numpy matrix in a named shared-memory block."""
+
+    def __init__(self, shape, name=None, data=None):
+        self.shape = tuple(shape)
+        size = max(int(np.prod(self.shape)) * 8, 1)
+        self.block = shared_memory.SharedMemory(name=name, create=name is None, size=size)
+        self.array = np.ndarray(self.shape, dtype=np.float64, buffer=self.block.buf)
+        if data is not None:
+            self.array[:] = data
+
+    @property
+    def spec(self):
+        return self.block.name, self.shape
+
+    def close(self, unlink=False):
+        self.array = None
+        self.block.close()
+        if unlink:
+            self.block.unlink()
+
+
+def _attach(spec):
+    matrix = _shared.get(spec[0])
+    if matrix is None:
+        matrix = _shared[spec[0]] = SharedMatrix(spec[1], name=spec[0])
+    return matrix.array
+
+
+def _init_worker(prices_spec, sentiment_spec):
+    _shared["prices"] = _attach(prices_spec)
+    _shared["sentiment"] = _attach(sentiment_spec)
+
+
+def _fill_rsi(rsi_spec, period, method):
+    _attach(rsi_spec)[:] = compute_rsi(_shared["prices"], period, method)
+
+
+def _run_combination(rsi_spec, bar_seconds, params):
+    began = time.perf_counter()
+    simulate_params = {k: v for k, v in params.items() if k not in INDICATOR_PARAMS}
+    trades, pnl = simulate(_shared["prices"], _attach(rsi_spec), _shared["sentiment"], **simulate_params)
+    stats = summarize(trades, pnl, params["capital"], bar_seconds)
+    stats["seconds"] = time.perf_counter() - began
+    return {**params, **stats}
+
+
+def parse_param(text, defaults):
+    """"name=a,b,c" -> (name, [values]) and "name=lo:hi" -> (name, (lo, hi)), typed like the default."""
+    name, _, values = text.partition("=")
+    name = name.strip().replace("-", "_")
+    if name not in defaults:
+        raise ValueError(f"Unknown parameter {name!r}; expected one of {sorted(defaults)}")
+    cast = type(defaults[name])
+    if ":" in values:
+        lo, hi = values.split(":")
+        return name, (cast(lo), cast(hi))
+    return name, [cast(v.strip()) for v in values.split(",") if v.strip()]
+
+
+def build_combinations(space, defaults, samples=None, seed=24):
+    """Grid over ``space`` or ``samples`` random draws from it, each merged over ``defaults``."""
+    names = list(space)
+    if samples is None:
+        for name in names:
+            if isinstance(space[name], tuple):
+                raise ValueError(f"Range for {name} needs --random")
+        return [{**defaults, **dict(zip(names, values))} for values in itertools.product(*space.values())]
+    rng = random.Random(seed)
+    combinations = []
+    for _ in range(samples):
+        combination = dict(defaults)
+        for name, choices in space.items():
+            if isinstance(choices, tuple):
+                lo, hi = choices
+                combination[name] = rng.randint(lo, hi) if isinstance(lo, int) else rng.uniform(lo, hi)
+            else:
+                combination[name] = rng.choice(choices)
+        combinations.append(combination)
+    return combinations
+
+
+def run_sweep(prices, sentiment, combinations, bar_seconds=60, workers=None):
+    """Backtest every combination on a process pool; returns one row per combination."""
+    indicator_keys = sorted({tuple(c[name] for name in INDICATOR_PARAMS) for c in combinations})
+    shared_prices = SharedMatrix(prices.shape, data=prices)
+    shared_sentiment = SharedMatrix(sentiment.shape, data=sentiment)
+    shared_rsi = {key: SharedMatrix(prices.shape) for key in indicator_keys}
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shared_prices.spec, shared_sentiment.spec)) as pool:
+            # The indicator cache: one RSI matrix per distinct configuration
+            for future in [pool.submit(_fill_rsi, shared_rsi[key].spec, *key) for key in indicator_keys]:
+                future.result()
+            futures = [pool.submit(_run_combination, shared_rsi[tuple(c[name] for name in INDICATOR_PARAMS)].spec,
+                                   bar_seconds, c) for c in combinations]
+            return [future.result() for future in futures]
+    finally:
+        for matrix in [shared_prices, shared_sentiment, *shared_rsi.values()]:
+            matrix.close(unlink=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prices", required=True)
+    parser.add_argument("--sentiment", required=True)
+    parser.add_argument("--symbols", default=os.environ.get("TA_SYMBOLS", ""))
+    parser.add_argument("--bar-seconds", type=int, default=int(os.environ.get("TA_BAR_SECONDS", 60)))
+    parser.add_argument("--sentiment-max-age", type=float, default=default_align_seconds())
+    parser.add_argument("--param", action="append", default=[], help="name=a,b,c or name=lo:hi")
+    parser.add_argument("--random", type=int, help="sample this many combinations instead of the full grid")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--sort", default="sharpe")
+    parser.add_argument("--ascending", action="store_true", help="sort smallest first, e.g. for max_drawdown_pct")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--out", help="write the full results table to this CSV")
+    args = parser.parse_args()
+
+    defaults = default_params()
+    space = dict(parse_param(p, defaults) for p in args.param)
+    combinations = build_combinations(space, defaults, args.random)
+
+    began = time.perf_counter()
+    symbols = [s.strip() for s in args.symbols.split(",") if s.strip()]
+    symbols, bar_starts, prices = load_prices(args.prices, args.bar_seconds, symbols)
+    sentiment = load_sentiment(args.sentiment, symbols, bar_starts, args.bar_seconds, args.sentiment_max_age)
+    loaded = time.perf_counter()
+    results = pd.DataFrame(run_sweep(prices, sentiment, combinations, args.bar_seconds, args.workers))
+    results = results.sort_values(args.sort, ascending=args.ascending, ignore_index=True)
+    done = time.perf_counter()
+    print(f"{len(combinations)} combinations over {len(symbols)} symbols x {prices.shape[1]} bars "
+          f"on {args.workers} workers: loaded in {loaded - began:.2f} s, swept in {done - loaded:.2f} s")
+    columns = list(space) + ["total_pnl", "return_pct", "max_drawdown_pct", "sharpe", "trades", "win_rate"]
+    print(results[list(dict.fromkeys(columns))].head(args.top).to_string())
+    if args.out:
+        results.to_csv(args.out, index=False)
+        print(f"Wrote {len(results)} rows to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import asyncio
+import logging
+import time
+import pika
+from tick_frame import FRAME_CONTENT_TYPE, encode_frame
+
+logger = logging.getLogger("MarketDataCollector")
+
+
+class _SymbolBuffer:
+    __slots__ = ("timestamps", "prices", "quantities", "opened_at")
+
+    def __init__(self):
+        self.timestamps = []
+        self.prices = []
+        self.quantities = []
+        self.opened_at = None
+
+
+class TickBatcher:
+    """Packs ticks into one binary frame per symbol every N ticks or M milliseconds."""
+
+    def __init__(self, publisher, batch_size=500, batch_interval_ms=100):
+        self.publisher = publisher
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval_ms / 1000.0
+        self.properties = pika.BasicProperties(delivery_mode=2, content_type=FRAME_CONTENT_TYPE)
+        self.frames = 0
+        self._buffers = {}
+
+    def add(self, tick):
+        key = (tick["exchange"], tick["symbol"])
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = _SymbolBuffer()
+        if buffer.opened_at is None:
+            buffer.opened_at = time.monotonic()
+        buffer.timestamps.append(tick["timestamp"])
+        buffer.prices.append(tick["price"])
+        buffer.quantities.append(tick["quantity"])
+        if len(buffer.timestamps) >= self.batch_size:
+            self._flush(key, buffer)
+
+    async def run(self):
+        """Flush buffers that have been open for longer than the batch interval."""
+        while True:
+            await asyncio.sleep(self.batch_interval / 2)
+            deadline = time.monotonic() - self.batch_interval
+            for key, buffer in self._buffers.items():
+                if buffer.opened_at is not None and buffer.opened_at <= deadline:
+                    self._flush(key, buffer)
+
+    def _flush(self, key, buffer):
+        exchange, symbol = key
+        frame = encode_frame(exchange, symbol, buffer.timestamps, buffer.prices, buffer.quantities)
+        self.publisher.offer(frame, routing_key=f"{exchange}.{symbol}", properties=self.properties)
+        self.frames += 1
+        buffer.timestamps = []
+        buffer.prices = []
+        buffer.quantities = []
+        buffer.opened_at = None
@@ -0,0 +1,76 @@
+"""Compare per-tick JSON messages with batched binary tick frames.
+
+Usage: python bench_tick_frames.py [--ticks 200000] [--batch-size 500]
+
+Reports encode+decode throughput (ticks/sec and messages/sec) and wire bytes
+per tick for both formats. Runs offline; no broker is needed.
+"""
+import argparse
+import json
+import random
+import time
+from tick_frame import decode_ticks, encode_frame
+
+
+def make_ticks(n):
+    ts = 1_700_000_000_000
+    price = 65000.0
+    ticks = []
+    for _ in range(n):
+        ts += random.randint(0, 5)
+        price += random.uniform(-5, 5)
+        ticks.append({
+            "exchange": "binance",
+            "symbol": "BTCUSDT",
+            "price": round(price, 2),
+            "quantity": round(random.uniform(0.0001, 2), 5),
+            "timestamp": ts
+        })
+    return ticks
+
+
+def bench_json(ticks):
+    start = time.perf_counter()
+    messages = [json.dumps(tick).encode() for tick in ticks]
+    decoded = [json.loads(body) for body in messages]
+    elapsed = time.perf_counter() - start
+    assert len(decoded) == len(ticks)
+    return elapsed, len(messages), sum(len(m) for m in messages)
+
+
+def bench_frames(ticks, batch_size):
+    start = time.perf_counter()
+    messages = []
+    for i in range(0, len(ticks), batch_size):
+        chunk = ticks[i:i + batch_size]
+        messages.append(encode_frame(
+            "binance", "BTCUSDT",
+            [t["timestamp"] for t in chunk],
+            [t["price"] for t in chunk],
+            [t["quantity"] for t in chunk]
+        ))
+    decoded = 0
+    for body in messages:
+        decoded += len(decode_ticks(body))
+    elapsed = time.perf_counter() - start
+    assert decoded == len(ticks)
+    return elapsed, len(messages), sum(len(m) for m in messages)
+
+
+def report(name, n_ticks, elapsed, n_messages, n_bytes):
+    print(f"{name:<8} {n_ticks / elapsed:>12,.0f} ticks/s {n_messages / elapsed:>12,.0f} msgs/s "
+          f"{n_messages:>8} msgs {n_bytes / n_ticks:>7.1f} bytes/tick")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    ticks = make_ticks(args.ticks)
+    report("json", args.ticks, *bench_json(ticks))
+    report("frames", args.ticks, *bench_frames(ticks, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
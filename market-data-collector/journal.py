@@ -0,0 +1,166 @@
+import glob
+import logging
+import mmap
+import os
+import struct
+
+logger = logging.getLogger("MarketDataCollector")
+
+# Segment layout: a 32-byte header followed by fixed-size tick records.
+#   header "<4sIqq": magic, record count, first timestamp (ms), last timestamp (ms)
+#   record "<qdd16s8s": timestamp (ms), price, quantity, symbol, exchange
+SEGMENT_MAGIC = b"TKJ1"
+_HEADER = struct.Struct("<4sIqq")
+_HEADER_SIZE = 32
+_RECORD = struct.Struct("<qdd16s8s")
+
+
+def _segment_path(directory, segment_id):
+    return os.path.join(directory, f"ticks-{segment_id:010d}.journal")
+
+
+def _segment_ids(directory):
+    ids = []
+    for path in glob.glob(os.path.join(directory, "ticks-*.journal")):
+        try:
+            ids.append(int(os.path.basename(path)[6:-8]))
+        except ValueError:
+            continue
+    return sorted(ids)
+
+
+def _unpack_tick(buf, offset):
+    ts, price, quantity, symbol, exchange = _RECORD.unpack_from(buf, offset)
+    return {
+        "exchange": exchange.rstrip(b"\0").decode("ascii"),
+        "symbol": symbol.rstrip(b"\0").decode("ascii"),
+        "price": price,
+        "quantity": quantity,
+        "timestamp": ts
+    }
+
+
+class TickJournal:
+    """Append-only journal of raw ticks in memory-mapped, fixed-size segments.
+
+    Positions are ``(segment_id, index)`` tuples and compare in append order.
+    Once ``max_segments`` full segments exist the oldest one is deleted. A
+    ``readonly`` journal never opens a segment for writing, so it can be read
+    while a collector process is appending to the same directory.
+    """
+
+    def __init__(self, directory, segment_bytes=64 * 1024 * 1024, max_segments=16, readonly=False):
+        self.directory = directory
+        self.capacity = (segment_bytes - _HEADER_SIZE) // _RECORD.size
+        self.segment_bytes = _HEADER_SIZE + self.capacity * _RECORD.size
+        self.max_segments = max_segments
+        self._file = None
+        self._map = None
+        self.segment_id = None
+        if not readonly:
+            os.makedirs(directory, exist_ok=True)
+            ids = _segment_ids(directory)
+            self._open_segment(ids[-1] if ids else 0)
+
+    @property
+    def position(self):
+        """Position the next appended tick will get."""
+        return (self.segment_id, self.count)
+
+    def append(self, tick):
+        if self.count >= self.capacity:
+            self._rotate()
+        ts = tick["timestamp"]
+        _RECORD.pack_into(
+            self._map, _HEADER_SIZE + self.count * _RECORD.size,
+            ts, tick["price"], tick["quantity"],
+            tick["symbol"].encode("ascii"), tick["exchange"].encode("ascii")
+        )
+        if self.count == 0:
+            self.first_ts = ts
+        self.count += 1
+        self.last_ts = max(self.last_ts, ts)
+        _HEADER.pack_into(self._map, 0, SEGMENT_MAGIC, self.count, self.first_ts, self.last_ts)
+
+    def read_from(self, position, limit=None):
+        """Yield ``(position, tick)`` pairs from ``position`` up to the current end."""
+        segment_id, index = position
+        emitted = 0
+        for sid in _segment_ids(self.directory):
+            if sid < segment_id:
+                continue
+            start = index if sid == segment_id else 0
+            for i, tick in self._iter_segment(sid, start):
+                yield (sid, i), tick
+                emitted += 1
+                if limit is not None and emitted >= limit:
+                    return
+
+    def read_range(self, start_ts=None, end_ts=None):
+        """Yield ticks with ``start_ts <= timestamp <= end_ts`` in journal order."""
+        for sid in _segment_ids(self.directory):
+            count, first_ts, last_ts = self._segment_header(sid)
+            if count == 0:
+                continue
+            if (start_ts is not None and last_ts < start_ts) or (end_ts is not None and first_ts > end_ts):
+                continue
+            for _, tick in self._iter_segment(sid, 0):
+                ts = tick["timestamp"]
+                if (start_ts is None or ts >= start_ts) and (end_ts is None or ts <= end_ts):
+                    yield tick
+
+    def flush(self):
+        self._map.flush()
+
+    def close(self):
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+            self._file.close()
+            self._map = None
+            self._file = None
+
+    def _open_segment(self, segment_id):
+        path = _segment_path(self.directory, segment_id)
+        exists = os.path.exists(path)
+        self._file = open(path, "r+b" if exists else "w+b")
+        if os.path.getsize(path) < self.segment_bytes:
+            self._file.truncate(self.segment_bytes)
+        self._map = mmap.mmap(self._file.fileno(), self.segment_bytes)
+        self.segment_id = segment_id
+        magic, count, first_ts, last_ts = _HEADER.unpack_from(self._map, 0)
+        if magic == SEGMENT_MAGIC:
+            self.count, self.first_ts, self.last_ts = min(count, self.capacity), first_ts, last_ts
+        else:
+            self.count, self.first_ts, self.last_ts = 0, 0, 0
+            _HEADER.pack_into(self._map, 0, SEGMENT_MAGIC, 0, 0, 0)
+
+    def _rotate(self):
+        self.close()
+        self._open_segment(self.segment_id + 1)
+        ids = _segment_ids(self.directory)
+        for sid in ids[:max(0, len(ids) - self.max_segments)]:
+            logger.warning(f"Journal retention: deleting segment {sid}")
+            os.remove(_segment_path(self.directory, sid))
+
+    def _segment_header(self, segment_id):
+        if segment_id == self.segment_id:
+            return self.count, self.first_ts, self.last_ts
+        with open(_segment_path(self.directory, segment_id), "rb") as f:
+            magic, count, first_ts, last_ts = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != SEGMENT_MAGIC:
+            return 0, 0, 0
+        return count, first_ts, last_ts
+
+    def _iter_segment(self, segment_id, start):
+        if segment_id == self.segment_id:
+            # Live segment: only records appended so far, read through the writable map
+            for i in range(start, self.count):
+                yield i, _unpack_tick(self._map, _HEADER_SIZE + i * _RECORD.size)
+            return
+        count, _, _ = self._segment_header(segment_id)
+        with open(_segment_path(self.directory, segment_id), "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                count = min(count, (len(buf) - _HEADER_SIZE) // _RECORD.size)
+                for i in range(start, count):
+                    yield i, _unpack_tick(buf, _HEADER_SIZE + i * _RECORD.size)
@@ -1,61 +1,175 @@
 import asyncio
+import collections
 import websockets
-import pika
 import json
 import os
 import logging
+import time
+from batcher import TickBatcher
+from journal import TickJournal
+from publisher import AsyncPublisher
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger("MarketDataCollector")
 
-BINANCE_WS_URL = os.environ.get("BINANCE_WS_URL", "wss://stream.binance.com:9443/ws/btcusdt@trade")
+BINANCE_WS_BASE_URL = os.environ.get("BINANCE_WS_BASE_URL", "wss://stream.binance.com:9443/stream?streams=")
+BINANCE_SYMBOLS = [s.strip().upper() for s in os.environ.get("BINANCE_SYMBOLS", "BTCUSDT").split(",") if s.strip()]
+SYMBOLS_PER_CONNECTION = int(os.environ.get("SYMBOLS_PER_CONNECTION", 200))
 RABBITMQ_HOST = os.environ.get("RABBITMQ_HOST", "rabbitmq")
 QUEUE_NAME = os.environ.get("MARKET_DATA_QUEUE", "raw_market_data")
+EXCHANGE_NAME = os.environ.get("MARKET_DATA_EXCHANGE", "market_data")
+BINDING_KEY = os.environ.get("MARKET_DATA_BINDING_KEY", "binance.#")
 
-# RabbitMQ setup
-def get_rabbitmq_channel():
-    for attempt in range(5):
-        try:
-            connection = pika.BlockingConnection(pika.ConnectionParameters(host=RABBITMQ_HOST))
-            channel = connection.channel()
-            channel.queue_declare(queue=QUEUE_NAME, durable=True)
-            return connection, channel
-        except Exception as e:
-            logger.error(f"RabbitMQ connection failed (attempt {attempt+1}): {e}")
-            asyncio.sleep(2 ** attempt)
-    raise Exception("Failed to connect to RabbitMQ after multiple attempts.")
+PUBLISH_QUEUE_MAXSIZE = int(os.environ.get("PUBLISH_QUEUE_MAXSIZE", 10000))
+PUBLISH_HIGH_WATER_MARK = int(os.environ.get("PUBLISH_HIGH_WATER_MARK", 8000))
+PUBLISH_CONFIRM_WINDOW = int(os.environ.get("PUBLISH_CONFIRM_WINDOW", 1000))
+PUBLISH_STATS_INTERVAL = int(os.environ.get("PUBLISH_STATS_INTERVAL", 30))
+TICK_BATCH_MODE = os.environ.get("TICK_BATCH_MODE", "false").lower() == "true"
+TICK_BATCH_SIZE = int(os.environ.get("TICK_BATCH_SIZE", 500))
+TICK_BATCH_INTERVAL_MS = int(os.environ.get("TICK_BATCH_INTERVAL_MS", 100))
+JOURNAL_ENABLED = os.environ.get("TICK_JOURNAL_ENABLED", "true").lower() == "true"
+# /data is the market_data_journal volume in docker-compose.yml
+JOURNAL_DIR = os.environ.get("TICK_JOURNAL_DIR", "/data/journal")
+JOURNAL_SEGMENT_MB = int(os.environ.get("TICK_JOURNAL_SEGMENT_MB", 64))
+JOURNAL_MAX_SEGMENTS = int(os.environ.get("TICK_JOURNAL_MAX_SEGMENTS", 16))
+JOURNAL_DRAIN_CHUNK = int(os.environ.get("TICK_JOURNAL_DRAIN_CHUNK", 1000))
 
-async def main():
-    logger.info("Connecting to Binance websocket...")
-    connection, channel = get_rabbitmq_channel()
+symbol_counts = collections.Counter()
+
+def shard_stream_urls(symbols, per_connection):
+    # Binance caps streams per connection, so large symbol lists are spread over several sockets
+    urls = []
+    for i in range(0, len(symbols), per_connection):
+        streams = "/".join(f"{symbol.lower()}@trade" for symbol in symbols[i:i + per_connection])
+        urls.append(BINANCE_WS_BASE_URL + streams)
+    return urls
+
+def parse_trade(message):
+    payload = json.loads(message)
+    # Combined streams wrap the trade as {"stream": ..., "data": {...}}
+    data = payload.get("data", payload)
+    return {
+        "exchange": "binance",
+        "symbol": data["s"],
+        "price": float(data["p"]),
+        "quantity": float(data["q"]),
+        "timestamp": int(data["T"])
+    }
+
+class TickRouter:
+    """Journals every tick and routes it to the publisher.
+
+    While RabbitMQ is unreachable ticks are only journaled. After reconnecting
+    the backlog is drained from the journal in chunks, and live ticks keep
+    going to the journal until it has caught up so ordering is preserved.
+    """
+
+    def __init__(self, publisher, batcher=None, journal=None):
+        self.publisher = publisher
+        self.batcher = batcher
+        self.journal = journal
+        self.backlog_from = None
+
+    def handle(self, tick):
+        if self.journal is None:
+            self.emit(tick)
+            return
+        if self.backlog_from is None and not self.publisher.connected.is_set():
+            self.backlog_from = self.journal.position
+            logger.warning("RabbitMQ unavailable, buffering ticks in the journal.")
+        self.journal.append(tick)
+        if self.backlog_from is None:
+            self.emit(tick)
+
+    def emit(self, tick):
+        if self.batcher:
+            self.batcher.add(tick)
+        else:
+            self.publisher.offer(json.dumps(tick), routing_key=f"{tick['exchange']}.{tick['symbol']}")
+
+    async def drain(self):
+        while True:
+            await self.publisher.connected.wait()
+            if self.backlog_from is None:
+                await asyncio.sleep(1)
+                continue
+            if self.publisher.queue.qsize() >= self.publisher.high_water_mark:
+                await asyncio.sleep(0.1)
+                continue
+            position = None
+            drained = 0
+            for position, tick in self.journal.read_from(self.backlog_from, limit=JOURNAL_DRAIN_CHUNK):
+                self.emit(tick)
+                drained += 1
+            if position is None:
+                logger.info("Journal backlog drained, resuming live publishing.")
+                self.backlog_from = None
+            else:
+                self.backlog_from = (position[0], position[1] + 1)
+                logger.debug(f"Drained {drained} journaled ticks")
+            await asyncio.sleep(0)
+
+async def consume_websocket(url, router):
     while True:
         try:
-            async with websockets.connect(BINANCE_WS_URL) as ws:
+            async with websockets.connect(url) as ws:
                 async for message in ws:
                     try:
-                        data = json.loads(message)
-                        tick = {
-                            "exchange": "binance",
-                            "symbol": "BTCUSDT",
-                            "price": float(data["p"]),
-                            "quantity": float(data["q"]),
-                            "timestamp": int(data["T"])
-                        }
-                        channel.basic_publish(
-                            exchange='',
-                            routing_key=QUEUE_NAME,
-                            body=json.dumps(tick),
-                            properties=pika.BasicProperties(delivery_mode=2)
-                        )
-                        logger.info(f"Published: {tick}")
+                        tick = parse_trade(message)
+                        symbol_counts[tick["symbol"]] += 1
+                        router.handle(tick)
                     except Exception as e:
                         logger.error(f"Error processing message: {e}")
         except Exception as e:
             logger.error(f"Websocket connection error: {e}. Reconnecting in 5 seconds...")
             await asyncio.sleep(5)
 
+async def report_symbol_throughput(interval):
+    last_counts = collections.Counter()
+    last_time = time.monotonic()
+    while True:
+        await asyncio.sleep(interval)
+        now = time.monotonic()
+        elapsed = now - last_time
+        delta = symbol_counts - last_counts
+        last_counts = symbol_counts.copy()
+        last_time = now
+        top = ", ".join(f"{symbol}={count / elapsed:.1f}/s" for symbol, count in delta.most_common(10))
+        logger.info(f"Tick throughput: total={sum(delta.values()) / elapsed:.1f}/s "
+                    f"active_symbols={len(delta)} top: {top}")
+
+async def main():
+    urls = shard_stream_urls(BINANCE_SYMBOLS, SYMBOLS_PER_CONNECTION)
+    logger.info(f"Connecting to Binance websocket for {len(BINANCE_SYMBOLS)} symbols over {len(urls)} connections...")
+    publisher = AsyncPublisher(
+        RABBITMQ_HOST,
+        QUEUE_NAME,
+        exchange=EXCHANGE_NAME,
+        binding_key=BINDING_KEY,
+        max_queue_size=PUBLISH_QUEUE_MAXSIZE,
+        high_water_mark=PUBLISH_HIGH_WATER_MARK,
+        confirm_window=PUBLISH_CONFIRM_WINDOW,
+        stats_interval=PUBLISH_STATS_INTERVAL
+    )
+    tasks = [publisher.run(), publisher.report_stats(), report_symbol_throughput(PUBLISH_STATS_INTERVAL)]
+    batcher = None
+    if TICK_BATCH_MODE:
+        logger.info(f"Batching ticks into binary frames of up to {TICK_BATCH_SIZE} ticks / {TICK_BATCH_INTERVAL_MS} ms")
+        batcher = TickBatcher(publisher, batch_size=TICK_BATCH_SIZE, batch_interval_ms=TICK_BATCH_INTERVAL_MS)
+        tasks.append(batcher.run())
+    journal = None
+    if JOURNAL_ENABLED:
+        journal = TickJournal(JOURNAL_DIR, segment_bytes=JOURNAL_SEGMENT_MB * 1024 * 1024,
+                              max_segments=JOURNAL_MAX_SEGMENTS)
+        logger.info(f"Journaling ticks to {JOURNAL_DIR} (segment {journal.segment_id}, record {journal.count})")
+    router = TickRouter(publisher, batcher, journal)
+    if journal:
+        tasks.append(router.drain())
+    tasks.extend(consume_websocket(url, router) for url in urls)
+    await asyncio.gather(*tasks)
+
 if __name__ == "__main__":
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
-        logger.info("Stopped.") 
\ No newline at end of file
+        logger.info("Stopped.")
@@ -0,0 +1,222 @@
+import asyncio
+import collections
+import logging
+import time
+import pika
+from pika.adapters.asyncio_connection import AsyncioConnection
+
+logger = logging.getLogger("MarketDataCollector")
+
+
+class AsyncPublisher:
+    """Publishes to RabbitMQ from a dedicated asyncio task.
+
+    Producers call ``offer()``, which never blocks: messages go into a bounded
+    in-memory queue that the publisher task drains. Publisher confirms are
+    enabled and at most ``confirm_window`` messages may be unconfirmed at once;
+    nacked messages, and anything unconfirmed when the connection drops, are
+    published again after reconnecting.
+    """
+
+    def __init__(self, host, queue_name, exchange='', binding_key='#', max_queue_size=10000,
+                 high_water_mark=8000, confirm_window=1000, stats_interval=30):
+        self.host = host
+        self.queue_name = queue_name
+        self.exchange = exchange
+        self.binding_key = binding_key
+        self.high_water_mark = high_water_mark
+        self.confirm_window = confirm_window
+        self.stats_interval = stats_interval
+        self.queue = asyncio.Queue(maxsize=max_queue_size)
+        self.stats = {
+            "offered": 0,
+            "published": 0,
+            "confirmed": 0,
+            "nacked": 0,
+            "dropped": 0,
+            "high_water_hits": 0,
+            "max_depth": 0,
+        }
+        self._connection = None
+        self._channel = None
+        self._delivery_tag = 0
+        self._unconfirmed = collections.OrderedDict()
+        self._retry = collections.deque()
+        self._window_open = asyncio.Event()
+        self._window_open.set()
+        self.connected = asyncio.Event()
+        self._publish_task = None
+        self._last_high_water_log = 0.0
+
+    def offer(self, body, routing_key=None, properties=None):
+        """Queue a message for publishing. Returns False if it had to be dropped."""
+        self.stats["offered"] += 1
+        depth = self.queue.qsize()
+        if depth > self.stats["max_depth"]:
+            self.stats["max_depth"] = depth
+        if depth >= self.high_water_mark:
+            self.stats["high_water_hits"] += 1
+            now = time.monotonic()
+            if now - self._last_high_water_log >= 5:
+                self._last_high_water_log = now
+                logger.warning(f"Publish queue above high-water mark: depth={depth}, "
+                               f"unconfirmed={len(self._unconfirmed)}")
+        try:
+            self.queue.put_nowait((routing_key or self.queue_name, body, properties))
+            return True
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            return False
+
+    async def run(self):
+        """Connect, publish until the connection drops, then reconnect with backoff."""
+        backoff = 1
+        while True:
+            try:
+                closed = await self._connect()
+                backoff = 1
+                self.connected.set()
+                self._publish_task = asyncio.ensure_future(self._publish_loop())
+                await asyncio.wait([self._publish_task, closed], return_when=asyncio.FIRST_COMPLETED)
+                if not self._publish_task.done():
+                    self._publish_task.cancel()
+                if self._publish_task.done() and not self._publish_task.cancelled():
+                    self._publish_task.result()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"RabbitMQ publisher error: {e}")
+            self.connected.clear()
+            self._requeue_unconfirmed()
+            self._close_connection()
+            logger.info(f"Reconnecting publisher in {backoff} seconds...")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+    async def report_stats(self):
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            logger.info(f"Publisher stats: depth={self.queue.qsize()} "
+                        f"unconfirmed={len(self._unconfirmed)} {self.stats}")
+
+    async def _connect(self):
+        loop = asyncio.get_running_loop()
+        opened = loop.create_future()
+        closed = loop.create_future()
+
+        def on_open(connection):
+            connection.channel(on_open_callback=on_channel_open)
+
+        def on_open_error(connection, error):
+            if not opened.done():
+                opened.set_exception(ConnectionError(f"RabbitMQ connection failed: {error}"))
+
+        def on_close(connection, reason):
+            if not opened.done():
+                opened.set_exception(ConnectionError(f"RabbitMQ connection closed: {reason}"))
+            if not closed.done():
+                closed.set_result(reason)
+
+        def on_channel_open(channel):
+            channel.add_on_close_callback(on_channel_close)
+            if self.exchange:
+                channel.exchange_declare(exchange=self.exchange, exchange_type='topic', durable=True,
+                                         callback=lambda _frame: declare_queue(channel))
+            else:
+                declare_queue(channel)
+
+        def declare_queue(channel):
+            channel.queue_declare(queue=self.queue_name, durable=True,
+                                  callback=lambda _frame: bind_queue(channel))
+
+        def bind_queue(channel):
+            if self.exchange:
+                channel.queue_bind(queue=self.queue_name, exchange=self.exchange,
+                                   routing_key=self.binding_key,
+                                   callback=lambda _frame: on_declared(channel))
+            else:
+                on_declared(channel)
+
+        def on_channel_close(channel, reason):
+            logger.error(f"RabbitMQ channel closed: {reason}")
+            if not closed.done():
+                closed.set_result(reason)
+            if self._connection is not None and self._connection.is_open:
+                self._connection.close()
+
+        def on_declared(channel):
+            channel.confirm_delivery(self._on_confirm, callback=lambda _frame: opened.set_result(channel))
+
+        self._connection = AsyncioConnection(
+            pika.ConnectionParameters(host=self.host),
+            on_open_callback=on_open,
+            on_open_error_callback=on_open_error,
+            on_close_callback=on_close,
+            custom_ioloop=loop,
+        )
+        self._channel = await opened
+        self._delivery_tag = 0
+        logger.info("Publisher connected to RabbitMQ with confirms enabled.")
+        return closed
+
+    async def _publish_loop(self):
+        properties = pika.BasicProperties(delivery_mode=2)
+        while True:
+            if len(self._unconfirmed) >= self.confirm_window:
+                self._window_open.clear()
+                await self._window_open.wait()
+                continue
+            item = self._retry.popleft() if self._retry else await self.queue.get()
+            routing_key, body, props = item
+            try:
+                self._channel.basic_publish(
+                    exchange=self.exchange,
+                    routing_key=routing_key,
+                    body=body,
+                    properties=props or properties
+                )
+            except Exception:
+                self._retry.appendleft(item)
+                raise
+            self._delivery_tag += 1
+            self._unconfirmed[self._delivery_tag] = item
+            self.stats["published"] += 1
+
+    def _on_confirm(self, frame):
+        method = frame.method
+        acked = isinstance(method, pika.spec.Basic.Ack)
+        if method.multiple:
+            tags = []
+            for tag in self._unconfirmed:
+                if tag > method.delivery_tag:
+                    break
+                tags.append(tag)
+        else:
+            tags = [method.delivery_tag]
+        for tag in tags:
+            item = self._unconfirmed.pop(tag, None)
+            if item is None:
+                continue
+            if acked:
+                self.stats["confirmed"] += 1
+            else:
+                self.stats["nacked"] += 1
+                self._retry.append(item)
+        if len(self._unconfirmed) < self.confirm_window:
+            self._window_open.set()
+
+    def _requeue_unconfirmed(self):
+        if self._unconfirmed:
+            logger.warning(f"Re-publishing {len(self._unconfirmed)} unconfirmed messages after reconnect.")
+            self._retry.extendleft(reversed(list(self._unconfirmed.values())))
+            self._unconfirmed.clear()
+        self._window_open.set()
+
+    def _close_connection(self):
+        if self._connection is not None and not (self._connection.is_closed or self._connection.is_closing):
+            try:
+                self._connection.close()
+            except Exception as e:
+                logger.error(f"Error closing RabbitMQ connection: {e}")
+        self._connection = None
+        self._channel = None
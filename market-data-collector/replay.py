@@ -0,0 +1,80 @@
+"""Replay ticks from the local tick journal into a RabbitMQ queue.
+
+Usage:
+  python replay.py --start 2024-05-01T12:00:00Z --end 2024-05-01T13:00:00Z \\
+      --queue replay_market_data --speed 10
+
+--start/--end accept epoch milliseconds or ISO-8601 timestamps. --speed is a
+multiple of real time (1 = original pacing); 0 publishes as fast as possible.
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from datetime import datetime
+import pika
+from journal import TickJournal
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger("TickReplay")
+
+
+def parse_time(value):
+    if value is None:
+        return None
+    if value.isdigit():
+        return int(value)
+    return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1000)
+
+
+def replay(journal, channel, queue, start_ts, end_ts, speed, symbols=None):
+    properties = pika.BasicProperties(delivery_mode=2)
+    first_tick_ts = None
+    started = time.monotonic()
+    published = 0
+    for tick in journal.read_range(start_ts, end_ts):
+        if symbols and tick["symbol"] not in symbols:
+            continue
+        if speed > 0:
+            if first_tick_ts is None:
+                first_tick_ts = tick["timestamp"]
+            delay = (tick["timestamp"] - first_tick_ts) / 1000.0 / speed - (time.monotonic() - started)
+            if delay > 0:
+                time.sleep(delay)
+        channel.basic_publish(exchange='', routing_key=queue, body=json.dumps(tick), properties=properties)
+        published += 1
+        if published % 10000 == 0:
+            logger.info(f"Replayed {published} ticks...")
+    return published
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay ticks from the local tick journal into a queue.")
+    parser.add_argument("--journal-dir", default=os.environ.get("TICK_JOURNAL_DIR", "/data/journal"))
+    parser.add_argument("--host", default=os.environ.get("RABBITMQ_HOST", "rabbitmq"))
+    parser.add_argument("--queue", default=os.environ.get("MARKET_DATA_QUEUE", "raw_market_data"))
+    parser.add_argument("--start", help="epoch ms or ISO-8601, inclusive")
+    parser.add_argument("--end", help="epoch ms or ISO-8601, inclusive")
+    parser.add_argument("--speed", type=float, default=1.0, help="multiple of real time, 0 for no pacing")
+    parser.add_argument("--symbols", help="comma-separated symbols to replay (default: all)")
+    args = parser.parse_args()
+
+    symbols = {s.strip().upper() for s in args.symbols.split(",")} if args.symbols else None
+    journal = TickJournal(args.journal_dir, readonly=True)
+    connection = pika.BlockingConnection(pika.ConnectionParameters(host=args.host))
+    channel = connection.channel()
+    channel.queue_declare(queue=args.queue, durable=True)
+    try:
+        published = replay(journal, channel, args.queue, parse_time(args.start), parse_time(args.end),
+                           args.speed, symbols)
+        logger.info(f"Replayed {published} ticks into {args.queue}.")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        logger.info("Stopped.")
@@ -0,0 +1,77 @@
+import struct
+import sys
+from array import array
+
+# Columnar binary frame for a batch of ticks of one exchange/symbol.
+# Layout (little-endian):
+#   header  "<4sBBBI": magic, version, len(exchange), len(symbol), tick count
+#   exchange and symbol as ASCII
+#   int64 timestamps (ms), float64 prices, float64 quantities, one column each
+# This module is shared verbatim by market-data-collector, market-data-consumer
+# and ta-module.
+
+FRAME_CONTENT_TYPE = "application/x-tick-frame"
+FRAME_MAGIC = b"TKF1"
+FRAME_VERSION = 1
+_HEADER = struct.Struct("<4sBBBI")
+_SWAP = sys.byteorder != "little"
+
+
+def _column_bytes(typecode, values):
+    column = array(typecode, values)
+    if _SWAP:
+        column.byteswap()
+    return column.tobytes()
+
+
+def _read_column(typecode, buf, offset, count):
+    column = array(typecode)
+    end = offset + count * column.itemsize
+    column.frombytes(buf[offset:end])
+    if _SWAP:
+        column.byteswap()
+    return column, end
+
+
+def encode_frame(exchange, symbol, timestamps, prices, quantities):
+    count = len(timestamps)
+    if not (count == len(prices) == len(quantities)):
+        raise ValueError("Tick columns must have equal length")
+    exchange_bytes = exchange.encode("ascii")
+    symbol_bytes = symbol.encode("ascii")
+    return b"".join((
+        _HEADER.pack(FRAME_MAGIC, FRAME_VERSION, len(exchange_bytes), len(symbol_bytes), count),
+        exchange_bytes,
+        symbol_bytes,
+        _column_bytes("q", timestamps),
+        _column_bytes("d", prices),
+        _column_bytes("d", quantities),
+    ))
+
+
+def decode_frame(buf):
+    """Return (exchange, symbol, timestamps, prices, quantities) with array-backed columns."""
+    buf = memoryview(buf)
+    magic, version, exchange_len, symbol_len, count = _HEADER.unpack_from(buf, 0)
+    if magic != FRAME_MAGIC or version != FRAME_VERSION:
+        raise ValueError(f"Unsupported tick frame {magic!r} v{version}")
+    offset = _HEADER.size
+    exchange = bytes(buf[offset:offset + exchange_len]).decode("ascii")
+    offset += exchange_len
+    symbol = bytes(buf[offset:offset + symbol_len]).decode("ascii")
+    offset += symbol_len
+    timestamps, offset = _read_column("q", buf, offset, count)
+    prices, offset = _read_column("d", buf, offset, count)
+    quantities, offset = _read_column("d", buf, offset, count)
+    if offset != len(buf):
+        raise ValueError("Truncated or oversized tick frame")
+    return exchange, symbol, timestamps, prices, quantities
+
+
+def decode_ticks(buf):
+    """Decode a frame into the same dicts the JSON path produces."""
+    exchange, symbol, timestamps, prices, quantities = decode_frame(buf)
+    return [
+        {"exchange": exchange, "symbol": symbol, "price": price, "quantity": quantity, "timestamp": ts}
+        for ts, price, quantity in zip(timestamps, prices, quantities)
+    ]
@@ -0,0 +1,128 @@
+import functools
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger("MarketDataConsumer")
+
+
+class BatchWriter:
+    """Buffers line-protocol chunks and writes them in batches from a writer thread.
+
+    A batch is flushed when it reaches ``batch_size`` points or every
+    ``flush_interval`` seconds. Once InfluxDB accepts a batch, all deliveries up
+    to its last delivery tag are acked with ``multiple=True``; a batch that still
+    fails after ``max_retries`` attempts is nacked the same way. Acks are handed
+    back to the connection thread because pika channels are not thread-safe.
+    """
+
+    def __init__(self, write, connection, channel, batch_size=5000, flush_interval=1.0,
+                 max_retries=5, stats_interval=30):
+        self.write = write
+        self.connection = connection
+        self.channel = channel
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.stats_interval = stats_interval
+        self.stats = {
+            "batches": 0,
+            "points": 0,
+            "retries": 0,
+            "failed_batches": 0,
+            "max_batch_size": 0,
+            "write_latency_ms_total": 0.0,
+            "write_latency_ms_max": 0.0,
+        }
+        self._buffer = []
+        self._points = 0
+        self._last_tag = None
+        self._batches = queue.Queue()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._last_stats = time.monotonic()
+
+    def start(self):
+        self._thread.start()
+        self.connection.call_later(self.flush_interval, self._on_timer)
+
+    def stop(self):
+        self._stopped.set()
+        self._batches.put(None)
+
+    def add(self, chunk, points, delivery_tag):
+        """Buffer the serialized points of one delivery. Call from the connection thread."""
+        if chunk:
+            self._buffer.append(chunk)
+            self._points += points
+        self._last_tag = delivery_tag
+        if self._points >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self._last_tag is None:
+            return
+        self._batches.put((b"\n".join(self._buffer), self._points, self._last_tag))
+        self._buffer = []
+        self._points = 0
+        self._last_tag = None
+
+    def _on_timer(self):
+        if self._stopped.is_set():
+            return
+        self.flush()
+        now = time.monotonic()
+        if now - self._last_stats >= self.stats_interval:
+            self._last_stats = now
+            self._log_stats()
+        self.connection.call_later(self.flush_interval, self._on_timer)
+
+    def _log_stats(self):
+        batches = self.stats["batches"]
+        avg_latency = self.stats["write_latency_ms_total"] / batches if batches else 0.0
+        avg_size = self.stats["points"] / batches if batches else 0.0
+        logger.info(f"InfluxDB batch writer: pending_batches={self._batches.qsize()} "
+                    f"avg_batch_size={avg_size:.0f} avg_write_ms={avg_latency:.1f} {self.stats}")
+
+    def _run(self):
+        while not self._stopped.is_set():
+            item = self._batches.get()
+            if item is None:
+                break
+            data, points, last_tag = item
+            written = self._write_with_retry(data, points)
+            callback = functools.partial(self._settle, last_tag, written)
+            try:
+                self.connection.add_callback_threadsafe(callback)
+            except Exception as e:
+                logger.error(f"Could not schedule ack for delivery {last_tag}: {e}")
+
+    def _write_with_retry(self, data, points):
+        for attempt in range(self.max_retries):
+            start = time.perf_counter()
+            try:
+                if points:
+                    self.write(data)
+            except Exception as e:
+                self.stats["retries"] += 1
+                logger.error(f"InfluxDB batch write failed (attempt {attempt+1}, {points} points): {e}")
+                if self._stopped.wait(min(2 ** attempt, 30)):
+                    return False
+                continue
+            latency_ms = (time.perf_counter() - start) * 1000
+            self.stats["batches"] += 1
+            self.stats["points"] += points
+            self.stats["max_batch_size"] = max(self.stats["max_batch_size"], points)
+            self.stats["write_latency_ms_total"] += latency_ms
+            self.stats["write_latency_ms_max"] = max(self.stats["write_latency_ms_max"], latency_ms)
+            return True
+        self.stats["failed_batches"] += 1
+        return False
+
+    def _settle(self, last_tag, written):
+        if written:
+            self.channel.basic_ack(delivery_tag=last_tag, multiple=True)
+        else:
+            logger.error(f"Dropping batch ending at delivery {last_tag} after {self.max_retries} failed writes")
+            self.channel.basic_nack(delivery_tag=last_tag, multiple=True, requeue=False)
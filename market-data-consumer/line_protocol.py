@@ -0,0 +1,88 @@
+import math
+
+# Fast line-protocol serializer for the fixed price_tick schema:
+#   price_tick,exchange=<exchange>,symbol=<symbol> price=<float>,quantity=<float> <ms timestamp>
+# Output is byte-for-byte what Point(...).to_line_protocol() produces for the
+# same tick (sorted tags and fields, whole floats without ".0", non-finite
+# fields skipped), so it must be written with write_precision="ms".
+
+MEASUREMENT = "price_tick"
+
+_ESCAPE_TAG = str.maketrans({
+    ',': r'\,',
+    '=': r'\=',
+    ' ': r'\ ',
+    '\n': r'\n',
+    '\t': r'\t',
+    '\r': r'\r',
+})
+
+_series_cache = {}
+
+
+def _escape_tag_value(value):
+    escaped = str(value).translate(_ESCAPE_TAG)
+    if escaped.endswith('\\'):
+        escaped += ' '
+    return escaped
+
+
+def series_key(exchange, symbol):
+    """Return the escaped "measurement,tags " prefix, cached per exchange/symbol."""
+    key = (exchange, symbol)
+    prefix = _series_cache.get(key)
+    if prefix is None:
+        if len(_series_cache) > 100000:
+            _series_cache.clear()
+        tags = []
+        if exchange is not None and exchange != '':
+            tags.append(f"exchange={_escape_tag_value(exchange)}")
+        if symbol is not None and symbol != '':
+            tags.append(f"symbol={_escape_tag_value(symbol)}")
+        prefix = MEASUREMENT + ("," + ",".join(tags) if tags else "") + " "
+        _series_cache[key] = prefix
+    return prefix
+
+
+def _format_float(value):
+    s = repr(float(value))
+    return s[:-2] if s.endswith('.0') else s
+
+
+def _fields(price, quantity):
+    if math.isfinite(price):
+        if math.isfinite(quantity):
+            return f"price={_format_float(price)},quantity={_format_float(quantity)}"
+        return f"price={_format_float(price)}"
+    if math.isfinite(quantity):
+        return f"quantity={_format_float(quantity)}"
+    return None
+
+
+def serialize_columns(exchange, symbol, timestamps, prices, quantities):
+    """Serialize one exchange/symbol's tick columns into line-protocol bytes."""
+    prefix = series_key(exchange, symbol)
+    lines = [None] * len(timestamps)
+    n = 0
+    for ts, price, quantity in zip(timestamps, prices, quantities):
+        fields = _fields(price, quantity)
+        if fields is None:
+            continue
+        lines[n] = f"{prefix}{fields} {int(ts)}"
+        n += 1
+    del lines[n:]
+    return "\n".join(lines).encode("utf-8")
+
+
+def serialize_ticks(ticks):
+    """Serialize decoded tick dicts into line-protocol bytes, one line per tick."""
+    lines = [None] * len(ticks)
+    n = 0
+    for tick in ticks:
+        fields = _fields(tick["price"], tick["quantity"])
+        if fields is None:
+            continue
+        lines[n] = f"{series_key(tick['exchange'], tick['symbol'])}{fields} {int(tick['timestamp'])}"
+        n += 1
+    del lines[n:]
+    return "\n".join(lines).encode("utf-8")
@@ -2,9 +2,12 @@ import pika
 import json
 import os
 import logging
-from influxdb_client import InfluxDBClient, Point
+from influxdb_client import InfluxDBClient
 from influxdb_client.client.write_api import SYNCHRONOUS
 import time
+from batch_writer import BatchWriter
+from line_protocol import serialize_columns, serialize_ticks
+from tick_frame import FRAME_CONTENT_TYPE, decode_frame
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger("MarketDataConsumer")
@@ -15,6 +18,12 @@ INFLUXDB_URL = os.environ.get("INFLUXDB_URL", "http://influxdb:8086")
 INFLUXDB_TOKEN = os.environ.get("INFLUXDB_TOKEN", "my-token")
 INFLUXDB_ORG = os.environ.get("INFLUXDB_ORG", "my-org")
 INFLUXDB_BUCKET = os.environ.get("INFLUXDB_BUCKET", "market_data")
+INFLUX_BATCH_MODE = os.environ.get("INFLUX_BATCH_MODE", "false").lower() == "true"
+INFLUX_BATCH_SIZE = int(os.environ.get("INFLUX_BATCH_SIZE", 5000))
+INFLUX_FLUSH_INTERVAL = float(os.environ.get("INFLUX_FLUSH_INTERVAL", 1.0))
+INFLUX_PREFETCH = int(os.environ.get("INFLUX_PREFETCH", 20000))
+INFLUX_WRITE_RETRIES = int(os.environ.get("INFLUX_WRITE_RETRIES", 5))
+INFLUX_STATS_INTERVAL = int(os.environ.get("INFLUX_STATS_INTERVAL", 30))
 
 # InfluxDB setup
 def get_influxdb_write_api():
@@ -39,34 +48,65 @@ def get_rabbitmq_channel():
             time.sleep(2 ** attempt)
     raise Exception("Failed to connect to RabbitMQ after multiple attempts.")
 
+def serialize_body(properties, body):
+    """Turn one delivery into line-protocol bytes and the number of ticks it held."""
+    if properties.content_type == FRAME_CONTENT_TYPE:
+        exchange, symbol, timestamps, prices, quantities = decode_frame(body)
+        return serialize_columns(exchange, symbol, timestamps, prices, quantities), len(timestamps)
+    return serialize_ticks([json.loads(body)]), 1
+
+def write_line_protocol(data):
+    write_api.write(bucket=INFLUXDB_BUCKET, org=INFLUXDB_ORG, record=data, write_precision="ms")
+
 def callback(ch, method, properties, body):
     try:
-        data = json.loads(body)
-        point = Point("price_tick") \
-            .tag("exchange", data["exchange"]) \
-            .tag("symbol", data["symbol"]) \
-            .field("price", data["price"]) \
-            .field("quantity", data["quantity"]) \
-            .time(data["timestamp"], write_precision="ms")
-        write_api.write(bucket=INFLUXDB_BUCKET, org=INFLUXDB_ORG, record=point)
-        logger.info(f"Wrote to InfluxDB: {data}")
+        data, count = serialize_body(properties, body)
+        if data:
+            write_line_protocol(data)
+        logger.info(f"Wrote {count} ticks to InfluxDB")
         ch.basic_ack(delivery_tag=method.delivery_tag)
     except Exception as e:
         logger.error(f"Error processing message: {e}")
         ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
 
+def batch_callback(ch, method, properties, body):
+    try:
+        data, count = serialize_body(properties, body)
+        batch_writer.add(data, count, method.delivery_tag)
+    except Exception as e:
+        logger.error(f"Error processing message: {e}")
+        ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+
 def main():
     logger.info("Connecting to RabbitMQ and InfluxDB...")
-    global write_api
+    global write_api, batch_writer
     write_api = get_influxdb_write_api()
     connection, channel = get_rabbitmq_channel()
-    channel.basic_qos(prefetch_count=1)
-    channel.basic_consume(queue=QUEUE_NAME, on_message_callback=callback)
+    if INFLUX_BATCH_MODE:
+        logger.info(f"Batch mode: up to {INFLUX_BATCH_SIZE} points or {INFLUX_FLUSH_INTERVAL}s per write")
+        batch_writer = BatchWriter(
+            write_line_protocol,
+            connection,
+            channel,
+            batch_size=INFLUX_BATCH_SIZE,
+            flush_interval=INFLUX_FLUSH_INTERVAL,
+            max_retries=INFLUX_WRITE_RETRIES,
+            stats_interval=INFLUX_STATS_INTERVAL
+        )
+        batch_writer.start()
+        channel.basic_qos(prefetch_count=INFLUX_PREFETCH)
+        channel.basic_consume(queue=QUEUE_NAME, on_message_callback=batch_callback)
+    else:
+        batch_writer = None
+        channel.basic_qos(prefetch_count=1)
+        channel.basic_consume(queue=QUEUE_NAME, on_message_callback=callback)
     logger.info("Waiting for messages...")
     try:
         channel.start_consuming()
     except Exception as e:
         logger.error(f"Consumer error: {e}")
+        if batch_writer:
+            batch_writer.stop()
         time.sleep(10)
         main()
 
@@ -1,9 +1,10 @@
-import requests
 import pika
 import json
 import os
 import time
 import logging
+from poller import NewsPoller
+from seen_set import SeenSet
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger("NewsFeedCollector")
@@ -11,8 +12,25 @@ logger = logging.getLogger("NewsFeedCollector")
 NEWSAPI_KEY = os.environ.get("NEWSAPI_KEY")
 RABBITMQ_HOST = os.environ.get("RABBITMQ_HOST", "rabbitmq")
 QUEUE_NAME = os.environ.get("NEWS_DATA_QUEUE", "raw_news_data")
+# Articles fan out to the archive queue and to any streaming consumers
+EXCHANGE_NAME = os.environ.get("NEWS_DATA_EXCHANGE", "news_data")
 NEWSAPI_URL = os.environ.get("NEWSAPI_URL", "https://newsapi.org/v2/everything")
 QUERY = os.environ.get("NEWS_QUERY", "cryptocurrency OR bitcoin OR ethereum OR solana")
+# Several queries separated by ";" are polled in parallel, each on its own schedule
+QUERIES = [q.strip() for q in os.environ.get("NEWS_QUERIES", QUERY).split(";") if q.strip()]
+NEWS_PAGE_SIZE = int(os.environ.get("NEWS_PAGE_SIZE", 100))
+NEWS_MAX_PAGES = int(os.environ.get("NEWS_MAX_PAGES", 20))
+NEWS_MIN_INTERVAL = float(os.environ.get("NEWS_MIN_INTERVAL", 60))
+NEWS_MAX_INTERVAL = float(os.environ.get("NEWS_MAX_INTERVAL", 900))
+NEWS_TARGET_PER_POLL = int(os.environ.get("NEWS_TARGET_PER_POLL", 20))
+NEWS_OVERLAP_SECONDS = float(os.environ.get("NEWS_OVERLAP_SECONDS", 60))
+NEWS_WORKERS = int(os.environ.get("NEWS_WORKERS", 4))
+NEWS_WATERMARK_PATH = os.environ.get("NEWS_WATERMARK_PATH", "/data/news_watermarks.json")
+DEDUP_CAPACITY = int(os.environ.get("DEDUP_CAPACITY", 100000))
+DEDUP_ERROR_RATE = float(os.environ.get("DEDUP_ERROR_RATE", 0.001))
+DEDUP_ROTATE_HOURS = float(os.environ.get("DEDUP_ROTATE_HOURS", 72))
+# /data is the news_feed_data volume in docker-compose.yml
+DEDUP_SNAPSHOT_PATH = os.environ.get("DEDUP_SNAPSHOT_PATH", "/data/news_seen.bloom")
 
 # RabbitMQ setup
 def get_rabbitmq_channel():
@@ -20,55 +38,77 @@ def get_rabbitmq_channel():
         try:
             connection = pika.BlockingConnection(pika.ConnectionParameters(host=RABBITMQ_HOST))
             channel = connection.channel()
+            channel.confirm_delivery()
+            channel.exchange_declare(exchange=EXCHANGE_NAME, exchange_type='fanout', durable=True)
             channel.queue_declare(queue=QUEUE_NAME, durable=True)
+            channel.queue_bind(queue=QUEUE_NAME, exchange=EXCHANGE_NAME)
             return connection, channel
         except Exception as e:
             logger.error(f"RabbitMQ connection failed (attempt {attempt+1}): {e}")
             time.sleep(2 ** attempt)
     raise Exception("Failed to connect to RabbitMQ after multiple attempts.")
 
-def fetch_news():
-    params = {
-        'q': QUERY,
-        'apiKey': NEWSAPI_KEY,
-        'language': 'en',
-        'sortBy': 'publishedAt',
-        'pageSize': 10
-    }
-    try:
-        response = requests.get(NEWSAPI_URL, params=params, timeout=10)
-        response.raise_for_status()
-        return response.json().get('articles', [])
-    except Exception as e:
-        logger.error(f"Error fetching news: {e}")
-        return []
-
 def main():
     logger.info("Starting news polling...")
     connection, channel = get_rabbitmq_channel()
+    seen = SeenSet(
+        capacity=DEDUP_CAPACITY,
+        error_rate=DEDUP_ERROR_RATE,
+        rotate_seconds=DEDUP_ROTATE_HOURS * 3600,
+        path=DEDUP_SNAPSHOT_PATH or None
+    )
+    poller = NewsPoller(
+        NEWSAPI_URL, NEWSAPI_KEY, QUERIES,
+        watermark_path=NEWS_WATERMARK_PATH or None,
+        workers=NEWS_WORKERS,
+        page_size=NEWS_PAGE_SIZE,
+        max_pages=NEWS_MAX_PAGES,
+        min_interval=NEWS_MIN_INTERVAL,
+        max_interval=NEWS_MAX_INTERVAL,
+        target_per_poll=NEWS_TARGET_PER_POLL,
+        overlap_seconds=NEWS_OVERLAP_SECONDS
+    )
     while True:
         try:
-            articles = fetch_news()
-            for article in articles:
-                try:
-                    news = {
-                        "source": article.get("source", {}).get("name"),
-                        "title": article.get("title"),
-                        "description": article.get("description"),
-                        "url": article.get("url"),
-                        "publishedAt": article.get("publishedAt")
-                    }
+            articles = poller.poll_due()
+            try:
+                for article in articles:
+                    key = article.get("url") or f"{article.get('title')}|{article.get('publishedAt')}"
+                    if seen.seen(key):
+                        continue
+                    try:
+                        news = {
+                            "source": article.get("source", {}).get("name"),
+                            "title": article.get("title"),
+                            "description": article.get("description"),
+                            "url": article.get("url"),
+                            "publishedAt": article.get("publishedAt")
+                        }
+                    except Exception as e:
+                        logger.error(f"Skipping malformed article: {e}")
+                        continue
+                    # With publisher confirms this returns only once the broker has the article
                     channel.basic_publish(
-                        exchange='',
+                        exchange=EXCHANGE_NAME,
                         routing_key=QUEUE_NAME,
                         body=json.dumps(news),
                         properties=pika.BasicProperties(delivery_mode=2)
                     )
+                    seen.add(key)
                     logger.info(f"Published: {news}")
-                except Exception as e:
-                    logger.error(f"Error processing article: {e}")
-            logger.info("Sleeping for 5 minutes...")
-            time.sleep(300)
+            except Exception:
+                # Watermarks stay where they were, so the next poll fetches
+                # these articles again; the seen-set skips those already out
+                poller.discard()
+                raise
+            poller.commit()
+            seen.snapshot()
+            logger.info(f"Dedup stats: {seen.stats}")
+            poller.report()
+            wait = poller.seconds_until_due()
+            logger.info(f"Next news poll in {wait:.0f}s")
+            # Sleep through process_data_events so heartbeats keep the connection alive
+            connection.sleep(wait)
         except Exception as e:
             logger.error(f"News polling error: {e}. Reconnecting in 10 seconds...")
             time.sleep(10)
@@ -0,0 +1,257 @@
+import json
+import logging
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger("NewsFeedCollector")
+
+
+def make_session(pool_size=8):
+    """Keep-alive session whose connection pool is shared by all polling threads."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _shift_iso(timestamp, seconds):
+    shifted = datetime.fromisoformat(timestamp.replace("Z", "+00:00")) + timedelta(seconds=seconds)
+    return shifted.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"rate limited, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class QueryPoller:
+    """Incremental poller for one NewsAPI ``everything`` query.
+
+    Each poll asks only for articles published since the newest ``publishedAt``
+    seen so far, less ``overlap_seconds`` for articles the API indexes late.
+    The first page reports how many results there are; any further pages are
+    fetched concurrently on ``executor`` until the poll has caught up. Those
+    pages are pinned with ``to`` at the newest article of the first page, so
+    articles arriving meanwhile cannot shift older ones off the last page.
+    A poll fetches at most ``max_pages``, newest first. When a query is
+    further behind, the watermark stays put and the following polls are
+    pinned with ``to`` at the oldest article fetched so far, draining the
+    backlog page by page; once it is drained the watermark moves to the
+    newest article of the whole catch-up. A poll only proposes the new
+    watermark and backlog; they take effect on ``commit``, once the caller
+    has published the articles, and ``discard`` drops them so the same
+    articles are fetched again.
+    The interval to the next poll follows the observed article rate so a poll
+    returns about ``target_per_poll`` articles, clamped to
+    [``min_interval``, ``max_interval``]. On HTTP 429 the poller backs off.
+    """
+
+    def __init__(self, session, url, api_key, query, executor, page_size=100, max_pages=20,
+                 min_interval=60, max_interval=900, target_per_poll=20, overlap_seconds=60, watermark=None):
+        self.session = session
+        self.url = url
+        self.api_key = api_key
+        self.query = query
+        self.executor = executor
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_per_poll = target_per_poll
+        self.overlap_seconds = overlap_seconds
+        self.watermark = watermark
+        # (oldest publishedAt fetched, newest publishedAt fetched) while catching up
+        self.backlog = None
+        # (watermark, backlog) proposed by the last poll, applied by commit
+        self._pending = None
+        self.interval = min_interval
+        self.next_poll = 0.0
+        self.rate = None
+        self._last_poll = None
+        self.stats = {"polls": 0, "requests": 0, "articles": 0, "deferred": 0, "rate_limited": 0, "errors": 0}
+
+    def _fetch_page(self, page, since=None, until=None):
+        params = {
+            'q': self.query,
+            'apiKey': self.api_key,
+            'language': 'en',
+            'sortBy': 'publishedAt',
+            'pageSize': self.page_size,
+            'page': page
+        }
+        if since:
+            params['from'] = since
+        if until:
+            params['to'] = until
+        self.stats["requests"] += 1
+        response = self.session.get(self.url, params=params, timeout=10)
+        if response.status_code == 429:
+            raise RateLimited(float(response.headers.get("Retry-After", self.max_interval)))
+        response.raise_for_status()
+        return response.json()
+
+    def poll(self):
+        """Articles published since the watermark, oldest first.
+
+        The overlap means some articles come back again; the collector's
+        seen-set drops those.
+        """
+        now = time.time()
+        self.stats["polls"] += 1
+        try:
+            since = _shift_iso(self.watermark, -self.overlap_seconds) if self.watermark else None
+            until = self.backlog[0] if self.backlog else None
+            first = self._fetch_page(1, since, until)
+            pages = math.ceil(first.get("totalResults", 0) / self.page_size)
+            behind = False
+            if not self.watermark:
+                # Without a watermark only the newest page is taken, not the whole history
+                pages = 1
+            elif pages > self.max_pages:
+                behind = True
+                # Results still waiting for a later poll, as of this one
+                self.stats["deferred"] = first["totalResults"] - self.max_pages * self.page_size
+                logger.warning(f"News query {self.query!r} is {pages} pages behind; fetching the newest "
+                               f"{self.max_pages} now and the older ones over the next polls")
+                pages = self.max_pages
+            articles = list(first.get("articles", []))
+            if pages > 1 and not until:
+                until = first["articles"][0]["publishedAt"]
+            for result in self.executor.map(lambda page: self._fetch_page(page, since, until), range(2, pages + 1)):
+                articles.extend(result.get("articles", []))
+        except RateLimited as e:
+            self.stats["rate_limited"] += 1
+            self.interval = min(self.max_interval, max(self.interval * 2, e.retry_after))
+            self.next_poll = now + self.interval
+            logger.warning(f"News query {self.query!r} {e}; next poll in {self.interval:.0f}s")
+            return []
+        except Exception as e:
+            self.stats["errors"] += 1
+            self.next_poll = now + self.interval
+            logger.error(f"Error fetching news for {self.query!r}: {e}")
+            return []
+        # Later pages can repeat articles when new ones shift the ordering
+        unique = {}
+        for article in articles:
+            if article.get("publishedAt"):
+                unique[article.get("url") or article.get("title")] = article
+        articles = sorted(unique.values(), key=lambda a: a["publishedAt"])
+        fresh = [a for a in articles if not self.watermark or a["publishedAt"] > self.watermark]
+        watermark, backlog = self.watermark, self.backlog
+        if behind and articles:
+            oldest = articles[0]["publishedAt"]
+            if backlog and oldest >= backlog[0]:
+                # A single second holds more than max_pages of results; step past it
+                oldest = _shift_iso(backlog[0], -1)
+            backlog = (oldest, backlog[1] if backlog else articles[-1]["publishedAt"])
+        elif articles or backlog:
+            newest = max(backlog[1] if backlog else "", articles[-1]["publishedAt"] if articles else "")
+            watermark = max(watermark or "", newest)
+            backlog = None
+            self.stats["deferred"] = 0
+        self._pending = (watermark, backlog)
+        self._adapt(now, len(fresh))
+        self.stats["articles"] += len(fresh)
+        return articles
+
+    def commit(self):
+        """Apply the watermark and backlog proposed by the last poll."""
+        if self._pending is not None:
+            self.watermark, self.backlog = self._pending
+            self._pending = None
+
+    def discard(self):
+        self._pending = None
+        # Fetch the same articles again as soon as the caller is ready
+        self.next_poll = 0.0
+
+    def _adapt(self, now, count):
+        if self._last_poll is not None:
+            observed = count / max(now - self._last_poll, 1e-3)
+            self.rate = observed if self.rate is None else 0.7 * self.rate + 0.3 * observed
+            if self.rate > 0:
+                self.interval = self.target_per_poll / self.rate
+            else:
+                self.interval *= 1.5
+            self.interval = min(self.max_interval, max(self.min_interval, self.interval))
+        self._last_poll = now
+        self.next_poll = now + self.interval
+
+
+class NewsPoller:
+    """Runs one ``QueryPoller`` per query; due queries are polled in parallel."""
+
+    def __init__(self, url, api_key, queries, watermark_path=None, workers=8, **poller_params):
+        self.session = make_session(workers)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        # Page fetches get their own pool so a query waiting on its pages never
+        # starves the pool it is running on
+        self.page_executor = ThreadPoolExecutor(max_workers=workers)
+        self.watermark_path = watermark_path
+        watermarks = self._load_watermarks()
+        self.pollers = [
+            QueryPoller(self.session, url, api_key, query, self.page_executor,
+                        watermark=watermarks.get(query), **poller_params)
+            for query in queries
+        ]
+
+    def poll_due(self):
+        """Poll every query that is due; returns the new articles from all of them."""
+        now = time.time()
+        due = [p for p in self.pollers if p.next_poll <= now]
+        articles = []
+        for result in self.executor.map(lambda p: p.poll(), due):
+            articles.extend(result)
+        return articles
+
+    def commit(self):
+        """Advance and persist every query's watermark; call once the polled
+        articles have all been published."""
+        for p in self.pollers:
+            p.commit()
+        self.save_watermarks()
+
+    def discard(self):
+        """Forget the last polls' progress, so their articles are fetched again."""
+        for p in self.pollers:
+            p.discard()
+
+    def seconds_until_due(self):
+        return max(0.0, min(p.next_poll for p in self.pollers) - time.time())
+
+    def report(self):
+        for p in self.pollers:
+            rate = f"{p.rate * 60:.2f}/min" if p.rate is not None else "n/a"
+            logger.info(f"News query {p.query!r}: interval={p.interval:.0f}s rate={rate} "
+                        f"watermark={p.watermark} backlog={p.backlog} {p.stats}")
+
+    def _load_watermarks(self):
+        if not self.watermark_path:
+            return {}
+        try:
+            with open(self.watermark_path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Could not load news watermarks: {e}")
+            return {}
+
+    def save_watermarks(self):
+        """Persist the committed watermarks."""
+        if not self.watermark_path:
+            return
+        tmp_path = f"{self.watermark_path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({p.query: p.watermark for p in self.pollers if p.watermark}, f)
+            os.replace(tmp_path, self.watermark_path)
+        except Exception as e:
+            logger.error(f"Could not save news watermarks: {e}")
@@ -0,0 +1,116 @@
+import hashlib
+import logging
+import math
+import os
+import struct
+import time
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"SEEN"
+_HEADER = struct.Struct("<4sBIIdII")
+
+
+class SeenSet:
+    """Memory-bounded "have we published this already?" set: a rotating Bloom filter.
+
+    Two generations of ``capacity`` keys each are kept. New keys go into the
+    current generation; lookups check both. Once the current generation is
+    full (or ``rotate_seconds`` old) the previous one is discarded, so a key is
+    remembered for at least one full generation with memory fixed at about
+    2 * capacity * 1.44 * log2(1 / error_rate) bits. False positives (a new
+    key dropped as a duplicate) happen at roughly ``error_rate``; duplicates
+    are never missed while their generation is alive.
+
+    With ``path`` set, ``snapshot()`` writes both generations to disk
+    atomically and they are reloaded on start-up.
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.001, rotate_seconds=86400, path=None):
+        self.capacity = capacity
+        self.rotate_seconds = rotate_seconds
+        self.path = path
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.stats = {"checked": 0, "duplicates": 0, "rotations": 0}
+        self._current = bytearray((self.num_bits + 7) // 8)
+        self._previous = bytearray(len(self._current))
+        self._count = 0
+        self._started = time.time()
+        if path:
+            self.load()
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    @staticmethod
+    def _contains(bits, positions):
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in positions)
+
+    def __contains__(self, key):
+        positions = self._positions(key)
+        return self._contains(self._current, positions) or self._contains(self._previous, positions)
+
+    def seen(self, key):
+        """Count a lookup; True if ``key`` was already added."""
+        self.stats["checked"] += 1
+        if key in self:
+            self.stats["duplicates"] += 1
+            return True
+        return False
+
+    def add(self, key):
+        positions = self._positions(key)
+        if self._contains(self._current, positions):
+            return
+        if self._count >= self.capacity or time.time() - self._started >= self.rotate_seconds:
+            self._rotate()
+        for p in positions:
+            self._current[p >> 3] |= 1 << (p & 7)
+        self._count += 1
+
+    def _rotate(self):
+        self._previous = self._current
+        self._current = bytearray(len(self._previous))
+        self._count = 0
+        self._started = time.time()
+        self.stats["rotations"] += 1
+
+    def snapshot(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, 1, self.num_bits, self.num_hashes, self._started,
+                                     self._count, self.capacity))
+                f.write(self._current)
+                f.write(self._previous)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Could not snapshot seen-set: {e}")
+
+    def load(self):
+        try:
+            with open(self.path, "rb") as f:
+                magic, version, num_bits, num_hashes, started, count, capacity = _HEADER.unpack(
+                    f.read(_HEADER.size))
+                if magic != _MAGIC or version != 1:
+                    raise ValueError("not a seen-set snapshot")
+                if (num_bits, num_hashes, capacity) != (self.num_bits, self.num_hashes, self.capacity):
+                    logger.warning("Seen-set snapshot was made with different sizing, starting empty")
+                    return
+                size = len(self._current)
+                current, previous = f.read(size), f.read(size)
+                if len(current) != size or len(previous) != size:
+                    raise ValueError("truncated seen-set snapshot")
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Could not load seen-set snapshot: {e}")
+            return
+        self._current, self._previous = bytearray(current), bytearray(previous)
+        self._started, self._count = started, count
+        logger.info(f"Loaded seen-set snapshot with {count} keys in the current generation")
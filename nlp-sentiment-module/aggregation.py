@@ -0,0 +1,90 @@
+import math
+from datetime import datetime, timezone
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class SentimentWindows:
+    """Tumbling per-asset windows of sentiment scores.
+
+    Every window keeps the post count, the plain mean and a decay-weighted
+    score in which a post's weight halves every ``half_life_seconds`` before
+    the end of its window, so the most recent posts dominate. A window is
+    emitted once, after its end plus ``grace_seconds`` has passed. With
+    ``sources``, it must also have passed the progress every one of those
+    sources has reported through ``advance``, so a window is not closed while
+    a slower source may still deliver scores for it; ``max_delay_seconds``
+    bounds how long a source that stops advancing can hold windows open.
+    Closure is tracked per asset: only a score for an asset whose window was
+    already emitted is late.
+    """
+
+    def __init__(self, window_seconds=300, half_life_seconds=120, grace_seconds=5, sources=(),
+                 max_delay_seconds=900):
+        self.window_seconds = window_seconds
+        self.decay = math.log(2) / half_life_seconds if half_life_seconds > 0 else 0.0
+        self.grace_seconds = grace_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.stats = {"scores": 0, "late": 0, "windows": 0}
+        # (asset, window_start) -> [count, sum, weight_sum, weighted_sum, sources]
+        self._windows = {}
+        # asset -> end of its newest emitted window
+        self._closed_before = {}
+        # source -> time up to which it has been fully read
+        self.progress = {source: float("-inf") for source in sources}
+
+    def advance(self, source, timestamp):
+        """Record that ``source`` has delivered everything up to ``timestamp``."""
+        self.progress[source] = max(self.progress.get(source, float("-inf")), timestamp)
+
+    def add(self, asset, score, timestamp, source=None):
+        start = timestamp - timestamp % self.window_seconds
+        if start + self.window_seconds <= self._closed_before.get(asset, float("-inf")):
+            # Its window has already been emitted
+            self.stats["late"] += 1
+            return
+        window = self._windows.get((asset, start))
+        if window is None:
+            window = self._windows[(asset, start)] = [0, 0.0, 0.0, 0.0, set()]
+        weight = math.exp(-self.decay * (start + self.window_seconds - timestamp))
+        window[0] += 1
+        window[1] += score
+        window[2] += weight
+        window[3] += weight * score
+        if source:
+            window[4].add(source)
+        self.stats["scores"] += 1
+
+    def flush(self, now=None, force=False):
+        """Signals for every window that has closed (all windows with ``force``), oldest first."""
+        if force:
+            cutoff = float("inf")
+        else:
+            now = now or datetime.now(timezone.utc).timestamp()
+            cutoff = now - self.grace_seconds
+            if self.progress:
+                cutoff = max(min(cutoff, min(self.progress.values()) - self.grace_seconds),
+                             now - self.max_delay_seconds)
+        closed = sorted(k for k in self._windows if k[1] + self.window_seconds <= cutoff)
+        signals = []
+        for asset, start in closed:
+            count, total, weight_sum, weighted_sum, sources = self._windows.pop((asset, start))
+            end = start + self.window_seconds
+            signals.append({
+                "asset": asset,
+                "sentiment_score": weighted_sum / weight_sum,
+                "mean_score": total / count,
+                "count": count,
+                "source": ",".join(sorted(sources)) or "unknown",
+                "window_start": _iso(start),
+                "window_end": _iso(end),
+                "timestamp": _iso(end)
+            })
+            self._closed_before[asset] = max(self._closed_before.get(asset, float("-inf")), end)
+        self.stats["windows"] += len(signals)
+        return signals
+
+    def __len__(self):
+        return len(self._windows)
@@ -0,0 +1,61 @@
+"""Benchmark: serial VADER scoring vs. the process-pool scoring backend.
+
+Usage: python bench_scoring.py [--posts 100000] [--max-workers N] [--chunk-size 256]
+
+Scores a synthetic corpus of social-media-like posts once serially and then
+through VaderBackend with 1..N worker processes, checking that every run
+produces the same scores.
+"""
+import argparse
+import os
+import random
+import time
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from scoring import VaderBackend
+
+WORDS = ("bitcoin eth solana pump dump moon crash rally bullish bearish hodl buy sell "
+         "great terrible amazing awful love hate breakout rug scam profit loss fees "
+         "wallet exchange whales lambo rekt fud fomo dip ath").split()
+
+
+def synthetic_posts(count, seed=12):
+    rng = random.Random(seed)
+    posts = []
+    for _ in range(count):
+        words = rng.choices(WORDS, k=rng.randint(8, 40))
+        if rng.random() < 0.3:
+            words.append(rng.choice(["!!!", ":)", ":(", "$BTC", "$ETH"]))
+        posts.append(" ".join(words))
+    return posts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    args = parser.parse_args()
+
+    posts = synthetic_posts(args.posts)
+    analyzer = SentimentIntensityAnalyzer()
+    start = time.perf_counter()
+    expected = [analyzer.polarity_scores(text) for text in posts]
+    serial = time.perf_counter() - start
+    print(f"{args.posts} posts, {os.cpu_count()} CPUs")
+    print(f"serial:          {serial:7.2f} s  {args.posts / serial:9.0f} posts/s")
+
+    for workers in range(1, args.max_workers + 1):
+        backend = VaderBackend(workers=workers, chunk_size=args.chunk_size)
+        # Warm the pool so process start-up is not part of the measurement
+        backend.score_batch(posts[:args.chunk_size * workers + 1])
+        start = time.perf_counter()
+        scores = backend.score_batch(posts)
+        elapsed = time.perf_counter() - start
+        backend.close()
+        assert scores == expected, f"scores differ with {workers} workers"
+        print(f"{workers:2d} workers:      {elapsed:7.2f} s  {args.posts / elapsed:9.0f} posts/s "
+              f"({serial / elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
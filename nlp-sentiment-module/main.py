@@ -1,12 +1,17 @@
 import os
 import pika
 import json
+from bson import ObjectId
 from pymongo import MongoClient
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import logging
 import time
 import numpy as np
+from collections import OrderedDict, deque
+from aggregation import SentimentWindows
+from scoring import DLBackend, VaderBackend
+from sentiment_cache import SentimentCache
+from tickers import TickerMatcher, load_aliases
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger("NLPSentimentModule")
@@ -17,12 +22,53 @@ MONGODB_HOST = os.environ.get("MONGODB_HOST", "mongodb")
 MONGODB_PORT = int(os.environ.get("MONGODB_PORT", 27017))
 MONGODB_DB = os.environ.get("MONGODB_DB", "raw_data_lake")
 USE_DL_SENTIMENT = os.environ.get("USE_DL_SENTIMENT", "false").lower() == "true"
+SOURCE_COLLECTIONS = ["social_posts", "news_articles"]
+CHECKPOINT_COLLECTION = os.environ.get("SENTIMENT_CHECKPOINT_COLLECTION", "processing_checkpoints")
+CHECKPOINT_PREFIX = "nlp-sentiment-module"
+POLL_INTERVAL = int(os.environ.get("SENTIMENT_POLL_INTERVAL", 300))
+FETCH_BATCH_SIZE = int(os.environ.get("SENTIMENT_FETCH_BATCH_SIZE", 500))
+# Used only when a collection has no checkpoint yet, matching the old 10 minute window
+INITIAL_LOOKBACK_MINUTES = int(os.environ.get("SENTIMENT_INITIAL_LOOKBACK_MINUTES", 10))
+# Posts are read only once their _id is this old, covering text-data-consumer's
+# bulk insert retries (up to ~31 s of backoff) and clock skew between hosts
+ID_SAFETY_LAG_SECONDS = float(os.environ.get("SENTIMENT_ID_SAFETY_LAG_SECONDS", 60))
+TEXT_PROJECTION = {"title": 1, "text": 1, "description": 1, "source": 1, "created_utc": 1, "publishedAt": 1,
+                   "ingested_at": 1}
+SENTIMENT_CACHE_SIZE = int(os.environ.get("SENTIMENT_CACHE_SIZE", 100000))
+SENTIMENT_CACHE_TTL = int(os.environ.get("SENTIMENT_CACHE_TTL", 86400))
+SENTIMENT_CACHE_PATH = os.environ.get("SENTIMENT_CACHE_PATH", "")
+SENTIMENT_WORKERS = int(os.environ.get("SENTIMENT_WORKERS", 0)) or None
+SENTIMENT_CHUNK_SIZE = int(os.environ.get("SENTIMENT_CHUNK_SIZE", 256))
+DL_BATCH_SIZE = int(os.environ.get("DL_SENTIMENT_BATCH_SIZE", 64))
+DL_BATCH_WAIT_MS = int(os.environ.get("DL_SENTIMENT_BATCH_WAIT_MS", 20))
+SENTIMENT_MODE = os.environ.get("SENTIMENT_MODE", "poll").lower()
+SOCIAL_DATA_EXCHANGE = os.environ.get("SOCIAL_DATA_EXCHANGE", "social_data")
+NEWS_DATA_EXCHANGE = os.environ.get("NEWS_DATA_EXCHANGE", "news_data")
+SOCIAL_STREAM_QUEUE = os.environ.get("SENTIMENT_SOCIAL_STREAM_QUEUE", "sentiment_social_stream")
+NEWS_STREAM_QUEUE = os.environ.get("SENTIMENT_NEWS_STREAM_QUEUE", "sentiment_news_stream")
+STREAM_BATCH_SIZE = int(os.environ.get("SENTIMENT_STREAM_BATCH_SIZE", 64))
+STREAM_BATCH_MS = int(os.environ.get("SENTIMENT_STREAM_BATCH_MS", 200))
+STREAM_PREFETCH = int(os.environ.get("SENTIMENT_STREAM_PREFETCH", 512))
+SENTIMENT_STATS_INTERVAL = int(os.environ.get("SENTIMENT_STATS_INTERVAL", 60))
+TICKER_ALIASES_PATH = os.environ.get("TICKER_ALIASES_PATH", "")
+SENTIMENT_WINDOW_SECONDS = int(os.environ.get("SENTIMENT_WINDOW_SECONDS", 300))
+SENTIMENT_HALF_LIFE_SECONDS = float(os.environ.get("SENTIMENT_HALF_LIFE_SECONDS", 120))
+SENTIMENT_WINDOW_GRACE_SECONDS = float(os.environ.get("SENTIMENT_WINDOW_GRACE_SECONDS", 5))
+# Longest a window waits for a collection that cannot be read
+SENTIMENT_WINDOW_MAX_DELAY_SECONDS = float(os.environ.get("SENTIMENT_WINDOW_MAX_DELAY_SECONDS", 900))
+
+_mongo_client = None
 
 # Placeholder for DL model integration
 def load_dl_sentiment_model():
     # from dl_models.sentiment_model import predict_sentiment
     logger.info("[DL] Loading DL-based Sentiment model (stub)")
-    return lambda text: {"compound": float(np.random.uniform(-1, 1))}
+    return lambda texts: [{"compound": float(x)} for x in np.random.uniform(-1, 1, len(texts))]
+
+def make_scoring_backend():
+    if USE_DL_SENTIMENT:
+        return DLBackend(load_dl_sentiment_model(), max_batch=DL_BATCH_SIZE, max_wait_ms=DL_BATCH_WAIT_MS)
+    return VaderBackend(workers=SENTIMENT_WORKERS, chunk_size=SENTIMENT_CHUNK_SIZE)
 
 def get_rabbitmq_channel():
     for attempt in range(5):
@@ -36,55 +82,309 @@ def get_rabbitmq_channel():
             time.sleep(2 ** attempt)
     raise Exception("Failed to connect to RabbitMQ after multiple attempts.")
 
-def fetch_recent_posts(collection_name, minutes=10):
+def get_mongo_db():
+    # One pooled client for the life of the process
+    global _mongo_client
+    if _mongo_client is None:
+        _mongo_client = MongoClient(MONGODB_HOST, MONGODB_PORT, serverSelectionTimeoutMS=5000)
+    return _mongo_client[MONGODB_DB]
+
+def load_checkpoint(collection_name):
+    doc = get_mongo_db()[CHECKPOINT_COLLECTION].find_one({"_id": f"{CHECKPOINT_PREFIX}:{collection_name}"})
+    if doc:
+        return doc["last_id"]
+    since = datetime.utcnow() - timedelta(minutes=INITIAL_LOOKBACK_MINUTES)
+    logger.info(f"No checkpoint for {collection_name}, starting from {since.isoformat()}Z")
+    return ObjectId.from_datetime(since)
+
+def save_checkpoint(collection_name, last_id):
+    get_mongo_db()[CHECKPOINT_COLLECTION].update_one(
+        {"_id": f"{CHECKPOINT_PREFIX}:{collection_name}"},
+        {"$set": {"last_id": last_id, "updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+def settled_before():
+    """Posts whose ``_id`` is older than this are safe to read; see ``fetch_new_posts``."""
+    return datetime.now(timezone.utc) - timedelta(seconds=ID_SAFETY_LAG_SECONDS)
+
+def fetch_new_posts(collection_name, after_id, settled, limit=FETCH_BATCH_SIZE):
+    """Posts inserted after ``after_id``, oldest first, with only the fields scoring needs.
+
+    The watermark is the always-indexed ``_id``. ObjectIds are generated by
+    the writer's client when a batch is first sent, and a retried unordered
+    ``insert_many`` can land documents whose ids are older than ones already
+    stored. Only posts whose ``_id`` is older than ``settled`` (see
+    ``settled_before``) are read, so a post is missed only if its insert lands
+    more than ``ID_SAFETY_LAG_SECONDS`` after its id was generated (or the
+    writer's clock is that far behind). Returns None if MongoDB cannot be read.
+    """
     for attempt in range(5):
         try:
-            client = MongoClient(MONGODB_HOST, MONGODB_PORT, serverSelectionTimeoutMS=5000)
-            db = client[MONGODB_DB]
-            collection = db[collection_name]
-            since = datetime.utcnow() - timedelta(minutes=minutes)
-            return list(collection.find({"created_utc": {"$gte": since.timestamp()}}))
+            collection = get_mongo_db()[collection_name]
+            query = {"_id": {"$gt": after_id, "$lt": ObjectId.from_datetime(settled)}}
+            cursor = collection.find(query, TEXT_PROJECTION).sort("_id", 1).limit(limit)
+            return list(cursor)
         except Exception as e:
             logger.error(f"MongoDB fetch error (attempt {attempt+1}): {e}")
             time.sleep(2 ** attempt)
-    return []
+    return None
 
-def main():
+def publish_signals(channel, signals):
+    """Publish per-asset window signals in one transaction.
+
+    On failure the transaction is rolled back while the channel is still
+    open, so none of the signals (nor acks in the same transaction) are left
+    pending for a later commit, and the error is raised.
+    """
+    if not signals:
+        return
+    try:
+        for signal in signals:
+            channel.basic_publish(
+                exchange='',
+                routing_key=QUEUE_NAME,
+                body=json.dumps(signal),
+                properties=pika.BasicProperties(delivery_mode=2)
+            )
+            logger.debug(f"Published sentiment signal: {signal}")
+        channel.tx_commit()
+    except Exception:
+        if channel.is_open:
+            try:
+                channel.tx_rollback()
+            except Exception as e:
+                logger.error(f"Could not roll back sentiment signals: {e}")
+        raise
+    logger.info(f"Published {len(signals)} windowed sentiment signals for "
+                f"{len({s['asset'] for s in signals})} assets")
+
+class SentimentPipeline:
+    """Ticker matching, cached batch scoring and per-asset windows, shared by
+    the polling and the streaming mode."""
+
+    def __init__(self, sources=()):
+        self.backend = make_scoring_backend()
+        self.cache = SentimentCache(
+            max_entries=SENTIMENT_CACHE_SIZE,
+            ttl_seconds=SENTIMENT_CACHE_TTL,
+            namespace=self.backend.name,
+            path=SENTIMENT_CACHE_PATH or None
+        )
+        self.matcher = TickerMatcher(load_aliases(TICKER_ALIASES_PATH or None))
+        self.windows = SentimentWindows(
+            window_seconds=SENTIMENT_WINDOW_SECONDS,
+            half_life_seconds=SENTIMENT_HALF_LIFE_SECONDS,
+            grace_seconds=SENTIMENT_WINDOW_GRACE_SECONDS,
+            sources=sources,
+            max_delay_seconds=SENTIMENT_WINDOW_MAX_DELAY_SECONDS
+        )
+        self.unmatched = 0
+        # Seconds from a post's own creation time to its score
+        self.latencies = deque(maxlen=10000)
+
+    def process(self, posts, received_at, stream=None):
+        """Score ``posts`` into the windows; ``received_at(post)`` gives the
+        timestamp that places a post in its window. With ``stream``, the
+        windows also learn how far that source has been read. Returns the
+        scored count."""
+        if stream and posts:
+            self.windows.advance(stream, min(max(received_at(post) for post in posts), time.time()))
+        scored = []
+        for post in posts:
+            text = post.get("text") or post.get("description") or ""
+            assets = self.matcher.find(f"{post.get('title') or ''}\n{text}")
+            if not text or not assets:
+                self.unmatched += 1
+                continue
+            scored.append((post, text, assets))
+        sentiments = self.cache.get_many_or_compute([text for _, text, _ in scored], self.backend.score_batch)
+        now = time.time()
+        for (post, _, assets), sentiment in zip(scored, sentiments):
+            for asset in assets:
+                self.windows.add(asset, sentiment["compound"], received_at(post), post.get("source"))
+            created_at = posted_time(post)
+            if created_at is not None:
+                self.latencies.append(now - created_at)
+        return len(scored)
+
+    def report(self):
+        if self.latencies:
+            p50, p95 = np.percentile(self.latencies, [50, 95])
+            logger.info(f"Post-to-score latency: p50={p50:.1f}s p95={p95:.1f}s over {len(self.latencies)} posts")
+        logger.info(f"Sentiment windows: open={len(self.windows)} unmatched_posts={self.unmatched} "
+                    f"{self.windows.stats}")
+        logger.info(f"Sentiment cache: size={len(self.cache)} hit_rate={self.cache.hit_rate():.2%} "
+                    f"{self.cache.stats}")
+        self.cache.save()
+
+def posted_time(post):
+    """Creation time of a post or article as a Unix timestamp, if it carries one."""
+    if post.get("created_utc"):
+        return float(post["created_utc"])
+    if post.get("publishedAt"):
+        try:
+            return datetime.fromisoformat(post["publishedAt"].replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
+def ingest_time(post):
+    """When a stored post was archived: ``ingested_at``, else the insert time
+    encoded in its ``_id``.
+
+    Polled posts are windowed by this rather than by their publish time:
+    NewsAPI indexes articles many minutes after publication, and windowing
+    them by publish time would put them in windows that have already closed.
+    """
+    ingested_at = post.get("ingested_at")
+    if isinstance(ingested_at, datetime):
+        return ingested_at.replace(tzinfo=ingested_at.tzinfo or timezone.utc).timestamp()
+    return post["_id"].generation_time.timestamp()
+
+def run_polling():
     logger.info("Starting sentiment analysis loop...")
-    analyzer = SentimentIntensityAnalyzer()
-    dl_sentiment_predict = load_dl_sentiment_model() if USE_DL_SENTIMENT else None
+    # Posts are windowed by ingest time and windows close on how far the
+    # slowest collection has been read, so news read after social posts in a
+    # cycle still lands in open windows
+    pipeline = SentimentPipeline(sources=SOURCE_COLLECTIONS)
     connection, channel = get_rabbitmq_channel()
+    # Each cycle's signals are published in one transaction, so they are on
+    # the broker before the checkpoints move past their posts
+    channel.tx_select()
+    watermarks = {}
+    # Signals whose transaction was rolled back, published again next cycle
+    unpublished = []
     while True:
         try:
-            posts = fetch_recent_posts("social_posts") + fetch_recent_posts("news_articles")
-            for post in posts:
-                text = post.get("text") or post.get("description") or ""
-                if not text:
-                    continue
-                if USE_DL_SENTIMENT and dl_sentiment_predict:
-                    sentiment = dl_sentiment_predict(text)
-                else:
-                    sentiment = analyzer.polarity_scores(text)
-                signal = {
-                    "asset": post.get("title", "unknown"),
-                    "sentiment_score": sentiment["compound"],
-                    "source": post.get("source", "unknown"),
-                    "timestamp": datetime.utcnow().isoformat() + "Z"
-                }
-                channel.basic_publish(
-                    exchange='',
-                    routing_key=QUEUE_NAME,
-                    body=json.dumps(signal),
-                    properties=pika.BasicProperties(delivery_mode=2)
-                )
-                logger.info(f"Published sentiment signal: {signal}")
-            time.sleep(300)
+            for collection_name in SOURCE_COLLECTIONS:
+                if collection_name not in watermarks:
+                    watermarks[collection_name] = load_checkpoint(collection_name)
+                settled = settled_before()
+                while True:
+                    posts = fetch_new_posts(collection_name, watermarks[collection_name], settled)
+                    if posts is None:
+                        break
+                    if posts:
+                        scored = pipeline.process(posts, ingest_time, stream=collection_name)
+                        watermarks[collection_name] = posts[-1]["_id"]
+                        logger.info(f"Scored {scored} of {len(posts)} new documents from {collection_name}")
+                    if len(posts) < FETCH_BATCH_SIZE:
+                        # Everything this collection archived before `settled` has been read
+                        pipeline.windows.advance(collection_name, settled.timestamp())
+                        break
+            # Flushed once per cycle, after every collection has been read; scores
+            # in still-open windows are lost on a crash
+            unpublished.extend(pipeline.windows.flush())
+            publish_signals(channel, unpublished)
+            unpublished = []
+            for collection_name, last_id in watermarks.items():
+                save_checkpoint(collection_name, last_id)
+            pipeline.report()
+            time.sleep(POLL_INTERVAL)
         except Exception as e:
             logger.error(f"Sentiment loop error: {e}")
             time.sleep(10)
+            if connection.is_closed:
+                connection, channel = get_rabbitmq_channel()
+                channel.tx_select()
+
+def post_key(post):
+    if post.get("id"):
+        return f"{post.get('kind')}:{post['id']}"
+    return post.get("url") or post.get("title")
+
+def run_streaming(pipeline=None, unpublished=None, scored=None):
+    """Score posts straight off the collectors' fanout exchanges.
+
+    Each exchange feeds both text-data-consumer's archive queue and a queue of
+    our own, so MongoDB archiving carries on in parallel. Deliveries are
+    scored in micro-batches; window signals and the acks for the batch are
+    committed in one channel transaction. If that transaction fails, the
+    signals are kept in ``unpublished`` and published with the next batch
+    after reconnecting. The batch's posts are redelivered, but their scores
+    are already in the windows, so redelivered posts listed in ``scored``
+    (the keys of recently scored posts) are acked without scoring them again.
+    """
+    logger.info(f"Starting streaming sentiment from {SOCIAL_DATA_EXCHANGE} and {NEWS_DATA_EXCHANGE}...")
+    pipeline = pipeline or SentimentPipeline()
+    unpublished = [] if unpublished is None else unpublished
+    scored = OrderedDict() if scored is None else scored
+    connection, channel = get_rabbitmq_channel()
+    for exchange, queue in ((SOCIAL_DATA_EXCHANGE, SOCIAL_STREAM_QUEUE), (NEWS_DATA_EXCHANGE, NEWS_STREAM_QUEUE)):
+        channel.exchange_declare(exchange=exchange, exchange_type='fanout', durable=True)
+        channel.queue_declare(queue=queue, durable=True)
+        channel.queue_bind(queue=queue, exchange=exchange)
+    channel.tx_select()
+    pending = []
+    last_report = time.monotonic()
+
+    def flush():
+        nonlocal pending
+        acked = False
+        if pending:
+            batch, pending = pending, []
+            received = time.time()
+            posts = [post for post, _ in batch if post is not None]
+            pipeline.process(posts, lambda post: received)
+            for post in posts:
+                scored[post_key(post)] = True
+            # Enough to cover every delivery that can be unacked when a transaction fails
+            while len(scored) > 2 * STREAM_PREFETCH:
+                scored.popitem(last=False)
+            channel.basic_ack(delivery_tag=batch[-1][1], multiple=True)
+            acked = True
+        unpublished.extend(pipeline.windows.flush())
+        if unpublished:
+            publish_signals(channel, unpublished)
+            unpublished.clear()
+        elif acked:
+            channel.tx_commit()
+
+    def on_text_message(ch, method, properties, body):
+        try:
+            post = json.loads(body)
+        except Exception as e:
+            logger.error(f"Skipping undecodable text message: {e}")
+            post = None
+        if post is not None and method.redelivered and post_key(post) in scored:
+            # Scored before its ack was rolled back; only the ack is still owed
+            post = None
+        pending.append((post, method.delivery_tag))
+        if len(pending) >= STREAM_BATCH_SIZE:
+            flush()
+
+    def on_timer():
+        nonlocal last_report
+        flush()
+        if time.monotonic() - last_report >= SENTIMENT_STATS_INTERVAL:
+            pipeline.report()
+            last_report = time.monotonic()
+        connection.call_later(STREAM_BATCH_MS / 1000.0, on_timer)
+
+    connection.call_later(STREAM_BATCH_MS / 1000.0, on_timer)
+    channel.basic_qos(prefetch_count=STREAM_PREFETCH)
+    channel.basic_consume(queue=SOCIAL_STREAM_QUEUE, on_message_callback=on_text_message)
+    channel.basic_consume(queue=NEWS_STREAM_QUEUE, on_message_callback=on_text_message)
+    try:
+        channel.start_consuming()
+    except Exception as e:
+        logger.error(f"Streaming sentiment error: {e}")
+        try:
+            # Unacked deliveries are only redelivered once this connection is gone
+            connection.close()
+        except Exception:
+            pass
+        time.sleep(10)
+        run_streaming(pipeline, unpublished, scored)
+
+def main():
+    if SENTIMENT_MODE == "stream":
+        return run_streaming()
+    return run_polling()
 
 if __name__ == "__main__":
     try:
         main()
     except KeyboardInterrupt:
-        logger.info("Stopped.") 
\ No newline at end of file
+        logger.info("Stopped.")
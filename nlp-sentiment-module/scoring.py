@@ -0,0 +1,117 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+logger = logging.getLogger("NLPSentimentModule")
+
+_analyzer = None
+
+
+def _init_vader():
+    global _analyzer
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    _analyzer = SentimentIntensityAnalyzer()
+
+
+def _score_chunk(texts):
+    if _analyzer is None:
+        _init_vader()
+    return [_analyzer.polarity_scores(text) for text in texts]
+
+
+class VaderBackend:
+    """Scores texts with VADER, mapping chunks over a process pool.
+
+    Batches no larger than one chunk are scored in-process, where the pool's
+    pickling overhead would outweigh the parallelism.
+    """
+
+    name = "vader"
+
+    def __init__(self, workers=None, chunk_size=256):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._pool = None
+        if self.workers > 1:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_vader)
+
+    def score_batch(self, texts):
+        if self._pool is None or len(texts) <= self.chunk_size:
+            return _score_chunk(texts)
+        chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+        scores = []
+        for chunk_scores in self._pool.map(_score_chunk, chunks):
+            scores.extend(chunk_scores)
+        return scores
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+
+
+class DLBackend:
+    """Micro-batched inference for a model that scores a list of texts at once.
+
+    Texts from any caller are queued; a worker thread runs ``predict_batch`` as
+    soon as ``max_batch`` texts are waiting or ``max_wait_ms`` has passed since
+    the first one arrived.
+    """
+
+    name = "dl"
+
+    def __init__(self, predict_batch, max_batch=64, max_wait_ms=20):
+        self.predict_batch = predict_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.stats = {"batches": 0, "texts": 0}
+        self._pending = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, text):
+        future = Future()
+        self._pending.put((text, future))
+        return future
+
+    def score_batch(self, texts):
+        futures = [self.submit(text) for text in texts]
+        return [future.result() for future in futures]
+
+    def close(self):
+        self._pending.put(None)
+
+    def _run(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._pending.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._pending.put(None)
+                    break
+                batch.append(item)
+            texts = [text for text, _ in batch]
+            try:
+                results = list(self.predict_batch(texts))
+                if len(results) != len(batch):
+                    raise ValueError(f"model returned {len(results)} results for {len(batch)} texts")
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+                self.stats["batches"] += 1
+                self.stats["texts"] += len(batch)
+            except Exception as e:
+                logger.error(f"DL batch inference failed for {len(batch)} texts: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
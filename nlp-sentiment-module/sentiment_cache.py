@@ -0,0 +1,139 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger("NLPSentimentModule")
+
+_URL = re.compile(r"https?://\S+|www\.\S+")
+# Bumped whenever normalize_text changes, so persisted keys from an older
+# normalization can never match a text they were not scored for
+_KEY_VERSION = 2
+
+
+def normalize_text(text):
+    """Canonical form used for cache keys: reposts that differ only in
+    whitespace or links map to the same key. Case, punctuation and emoticons
+    are kept, since VADER scores "GREAT!!! :)" higher than "great"."""
+    return " ".join(_URL.sub(" ", text).split())
+
+
+class SentimentCache:
+    """Memoizes sentiment scores by a hash of the normalized text.
+
+    Entries live for ``ttl_seconds`` and the least recently used ones are
+    evicted beyond ``max_entries``. ``namespace`` (e.g. the model name) is part
+    of every key so scores from different models never mix. With ``path`` set
+    the cache is loaded at start-up and written back by ``save()``.
+    """
+
+    def __init__(self, max_entries=100000, ttl_seconds=86400, namespace="", path=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+        self.path = path
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+        self._entries = OrderedDict()
+        if path:
+            self.load()
+
+    def key(self, text):
+        normalized = normalize_text(text)
+        return hashlib.blake2b(f"{_KEY_VERSION}\0{self.namespace}\0{normalized}".encode("utf-8"), digest_size=16).hexdigest()
+
+    def get_or_compute(self, text, compute):
+        key = self.key(text)
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return value
+            del self._entries[key]
+            self.stats["expirations"] += 1
+        self.stats["misses"] += 1
+        value = compute(text)
+        self._entries[key] = (now + self.ttl_seconds, value)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+        return value
+
+    def get_many_or_compute(self, texts, compute_batch):
+        """Batch version of ``get_or_compute``: misses are deduplicated by key and
+        scored with a single ``compute_batch(texts)`` call."""
+        now = time.time()
+        keys = [self.key(text) for text in texts]
+        results = [None] * len(texts)
+        missing = {}
+        for i, key in enumerate(keys):
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    results[i] = value
+                    continue
+                del self._entries[key]
+                self.stats["expirations"] += 1
+            if key in missing:
+                # Duplicate within the batch: scored once, counted as a hit
+                self.stats["hits"] += 1
+            else:
+                self.stats["misses"] += 1
+                missing[key] = i
+        if missing:
+            scores = compute_batch([texts[i] for i in missing.values()])
+            for key, value in zip(missing, scores):
+                self._entries[key] = (now + self.ttl_seconds, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+            computed = dict(zip(missing, scores))
+            for i, key in enumerate(keys):
+                if results[i] is None:
+                    results[i] = computed[key]
+        return results
+
+    def hit_rate(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def save(self):
+        if not self.path:
+            return
+        now = time.time()
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                for key, (expires_at, value) in self._entries.items():
+                    if expires_at > now:
+                        f.write(json.dumps([key, expires_at, value]) + "\n")
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Could not save sentiment cache: {e}")
+
+    def load(self):
+        now = time.time()
+        try:
+            with open(self.path, "r") as f:
+                for line in f:
+                    key, expires_at, value = json.loads(line)
+                    if expires_at > now:
+                        self._entries[key] = (expires_at, value)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Could not load sentiment cache: {e}")
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        logger.info(f"Loaded {len(self._entries)} cached sentiment scores")
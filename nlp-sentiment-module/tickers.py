@@ -0,0 +1,105 @@
+import json
+import logging
+from collections import deque
+
+logger = logging.getLogger("NLPSentimentModule")
+
+# Alias -> canonical trading symbol. Aliases are matched case-insensitively on
+# word boundaries; the symbol itself, its base asset and the cashtag ($BTC)
+# are added for every ticker automatically.
+DEFAULT_ALIASES = {
+    "BTCUSDT": ["btc", "bitcoin", "xbt"],
+    "ETHUSDT": ["eth", "ether", "ethereum"],
+    "SOLUSDT": ["sol", "solana"],
+    "BNBUSDT": ["bnb", "binance coin"],
+    "XRPUSDT": ["xrp", "ripple"],
+    "ADAUSDT": ["ada", "cardano"],
+    "DOGEUSDT": ["doge", "dogecoin"],
+    "AVAXUSDT": ["avax", "avalanche"],
+    "DOTUSDT": ["polkadot"],
+    "LINKUSDT": ["chainlink"],
+    "LTCUSDT": ["ltc", "litecoin"],
+    "MATICUSDT": ["matic", "polygon"],
+}
+
+
+def load_aliases(path=None):
+    """Alias table from a JSON file of {symbol: [aliases]}, or the defaults."""
+    if not path:
+        return DEFAULT_ALIASES
+    with open(path, "r") as f:
+        aliases = json.load(f)
+    logger.info(f"Loaded ticker aliases for {len(aliases)} symbols from {path}")
+    return aliases
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+
+class TickerMatcher:
+    """Aho-Corasick automaton mapping free text to the canonical symbols it mentions.
+
+    All aliases are found in a single pass over the text regardless of how
+    many there are. A match only counts when it is not part of a longer word,
+    so "sol" matches "SOL pumps" but not "solid".
+    """
+
+    def __init__(self, aliases=None):
+        aliases = DEFAULT_ALIASES if aliases is None else aliases
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for symbol, names in aliases.items():
+            base = symbol[:-4] if symbol.endswith("USDT") else symbol
+            for name in set(n.lower() for n in list(names) + [symbol, base, f"${base}"]):
+                self._add(name, symbol)
+        self._build()
+
+    def _add(self, pattern, symbol):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(pattern), symbol))
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                if self._fail[nxt] == nxt:
+                    self._fail[nxt] = 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text):
+        """Set of symbols mentioned in ``text``."""
+        text = text.lower()
+        found = set()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        last = len(text) - 1
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            if i < last and _is_word_char(text[i + 1]):
+                continue
+            for length, symbol in out[state]:
+                start = i - length + 1
+                if start == 0 or not _is_word_char(text[start - 1]) or text[start] == "$":
+                    found.add(symbol)
+        return found
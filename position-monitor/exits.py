@@ -0,0 +1,25 @@
+# Stop-loss / take-profit checks shared by the position monitor and the
+# backtester. Work on scalar or numpy-array prices; the stop-loss wins when
+# both are hit.
+
+
+def exit_hits(side, price, stop_loss, take_profit):
+    """(stop-loss hit, take-profit hit) for a position at ``price``."""
+    if side == "LONG":
+        return price <= stop_loss, price >= take_profit
+    if side == "SHORT":
+        return price >= stop_loss, price <= take_profit
+    return False, False
+
+
+def exit_status(side, price, stop_loss, take_profit):
+    sl_hit, tp_hit = exit_hits(side, price, stop_loss, take_profit)
+    if sl_hit:
+        return "CLOSED_SL"
+    if tp_hit:
+        return "CLOSED_TP"
+    return "OPEN"
+
+
+def position_pnl(side, entry, price, size):
+    return (price - entry) * size if side == "LONG" else (entry - price) * size
@@ -4,6 +4,7 @@ import os
 import time
 import logging
 import requests
+from exits import exit_status, position_pnl
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger("PositionMonitor")
@@ -70,19 +71,12 @@ def main():
                     logger.warning(f"Skipping PnL update for {asset} due to missing price.")
                     updated_positions.append(pos)
                     continue
-                pnl = (current_price - entry) * size if pos.get("side") == "LONG" else (entry - current_price) * size
+                pnl = position_pnl(pos.get("side"), entry, current_price, size)
                 pos_update = pos.copy()
                 pos_update["current_price"] = current_price
                 pos_update["pnl"] = pnl
-                closed = False
-                if (pos.get("side") == "LONG" and current_price <= stop_loss) or (pos.get("side") == "SHORT" and current_price >= stop_loss):
-                    pos_update["status"] = "CLOSED_SL"
-                    closed = True
-                elif (pos.get("side") == "LONG" and current_price >= take_profit) or (pos.get("side") == "SHORT" and current_price <= take_profit):
-                    pos_update["status"] = "CLOSED_TP"
-                    closed = True
-                else:
-                    pos_update["status"] = "OPEN"
+                pos_update["status"] = exit_status(pos.get("side"), current_price, stop_loss, take_profit)
+                closed = pos_update["status"] != "OPEN"
                 try:
                     channel.basic_publish(
                         exchange='',
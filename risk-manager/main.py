@@ -3,6 +3,7 @@ import json
 import os
 import logging
 import time
+from sizing import size_position
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger("RiskManager")
@@ -12,6 +13,8 @@ ORDER_QUEUE = os.environ.get("RAW_ORDER_QUEUE", "raw_orders")
 RISK_QUEUE = os.environ.get("RISK_CHECKED_ORDER_QUEUE", "risk_checked_orders")
 CAPITAL = float(os.environ.get("CAPITAL", 10000))
 RISK_PER_TRADE = float(os.environ.get("RISK_PER_TRADE", 0.01))
+STOP_LOSS_PCT = float(os.environ.get("STOP_LOSS_PCT", 0.05))
+TAKE_PROFIT_PCT = float(os.environ.get("TAKE_PROFIT_PCT", 0.10))
 
 
 def get_rabbitmq_channel():
@@ -35,17 +38,9 @@ def main():
     def callback(ch, method, properties, body):
         try:
             order = json.loads(body)
-            risk_amount = CAPITAL * RISK_PER_TRADE
             entry = 100
-            stop_loss = 95
-            take_profit = 110
-            position_size = risk_amount / abs(entry - stop_loss)
-            order.update({
-                "position_size": position_size,
-                "entry": entry,
-                "stop_loss": stop_loss,
-                "take_profit": take_profit
-            })
+            order.update(size_position(entry, CAPITAL, RISK_PER_TRADE, STOP_LOSS_PCT, TAKE_PROFIT_PCT,
+                                       side=order.get("side", "LONG")))
             channel.basic_publish(
                 exchange='',
                 routing_key=RISK_QUEUE,
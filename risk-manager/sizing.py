@@ -0,0 +1,19 @@
+# Fixed-fractional position sizing shared by the risk manager and the
+# backtester. Works on scalar or numpy-array entry prices.
+
+STOP_LOSS_PCT = 0.05
+TAKE_PROFIT_PCT = 0.10
+
+
+def size_position(entry, capital, risk_per_trade, stop_loss_pct=STOP_LOSS_PCT,
+                  take_profit_pct=TAKE_PROFIT_PCT, side="LONG"):
+    """Stop-loss and take-profit levels, and a size that loses ``capital * risk_per_trade`` at the stop."""
+    direction = 1 if side == "LONG" else -1
+    stop_loss = entry - direction * entry * stop_loss_pct
+    take_profit = entry + direction * entry * take_profit_pct
+    return {
+        "position_size": capital * risk_per_trade / abs(entry - stop_loss),
+        "entry": entry,
+        "stop_loss": stop_loss,
+        "take_profit": take_profit
+    }
@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+
+def default_align_seconds():
+    """``AGG_ALIGN_SECONDS``, else derived from nlp-sentiment-module's settings.
+
+    A sentiment signal is stamped with the end of its window, which is
+    published on the first poll after every text source has been read past it,
+    at most ``SENTIMENT_WINDOW_MAX_DELAY_SECONDS`` later. The latest window
+    then stays current for another window. A TA signal and the freshest
+    sentiment can therefore be this far apart in event time.
+    """
+    if os.environ.get("AGG_ALIGN_SECONDS"):
+        return float(os.environ["AGG_ALIGN_SECONDS"])
+    return (float(os.environ.get("SENTIMENT_WINDOW_SECONDS", 300))
+            + float(os.environ.get("SENTIMENT_WINDOW_MAX_DELAY_SECONDS", 900))
+            + float(os.environ.get("SENTIMENT_POLL_INTERVAL", 300)))
+
+
+def signal_time(signal, default):
+    """Event time of a signal (its ISO ``timestamp``) as a Unix timestamp, else ``default``."""
+    value = signal.get("timestamp")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            pass
+    return default
+
+
+class SignalAggregator:
+    """Latest TA and sentiment signal per asset, combined on arrival.
+
+    ``update`` stores a signal and returns an aggregated signal only when the
+    new signal completes a usable pair: the other kind is present, neither is
+    older than its staleness limit, and their event times are at most
+    ``align_seconds`` apart. Kinds in ``age_from_arrival`` have their age
+    counted from when they arrived rather than from their event time: a
+    sentiment signal is stamped with the end of its window, which only closes
+    once the slowest text source has caught up, so it is routinely older than
+    a TA signal on arrival without being stale. Nothing is re-emitted until another signal
+    arrives. Assets without an update for ``evict_after`` seconds are dropped
+    by ``evict``. All state changes happen under ``lock``; callers publish the
+    returned signal after the lock is released.
+    """
+
+    KINDS = ("ta", "sentiment")
+
+    def __init__(self, ta_max_age=300, sentiment_max_age=900, align_seconds=600, evict_after=3600,
+                 age_from_arrival=("sentiment",)):
+        self.max_age = {"ta": ta_max_age, "sentiment": sentiment_max_age}
+        self.age_from_arrival = set(age_from_arrival)
+        self.align_seconds = align_seconds
+        self.evict_after = evict_after
+        self.lock = threading.Lock()
+        # asset -> {"ta": (signal, event_time, arrival), "sentiment": (...), "updated": arrival}
+        self.assets = {}
+        self.stats = {"signals": 0, "emitted": 0, "unchanged": 0, "incomplete": 0,
+                      "stale": 0, "misaligned": 0, "evicted": 0}
+
+    def update(self, kind, asset, signal, now=None):
+        now = time.time() if now is None else now
+        event_time = signal_time(signal, now)
+        with self.lock:
+            self.stats["signals"] += 1
+            state = self.assets.setdefault(asset, {})
+            previous = state.get(kind)
+            state[kind] = (signal, event_time, now)
+            state["updated"] = now
+            if previous is not None and previous[0] == signal:
+                # Redelivery of the signal we already combined
+                self.stats["unchanged"] += 1
+                return None
+            other_kind = "sentiment" if kind == "ta" else "ta"
+            other = state.get(other_kind)
+            if other is None:
+                self.stats["incomplete"] += 1
+                return None
+            other_signal, other_time, other_arrival = other
+            if self._age(kind, event_time, now, now) > self.max_age[kind] or \
+                    self._age(other_kind, other_time, other_arrival, now) > self.max_age[other_kind]:
+                self.stats["stale"] += 1
+                return None
+            if abs(event_time - other_time) > self.align_seconds:
+                self.stats["misaligned"] += 1
+                return None
+            self.stats["emitted"] += 1
+            ta, sentiment = (signal, other_signal) if kind == "ta" else (other_signal, signal)
+        return {
+            "asset": asset,
+            "ta": ta,
+            "sentiment": sentiment,
+            "trigger": kind,
+            "timestamp": now
+        }
+
+    def _age(self, kind, event_time, arrival, now):
+        return now - (arrival if kind in self.age_from_arrival else event_time)
+
+    def evict(self, now=None):
+        now = time.time() if now is None else now
+        with self.lock:
+            expired = [asset for asset, state in self.assets.items() if now - state["updated"] > self.evict_after]
+            for asset in expired:
+                del self.assets[asset]
+            self.stats["evicted"] += len(expired)
+        return expired
+
+    def snapshot(self):
+        """Copy of the per-asset state that later updates will not touch.
+
+        Stored signals are never mutated, so copying each asset's dict under
+        the lock is enough; serializing the copy can then happen elsewhere.
+        """
+        with self.lock:
+            return {asset: dict(state) for asset, state in self.assets.items()}
+
+    def restore(self, assets, now=None):
+        """Load state from ``snapshot``, dropping assets ``evict`` would already drop."""
+        now = time.time() if now is None else now
+        with self.lock:
+            for asset, state in assets.items():
+                if now - state["updated"] <= self.evict_after:
+                    self.assets[asset] = state
+        return len(self.assets)
+
+    def __len__(self):
+        return len(self.assets)
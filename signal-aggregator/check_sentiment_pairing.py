@@ -0,0 +1,99 @@
+"""Check that nlp-sentiment-module's windowed signals pair with TA signals here.
+
+Usage: python check_sentiment_pairing.py [--hours 6]
+
+Replays a simulated timeline through the real SentimentWindows and
+SignalAggregator, with their default settings: social posts are archived
+continuously, news articles (published well before they are archived)
+every few minutes, the sentiment module polls both collections every
+SENTIMENT_POLL_INTERVAL and publishes the windows that close, and ta-module
+publishes an RSI signal per bar. It runs with both collections readable and
+with the news collection unreadable, so windows only close through
+SENTIMENT_WINDOW_MAX_DELAY_SECONDS, and fails if no pair is emitted or any
+score is dropped as late.
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timezone
+from aggregator import SignalAggregator, default_align_seconds
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "nlp-sentiment-module"))
+from aggregation import SentimentWindows  # noqa: E402
+
+SOURCES = ["social_posts", "news_articles"]
+ASSETS = ["BTCUSDT", "ETHUSDT"]
+POLL_INTERVAL = float(os.environ.get("SENTIMENT_POLL_INTERVAL", 300))
+ID_SAFETY_LAG = float(os.environ.get("SENTIMENT_ID_SAFETY_LAG_SECONDS", 60))
+BAR_SECONDS = int(os.environ.get("TA_BAR_SECONDS", 60))
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def simulate(hours, news_readable):
+    windows = SentimentWindows(
+        window_seconds=float(os.environ.get("SENTIMENT_WINDOW_SECONDS", 300)),
+        half_life_seconds=float(os.environ.get("SENTIMENT_HALF_LIFE_SECONDS", 120)),
+        grace_seconds=float(os.environ.get("SENTIMENT_WINDOW_GRACE_SECONDS", 5)),
+        sources=SOURCES,
+        max_delay_seconds=float(os.environ.get("SENTIMENT_WINDOW_MAX_DELAY_SECONDS", 900))
+    )
+    aggregator = SignalAggregator(
+        ta_max_age=float(os.environ.get("AGG_TA_MAX_AGE", 300)),
+        sentiment_max_age=float(os.environ.get("AGG_SENTIMENT_MAX_AGE", 900)),
+        align_seconds=default_align_seconds()
+    )
+    start = 1_700_000_000 - 1_700_000_000 % 3600
+    archived = []  # (ingest time, collection, asset, score)
+    next_poll = start + POLL_INTERVAL
+    read_up_to = {source: start for source in SOURCES}
+    ta_signals = paired = 0
+    for now in range(start, start + int(hours * 3600)):
+        if now % 30 == 0:
+            archived.append((now, "social_posts", ASSETS[(now // 30) % len(ASSETS)], 0.3))
+        if now % 600 == 0:
+            # NewsAPI returns articles 20-40 minutes after publication; polled
+            # posts are windowed by when they were archived
+            archived.append((now, "news_articles", ASSETS[0], 0.8))
+        if now % BAR_SECONDS == 0:
+            for asset in ASSETS:
+                signal = {"symbol": asset, "indicator": "RSI", "value": 25.0, "timestamp": _iso(now)}
+                paired += aggregator.update("ta", asset, signal, now) is not None
+                ta_signals += 1
+        if now >= next_poll:
+            next_poll += POLL_INTERVAL
+            settled = now - ID_SAFETY_LAG
+            for source in SOURCES:
+                if source == "news_articles" and not news_readable:
+                    continue
+                for ingested, collection, asset, score in archived:
+                    if collection == source and read_up_to[source] <= ingested < settled:
+                        windows.add(asset, score, ingested, collection)
+                read_up_to[source] = settled
+                windows.advance(source, settled)
+            for signal in windows.flush(now=now):
+                aggregator.update("sentiment", signal["asset"], signal, now)
+    return windows.stats, aggregator.stats, paired / ta_signals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=6)
+    args = parser.parse_args()
+    failed = False
+    for name, news_readable in (("both sources readable", True), ("news collection unreadable", False)):
+        window_stats, agg_stats, paired = simulate(args.hours, news_readable)
+        print(f"{name}: windows={window_stats['windows']} late={window_stats['late']} "
+              f"emitted={agg_stats['emitted']} paired_ta={paired:.0%} stale={agg_stats['stale']} "
+              f"misaligned={agg_stats['misaligned']}")
+        if not agg_stats["emitted"] or window_stats["late"]:
+            failed = True
+    if failed:
+        sys.exit("Sentiment signals did not pair with TA signals")
+    print("Sentiment signals pair with TA signals under the default settings")
+
+
+if __name__ == "__main__":
+    main()
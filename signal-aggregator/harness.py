@@ -0,0 +1,116 @@
+"""Local multi-instance harness for the asset-sharded aggregator.
+
+Usage: python harness.py [--assets 2000] [--signals 400000] [--max-shards 4]
+
+Generates a synthetic TA/sentiment signal stream, routes it with the same
+HashRing the router uses and runs one SignalAggregator process per shard,
+with no broker involved. For each shard count it checks that every asset is
+owned by exactly one shard and that the shards together emit exactly what a
+single instance emits. It then reports wall-clock throughput and the capacity
+implied by the busiest shard's CPU time. Wall-clock throughput only scales
+with shard count up to the number of free CPU cores.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import random
+import time
+from aggregator import SignalAggregator
+from hashring import HashRing
+
+ASSET_FIELDS = {"ta": "symbol", "sentiment": "asset"}
+CHUNK = 1000
+
+
+def synthetic_stream(assets, count, seed=21):
+    rng = random.Random(seed)
+    names = [f"A{i:05d}USDT" for i in range(assets)]
+    start = time.time()
+    stream = []
+    for i in range(count):
+        asset = rng.choice(names)
+        ts = start + i * 0.001
+        if rng.random() < 0.7:
+            stream.append(("ta", json.dumps({"symbol": asset, "indicator": "RSI",
+                                             "value": rng.uniform(0, 100), "timestamp": ts}).encode()))
+        else:
+            stream.append(("sentiment", json.dumps({"asset": asset, "sentiment_score": rng.uniform(-1, 1),
+                                                    "timestamp": ts}).encode()))
+    return stream
+
+
+def run_shard(inbox, results):
+    """One aggregator instance: the same per-message work as the shard callback."""
+    aggregator = SignalAggregator(ta_max_age=1e9, sentiment_max_age=1e9, align_seconds=1e9)
+    emitted = 0
+    digest = 0
+    busy = 0.0
+    while True:
+        chunk = inbox.get()
+        if chunk is None:
+            break
+        began = time.process_time()
+        for kind, body in chunk:
+            signal = json.loads(body)
+            agg = aggregator.update(kind, signal[ASSET_FIELDS[kind]], signal, now=signal["timestamp"])
+            if agg is not None:
+                emitted += 1
+                # Order-independent fingerprint of everything emitted, comparable across shard counts
+                digest ^= int.from_bytes(hashlib.blake2b(json.dumps(agg).encode(), digest_size=8).digest(), "big")
+        busy += time.process_time() - began
+    results.put((set(aggregator.assets), emitted, digest, busy))
+
+
+def run(stream, shards):
+    ring = HashRing(shards)
+    routed = [[] for _ in range(shards)]
+    for kind, body in stream:
+        routed[ring.shard_for(json.loads(body)[ASSET_FIELDS[kind]])].append((kind, body))
+    inboxes = [mp.Queue() for _ in range(shards)]
+    results = mp.Queue()
+    workers = [mp.Process(target=run_shard, args=(inbox, results)) for inbox in inboxes]
+    for worker in workers:
+        worker.start()
+    began = time.perf_counter()
+    for shard, messages in enumerate(routed):
+        for i in range(0, len(messages), CHUNK):
+            inboxes[shard].put(messages[i:i + CHUNK])
+        inboxes[shard].put(None)
+    outcomes = [results.get() for _ in workers]
+    wall = time.perf_counter() - began
+    for worker in workers:
+        worker.join()
+    return outcomes, wall, [len(m) for m in routed]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--assets", type=int, default=2000)
+    parser.add_argument("--signals", type=int, default=400000)
+    parser.add_argument("--max-shards", type=int, default=4)
+    args = parser.parse_args()
+
+    stream = synthetic_stream(args.assets, args.signals)
+    print(f"{args.signals} signals over {args.assets} assets, {os.cpu_count()} CPUs")
+    baseline = None
+    for shards in range(1, args.max_shards + 1):
+        outcomes, wall, sizes = run(stream, shards)
+        owned = [assets for assets, _, _, _ in outcomes]
+        assert sum(len(a) for a in owned) == len(set().union(*owned)), "an asset is owned by two shards"
+        emitted = sum(n for _, n, _, _ in outcomes)
+        digest = 0
+        for _, _, shard_digest, _ in outcomes:
+            digest ^= shard_digest
+        if baseline is None:
+            baseline = (emitted, digest)
+        assert (emitted, digest) == baseline, f"{shards} shards emitted {emitted} signals unlike the single instance"
+        busiest = max(busy for _, _, _, busy in outcomes)
+        print(f"{shards} shard(s): wall {wall:6.2f} s  {args.signals / wall:9.0f} signals/s  "
+              f"busiest shard CPU {busiest:5.2f} s (capacity {args.signals / busiest:9.0f} signals/s)  "
+              f"load {sizes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import bisect
+import hashlib
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hash ring mapping asset keys to shard indexes.
+
+    Each shard owns ``vnodes`` points on the ring, so assets spread evenly and
+    going from N to N+1 shards moves only about 1/(N+1) of them.
+    """
+
+    def __init__(self, shards, vnodes=64):
+        self.shards = shards
+        points = sorted((_hash(f"shard-{shard}#{v}"), shard) for shard in range(shards) for v in range(vnodes))
+        self._points = [p for p, _ in points]
+        self._owners = [shard for _, shard in points]
+        self._cache = {}
+
+    def shard_for(self, key):
+        shard = self._cache.get(key)
+        if shard is None:
+            i = bisect.bisect(self._points, _hash(key)) % len(self._points)
+            if len(self._cache) >= 100000:
+                self._cache.clear()
+            shard = self._cache[key] = self._owners[i]
+        return shard
@@ -1,9 +1,11 @@
 import pika
 import json
-import threading
 import time
 import os
 import logging
+from aggregator import SignalAggregator, default_align_seconds
+from hashring import HashRing
+from snapshot import SnapshotWriter, load_snapshot
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger("SignalAggregator")
@@ -12,9 +14,40 @@ RABBITMQ_HOST = os.environ.get("RABBITMQ_HOST", "rabbitmq")
 TA_QUEUE = os.environ.get("TA_SIGNAL_QUEUE", "ta_signals")
 SENTIMENT_QUEUE = os.environ.get("SENTIMENT_SIGNAL_QUEUE", "sentiment_signals")
 AGG_QUEUE = os.environ.get("AGGREGATED_SIGNAL_QUEUE", "aggregated_signals")
+# A pair is only combined while both signals are fresh and close together in
+# time; sentiment age counts from arrival, since its timestamp is a window end
+TA_MAX_AGE = float(os.environ.get("AGG_TA_MAX_AGE", 300))
+SENTIMENT_MAX_AGE = float(os.environ.get("AGG_SENTIMENT_MAX_AGE", 900))
+ALIGN_SECONDS = default_align_seconds()
+EVICT_AFTER = float(os.environ.get("AGG_EVICT_AFTER", 3600))
+PREFETCH = int(os.environ.get("AGG_PREFETCH", 100))
+STATS_INTERVAL = int(os.environ.get("AGG_STATS_INTERVAL", 60))
+# single: one process consumes both signal queues.
+# router: stateless; forwards each signal to the shard owning its asset.
+# shard: owns the assets that hash to AGG_SHARD_INDEX out of AGG_SHARDS.
+AGG_ROLE = os.environ.get("AGG_ROLE", "single").lower()
+AGG_SHARDS = int(os.environ.get("AGG_SHARDS", 1))
+AGG_SHARD_INDEX = int(os.environ.get("AGG_SHARD_INDEX", 0))
+AGG_VNODES = int(os.environ.get("AGG_VNODES", 64))
+SHARD_EXCHANGE = os.environ.get("AGG_SHARD_EXCHANGE", "signal_shards")
+SHARD_QUEUE_PREFIX = os.environ.get("AGG_SHARD_QUEUE_PREFIX", "signal_shard")
+ASSET_FIELDS = {"ta": "symbol", "sentiment": "asset"}
+# Warm restart: aggregator state is snapshotted periodically and loaded on startup;
+# /data is the signal_aggregator_data volume in docker-compose.yml
+AGG_SNAPSHOT_PATH = os.environ.get(
+    "AGG_SNAPSHOT_PATH",
+    f"/data/aggregator_shard_{AGG_SHARD_INDEX}.snapshot" if AGG_ROLE == "shard" else "/data/aggregator.snapshot"
+)
+AGG_SNAPSHOT_INTERVAL = int(os.environ.get("AGG_SNAPSHOT_INTERVAL", 30))
+# Stored signals became (signal, event_time, arrival); older snapshots are ignored
+SNAPSHOT_META = {"state_format": 2}
 
-latest_signals = {}
-lock = threading.Lock()
+aggregator = SignalAggregator(
+    ta_max_age=TA_MAX_AGE,
+    sentiment_max_age=SENTIMENT_MAX_AGE,
+    align_seconds=ALIGN_SECONDS,
+    evict_after=EVICT_AFTER
+)
 
 def get_rabbitmq_channel():
     for attempt in range(5):
@@ -30,76 +63,141 @@ def get_rabbitmq_channel():
             time.sleep(2 ** attempt)
     raise Exception("Failed to connect to RabbitMQ after multiple attempts.")
 
-def ta_callback(ch, method, properties, body):
+def handle_signal(ch, method, kind, body):
     try:
         signal = json.loads(body)
-        asset = signal.get("symbol", "unknown")
-        with lock:
-            if asset not in latest_signals:
-                latest_signals[asset] = {}
-            latest_signals[asset]["ta"] = signal
-        logger.info(f"Updated TA signal for {asset}: {signal}")
+        asset = signal.get(ASSET_FIELDS[kind], "unknown")
+        agg = aggregator.update(kind, asset, signal)
+        logger.debug(f"Updated {kind} signal for {asset}: {signal}")
+        if agg is not None:
+            # Published outside the aggregator lock, before the triggering signal is acked
+            ch.basic_publish(
+                exchange='',
+                routing_key=AGG_QUEUE,
+                body=json.dumps(agg),
+                properties=pika.BasicProperties(delivery_mode=2)
+            )
+            logger.info(f"Published aggregated signal for {asset} (trigger={kind})")
         ch.basic_ack(delivery_tag=method.delivery_tag)
     except Exception as e:
-        logger.error(f"TA callback error: {e}")
+        logger.error(f"{kind} callback error: {e}")
         ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
 
-def sentiment_callback(ch, method, properties, body):
-    try:
-        signal = json.loads(body)
-        asset = signal.get("asset", "unknown")
-        with lock:
-            if asset not in latest_signals:
-                latest_signals[asset] = {}
-            latest_signals[asset]["sentiment"] = signal
-        logger.info(f"Updated Sentiment signal for {asset}: {signal}")
-        ch.basic_ack(delivery_tag=method.delivery_tag)
-    except Exception as e:
-        logger.error(f"Sentiment callback error: {e}")
+def make_callback(kind):
+    def callback(ch, method, properties, body):
+        handle_signal(ch, method, kind, body)
+    return callback
+
+def shard_queue(index):
+    return f"{SHARD_QUEUE_PREFIX}_{index}"
+
+def declare_shards(channel):
+    channel.exchange_declare(exchange=SHARD_EXCHANGE, exchange_type='direct', durable=True)
+    for index in range(AGG_SHARDS):
+        channel.queue_declare(queue=shard_queue(index), durable=True)
+        channel.queue_bind(queue=shard_queue(index), exchange=SHARD_EXCHANGE, routing_key=str(index))
+
+def make_router_callback(kind, ring, routed):
+    def callback(ch, method, properties, body):
+        try:
+            asset = json.loads(body).get(ASSET_FIELDS[kind], "unknown")
+            shard = ring.shard_for(asset)
+            # The body is forwarded untouched; the signal kind travels as the message type
+            ch.basic_publish(
+                exchange=SHARD_EXCHANGE,
+                routing_key=str(shard),
+                body=body,
+                properties=pika.BasicProperties(delivery_mode=2, type=kind)
+            )
+            routed[shard] += 1
+            ch.basic_ack(delivery_tag=method.delivery_tag)
+        except Exception as e:
+            logger.error(f"{kind} routing error: {e}")
+            ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+    return callback
+
+def shard_callback(ch, method, properties, body):
+    if properties.type not in ASSET_FIELDS:
+        logger.error(f"Dropping shard message with unknown type {properties.type!r}")
         ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+        return
+    handle_signal(ch, method, properties.type, body)
 
-def publisher():
-    _, channel = get_rabbitmq_channel()
-    while True:
-        with lock:
-            for asset, signals in latest_signals.items():
-                if "ta" in signals and "sentiment" in signals:
-                    agg = {
-                        "asset": asset,
-                        "ta": signals["ta"],
-                        "sentiment": signals["sentiment"],
-                        "timestamp": time.time()
-                    }
-                    try:
-                        channel.basic_publish(
-                            exchange='',
-                            routing_key=AGG_QUEUE,
-                            body=json.dumps(agg),
-                            properties=pika.BasicProperties(delivery_mode=2)
-                        )
-                        logger.info(f"Published aggregated signal: {agg}")
-                    except Exception as e:
-                        logger.error(f"Error publishing aggregated signal: {e}")
+def run_router():
+    """Stateless router; several can consume the signal queues side by side."""
+    logger.info(f"Starting signal router over {AGG_SHARDS} shards...")
+    connection, channel = get_rabbitmq_channel()
+    declare_shards(channel)
+    ring = HashRing(AGG_SHARDS, AGG_VNODES)
+    routed = [0] * AGG_SHARDS
+
+    def on_timer():
+        logger.info(f"Routed per shard: {routed}")
+        connection.call_later(STATS_INTERVAL, on_timer)
+
+    connection.call_later(STATS_INTERVAL, on_timer)
+    channel.basic_qos(prefetch_count=PREFETCH)
+    channel.basic_consume(queue=TA_QUEUE, on_message_callback=make_router_callback("ta", ring, routed))
+    channel.basic_consume(queue=SENTIMENT_QUEUE, on_message_callback=make_router_callback("sentiment", ring, routed))
+    try:
+        channel.start_consuming()
+    except Exception as e:
+        logger.error(f"Router error: {e}")
         time.sleep(10)
+        run_router()
+
+def warm_start():
+    """Restore the last snapshot and start the background snapshot writer."""
+    assets = load_snapshot(AGG_SNAPSHOT_PATH, SNAPSHOT_META)
+    if assets:
+        if AGG_ROLE == "shard":
+            # After a reshard, keep only the assets this shard still owns
+            ring = HashRing(AGG_SHARDS, AGG_VNODES)
+            assets = {asset: state for asset, state in assets.items() if ring.shard_for(asset) == AGG_SHARD_INDEX}
+        logger.info(f"Restored {aggregator.restore(assets)} assets from snapshot")
+    return SnapshotWriter(AGG_SNAPSHOT_PATH, SNAPSHOT_META)
 
-def main():
-    logger.info("Starting Signal Aggregator...")
+def main(snapshots=None):
+    if AGG_ROLE == "router":
+        return run_router()
+    logger.info(f"Starting Signal Aggregator (role={AGG_ROLE})...")
+    if snapshots is None:
+        snapshots = warm_start()
     connection, channel = get_rabbitmq_channel()
-    channel.basic_qos(prefetch_count=1)
-    channel.basic_consume(queue=TA_QUEUE, on_message_callback=ta_callback)
-    channel.basic_consume(queue=SENTIMENT_QUEUE, on_message_callback=sentiment_callback)
-    pub_thread = threading.Thread(target=publisher, daemon=True)
-    pub_thread.start()
+    last_report = time.monotonic()
+    last_snapshot = time.monotonic()
+
+    def on_timer():
+        nonlocal last_report, last_snapshot
+        evicted = aggregator.evict()
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} idle assets")
+        if time.monotonic() - last_snapshot >= AGG_SNAPSHOT_INTERVAL:
+            snapshots.submit(aggregator.snapshot())
+            last_snapshot = time.monotonic()
+        if time.monotonic() - last_report >= STATS_INTERVAL:
+            logger.info(f"Aggregator: assets={len(aggregator)} {aggregator.stats} snapshots={snapshots.stats}")
+            last_report = time.monotonic()
+        connection.call_later(10, on_timer)
+
+    connection.call_later(10, on_timer)
+    channel.basic_qos(prefetch_count=PREFETCH)
+    if AGG_ROLE == "shard":
+        declare_shards(channel)
+        channel.basic_consume(queue=shard_queue(AGG_SHARD_INDEX), on_message_callback=shard_callback)
+    else:
+        channel.basic_consume(queue=TA_QUEUE, on_message_callback=make_callback("ta"))
+        channel.basic_consume(queue=SENTIMENT_QUEUE, on_message_callback=make_callback("sentiment"))
     logger.info("Waiting for signals...")
     try:
         channel.start_consuming()
     except Exception as e:
         logger.error(f"Aggregator error: {e}")
         time.sleep(10)
-        main()
+        main(snapshots)
 
 if __name__ == "__main__":
     try:
         main()
     except KeyboardInterrupt:
-        logger.info("Stopped.") 
\ No newline at end of file
+        logger.info("Stopped.")
@@ -0,0 +1,89 @@
+import logging
+import os
+import pickle
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+def load_snapshot(path, meta=None):
+    """State saved by ``SnapshotWriter``, or None when there is no usable snapshot.
+
+    ``meta`` must equal what the snapshot was written with (e.g. indicator
+    parameters), so state built under other settings is never restored.
+    Snapshots are pickles written by this service itself and must not come
+    from anywhere else.
+    """
+    began = time.perf_counter()
+    try:
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Could not load snapshot {path}: {e}")
+        return None
+    if snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("meta") != meta:
+        logger.warning(f"Ignoring snapshot {path} written with other settings")
+        return None
+    age = time.time() - snapshot["created"]
+    logger.info(f"Loaded snapshot {path} ({age:.0f}s old) in {(time.perf_counter() - began) * 1000:.1f} ms")
+    return snapshot["state"]
+
+
+class SnapshotWriter:
+    """Writes state snapshots from a background thread.
+
+    ``submit`` only hands over the state; serialization, the write, fsync and
+    the atomic rename all happen on the writer thread, so the consume path
+    never waits on disk. The caller passes a copy it will not mutate
+    afterwards. If snapshots are submitted faster than they can be written,
+    only the newest one is kept.
+    """
+
+    def __init__(self, path, meta=None):
+        self.path = path
+        self.meta = meta
+        self.stats = {"written": 0, "skipped": 0, "failed": 0, "last_bytes": 0, "last_ms": 0.0}
+        self._pending = None
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, state):
+        with self._cond:
+            if self._pending is not None:
+                self.stats["skipped"] += 1
+            self._pending = (time.time(), state)
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                created, state = self._pending
+                self._pending = None
+            self._write(created, state)
+
+    def _write(self, created, state):
+        began = time.perf_counter()
+        tmp_path = f"{self.path}.tmp"
+        try:
+            data = pickle.dumps({"version": SNAPSHOT_VERSION, "created": created, "meta": self.meta,
+                                 "state": state}, protocol=pickle.HIGHEST_PROTOCOL)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.error(f"Could not write snapshot {self.path}: {e}")
+            return
+        self.stats["written"] += 1
+        self.stats["last_bytes"] = len(data)
+        self.stats["last_ms"] = (time.perf_counter() - began) * 1000
@@ -0,0 +1,83 @@
+import logging
+import re
+
+logger = logging.getLogger("SocialMediaCollector")
+
+DEFAULT_KEYWORDS = ["BTC", "Bitcoin", "ETH", "Ethereum", "Solana", "crypto*", "$BTC", "$ETH"]
+
+
+def load_keywords(path=None):
+    """Keywords from a file with one per line (blank lines and # comments
+    ignored), or the defaults when no path is given."""
+    if not path:
+        return DEFAULT_KEYWORDS
+    with open(path, "r") as f:
+        keywords = [line.split("#", 1)[0].strip() for line in f]
+    keywords = [k for k in keywords if k]
+    logger.info(f"Loaded {len(keywords)} keywords from {path}")
+    return keywords
+
+
+def _trie_pattern(words):
+    """Regex matching any of ``words``, factored by common prefixes so the
+    engine tries each leading character once instead of once per word."""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        optional = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")" + ("?" if optional else "")
+
+    return build(trie) if words else "(?!)"
+
+
+class KeywordMatcher:
+    """All keywords compiled once into a word-boundary regex over lowercased text.
+
+    Keywords only match as whole words, so "ETH" does not fire on "method";
+    a keyword ending in "*" matches as a word prefix instead ("crypto*" also
+    matches "cryptocurrency"). Every keyword also matches as a cashtag ("BTC"
+    matches "$BTC"), while a keyword written as a cashtag ("$SOL") matches
+    only with its "$". Most posts mention no keyword at all, so a single-pass
+    substring scan for all keywords at once rejects them before the regex
+    runs.
+    """
+
+    def __init__(self, keywords):
+        alternatives = set()
+        cores = set()
+        for keyword in keywords:
+            keyword = keyword.strip().lower()
+            prefix = keyword.endswith("*")
+            keyword = keyword.rstrip("*")
+            if not keyword.lstrip("$"):
+                continue
+            alternative = re.escape(keyword) if keyword.startswith("$") else r"\$?" + re.escape(keyword)
+            alternatives.add(alternative + (r"\w*" if prefix else ""))
+            cores.add(keyword.lstrip("$"))
+        # Longest first so the alternation prefers "bitcoin cash" over "bitcoin"
+        pattern = "|".join(sorted(alternatives, key=len, reverse=True)) or "(?!)"
+        self._regex = re.compile(rf"(?<![\w$])(?:{pattern})(?!\w)")
+        self._prefilter = re.compile(_trie_pattern(sorted(cores)))
+
+    def search(self, *texts):
+        """True if any keyword occurs in any of ``texts``."""
+        for text in texts:
+            if not text:
+                continue
+            text = text.lower()
+            if self._prefilter.search(text) and self._regex.search(text):
+                return True
+        return False
+
+    def findall(self, text):
+        return self._regex.findall((text or "").lower())
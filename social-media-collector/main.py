@@ -3,7 +3,12 @@ import pika
 import json
 import os
 import logging
+import queue
+import threading
 import time
+from collections import Counter
+from keywords import KeywordMatcher, load_keywords
+from seen_set import SeenSet
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger("SocialMediaCollector")
@@ -13,7 +18,28 @@ REDDIT_CLIENT_SECRET = os.environ.get("REDDIT_CLIENT_SECRET")
 REDDIT_USER_AGENT = os.environ.get("REDDIT_USER_AGENT", "crypto-bot/0.1")
 RABBITMQ_HOST = os.environ.get("RABBITMQ_HOST", "rabbitmq")
 QUEUE_NAME = os.environ.get("SOCIAL_DATA_QUEUE", "raw_social_data")
-KEYWORDS = ["BTC", "Bitcoin", "ETH", "Ethereum", "Solana", "crypto", "$BTC", "$ETH"]
+# Fanout exchange: text-data-consumer archives from QUEUE_NAME while other
+# services (streaming sentiment) bind queues of their own
+EXCHANGE_NAME = os.environ.get("SOCIAL_DATA_EXCHANGE", "social_data")
+KEYWORDS_PATH = os.environ.get("SOCIAL_KEYWORDS_PATH", "")
+# Each subreddit gets its own submission stream, plus a comment stream when enabled
+SUBREDDITS = [s.strip() for s in os.environ.get("REDDIT_SUBREDDITS", "all").split(",") if s.strip()]
+STREAM_COMMENTS = os.environ.get("REDDIT_STREAM_COMMENTS", "false").lower() == "true"
+PUBLISH_QUEUE_SIZE = int(os.environ.get("SOCIAL_PUBLISH_QUEUE_SIZE", 10000))
+STATS_INTERVAL = int(os.environ.get("SOCIAL_STATS_INTERVAL", 60))
+DEDUP_CAPACITY = int(os.environ.get("DEDUP_CAPACITY", 500000))
+DEDUP_ERROR_RATE = float(os.environ.get("DEDUP_ERROR_RATE", 0.001))
+DEDUP_ROTATE_HOURS = float(os.environ.get("DEDUP_ROTATE_HOURS", 24))
+# /data is the social_media_data volume in docker-compose.yml
+DEDUP_SNAPSHOT_PATH = os.environ.get("DEDUP_SNAPSHOT_PATH", "/data/social_seen.bloom")
+
+# Written by every reader thread and the publisher thread
+stats = Counter()
+stats_lock = threading.Lock()
+
+def count(key):
+    with stats_lock:
+        stats[key] += 1
 
 # RabbitMQ setup
 def get_rabbitmq_channel():
@@ -21,7 +47,9 @@ def get_rabbitmq_channel():
         try:
             connection = pika.BlockingConnection(pika.ConnectionParameters(host=RABBITMQ_HOST))
             channel = connection.channel()
+            channel.exchange_declare(exchange=EXCHANGE_NAME, exchange_type='fanout', durable=True)
             channel.queue_declare(queue=QUEUE_NAME, durable=True)
+            channel.queue_bind(queue=QUEUE_NAME, exchange=EXCHANGE_NAME)
             return connection, channel
         except Exception as e:
             logger.error(f"RabbitMQ connection failed (attempt {attempt+1}): {e}")
@@ -44,42 +72,125 @@ def get_reddit_instance():
             time.sleep(2 ** attempt)
     raise Exception("Failed to connect to Reddit API after multiple attempts.")
 
-def main():
-    logger.info("Connecting to Reddit API and RabbitMQ...")
-    reddit = get_reddit_instance()
-    connection, channel = get_rabbitmq_channel()
-    subreddit = reddit.subreddit("all")
+def submission_to_post(submission):
+    return {
+        "source": "reddit",
+        "kind": "submission",
+        "id": submission.id,
+        "subreddit": submission.subreddit.display_name,
+        "title": submission.title,
+        "text": submission.selftext,
+        "created_utc": submission.created_utc,
+        "url": submission.url
+    }
+
+def comment_to_post(comment):
+    return {
+        "source": "reddit",
+        "kind": "comment",
+        "id": comment.id,
+        "subreddit": comment.subreddit.display_name,
+        "title": getattr(comment, "link_title", ""),
+        "text": comment.body,
+        "created_utc": comment.created_utc,
+        "url": f"https://www.reddit.com{comment.permalink}"
+    }
+
+def read_stream(subreddit_name, kind, posts):
+    """Reader thread: pull one subreddit stream and hand raw posts to ``posts``.
+
+    The reader never matches or publishes itself; when the publish queue is
+    full the post is dropped and counted rather than stalling the stream.
+    Each reader has its own Reddit instance since PRAW is not thread-safe.
+    """
+    name = f"r/{subreddit_name}/{kind}"
     while True:
         try:
-            for submission in subreddit.stream.submissions(skip_existing=True):
+            subreddit = get_reddit_instance().subreddit(subreddit_name)
+            if kind == "comments":
+                stream, to_post = subreddit.stream.comments(skip_existing=True), comment_to_post
+            else:
+                stream, to_post = subreddit.stream.submissions(skip_existing=True), submission_to_post
+            logger.info(f"Streaming {name}")
+            for item in stream:
                 try:
-                    text = (submission.title + " " + submission.selftext).lower()
-                    if any(keyword.lower() in text for keyword in KEYWORDS):
-                        post = {
-                            "source": "reddit",
-                            "id": submission.id,
-                            "title": submission.title,
-                            "text": submission.selftext,
-                            "created_utc": submission.created_utc,
-                            "url": submission.url
-                        }
-                        channel.basic_publish(
-                            exchange='',
-                            routing_key=QUEUE_NAME,
-                            body=json.dumps(post),
-                            properties=pika.BasicProperties(delivery_mode=2)
-                        )
-                        logger.info(f"Published: {post}")
+                    posts.put_nowait(to_post(item))
+                    count(f"read:{name}")
+                except queue.Full:
+                    count("dropped")
                 except Exception as e:
-                    logger.error(f"Error processing submission: {e}")
+                    logger.error(f"Error reading {name} item: {e}")
+        except Exception as e:
+            logger.error(f"Reddit stream {name} error: {e}. Reconnecting in 10 seconds...")
+            time.sleep(10)
+
+def publish_post(connection, channel, post):
+    """Publish one post, reconnecting until it goes through; returns the live connection and channel."""
+    body = json.dumps(post)
+    while True:
+        try:
+            channel.basic_publish(
+                exchange=EXCHANGE_NAME,
+                routing_key=QUEUE_NAME,
+                body=body,
+                properties=pika.BasicProperties(delivery_mode=2)
+            )
+            count("published")
+            logger.debug(f"Published: {post}")
+            return connection, channel
         except Exception as e:
-            logger.error(f"Reddit stream error: {e}. Reconnecting in 10 seconds...")
+            logger.error(f"Publish failed: {e}. Reconnecting in 10 seconds...")
             time.sleep(10)
-            reddit = get_reddit_instance()
             connection, channel = get_rabbitmq_channel()
 
+def publish_loop(posts, matcher, seen):
+    """Match, deduplicate and publish queued posts on the thread that owns the RabbitMQ channel."""
+    connection, channel = get_rabbitmq_channel()
+    last_report = time.monotonic()
+    while True:
+        try:
+            post = posts.get(timeout=1)
+        except queue.Empty:
+            post = None
+            try:
+                # Keeps heartbeats flowing while the streams are quiet
+                connection.process_data_events(time_limit=0)
+            except Exception as e:
+                logger.error(f"RabbitMQ connection lost: {e}. Reconnecting...")
+                connection, channel = get_rabbitmq_channel()
+        if post is not None and matcher.search(post["title"], post["text"]):
+            count("matched")
+            # Streams replay recent items after a reconnect, so ids are checked here
+            key = f"{post['kind']}:{post['id']}"
+            if not seen.seen(key):
+                connection, channel = publish_post(connection, channel, post)
+                seen.add(key)
+        if time.monotonic() - last_report >= STATS_INTERVAL:
+            with stats_lock:
+                counts = dict(stats)
+            logger.info(f"Social stats: queue={posts.qsize()}/{PUBLISH_QUEUE_SIZE} {counts}")
+            logger.info(f"Dedup stats: {seen.stats}")
+            seen.snapshot()
+            last_report = time.monotonic()
+
+def main():
+    logger.info("Connecting to Reddit API and RabbitMQ...")
+    matcher = KeywordMatcher(load_keywords(KEYWORDS_PATH or None))
+    posts = queue.Queue(maxsize=PUBLISH_QUEUE_SIZE)
+    seen = SeenSet(
+        capacity=DEDUP_CAPACITY,
+        error_rate=DEDUP_ERROR_RATE,
+        rotate_seconds=DEDUP_ROTATE_HOURS * 3600,
+        path=DEDUP_SNAPSHOT_PATH or None
+    )
+    kinds = ["submissions", "comments"] if STREAM_COMMENTS else ["submissions"]
+    for subreddit_name in SUBREDDITS:
+        for kind in kinds:
+            threading.Thread(target=read_stream, args=(subreddit_name, kind, posts), daemon=True).start()
+    publish_loop(posts, matcher, seen)
+
 if __name__ == "__main__":
     try:
         main()
     except KeyboardInterrupt:
-        logger.info("Stopped.") 
\ No newline at end of file
+        logger.info("Stopped.")
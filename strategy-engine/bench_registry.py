@@ -0,0 +1,99 @@
+"""Benchmark: evaluating many strategies per aggregated signal.
+
+Usage: python bench_registry.py [--strategies 50] [--signals 20000]
+
+Registers the built-in rule plus N random declarative threshold strategies,
+checks the registry's decisions against a plain per-strategy Python loop and
+against ``rules.rsi_sentiment_long`` for the built-in rule, then times both
+ways per signal.
+"""
+import argparse
+import operator
+import random
+import time
+from registry import StrategyRegistry, field_value
+from rules import rsi_sentiment_long, rsi_sentiment_long_strategy
+
+FIELDS = ["ta.value", "sentiment.sentiment_score", "sentiment.count", "ta.indicators.macd_hist"]
+OPS = {"gt": operator.gt, "ge": operator.ge, "lt": operator.lt, "le": operator.le}
+
+
+def random_strategies(count, seed=25):
+    rng = random.Random(seed)
+    strategies = []
+    for i in range(count):
+        when = {}
+        for field in rng.sample(FIELDS, rng.randint(2, 4)):
+            op = rng.choice(list(OPS))
+            when[field] = {op: round(rng.uniform(-1, 1) if "score" in field or "macd" in field else rng.uniform(0, 100), 2)}
+        strategies.append({"name": f"s{i:03d}", "side": rng.choice(["LONG", "SHORT"]), "when": when})
+    return strategies
+
+
+def random_signals(count, seed=26):
+    rng = random.Random(seed)
+    signals = []
+    for _ in range(count):
+        ta = {"value": rng.uniform(0, 100), "indicators": {"macd_hist": rng.uniform(-1, 1)}}
+        sentiment = {"sentiment_score": rng.uniform(-1, 1), "count": rng.randint(0, 50)}
+        if rng.random() < 0.05:
+            del ta["value"]
+        if rng.random() < 0.05:
+            del ta["indicators"]
+        signals.append({"asset": "BTCUSDT", "ta": ta, "sentiment": sentiment})
+    return signals
+
+
+def loop_decisions(strategies, agg):
+    """The one-strategy-at-a-time way."""
+    fired = []
+    for config in strategies:
+        ok = True
+        for field, bounds in config["when"].items():
+            value = field_value(agg, field)
+            if value != value:
+                value = config.get("defaults", {}).get(field, value)
+            for op, threshold in bounds.items():
+                ok = ok and OPS[op](value, threshold)
+        if ok:
+            fired.append(config["name"])
+    return fired
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--strategies", type=int, default=50)
+    parser.add_argument("--signals", type=int, default=20000)
+    args = parser.parse_args()
+
+    strategies = [rsi_sentiment_long_strategy()] + random_strategies(args.strategies)
+    registry = StrategyRegistry(strategies)
+    signals = random_signals(args.signals)
+
+    decisions = [[config["name"] for config, _, _, _ in fired] for fired in registry.evaluate(signals)]
+    for agg, fired in zip(signals, decisions):
+        assert sorted(fired) == sorted(loop_decisions(strategies, agg)), "registry differs from the loop"
+        rule = rsi_sentiment_long(agg["ta"].get("value", 50), agg["sentiment"].get("sentiment_score", 0))
+        assert rule == ("rsi_sentiment_long" in fired), "built-in strategy differs from rules.rsi_sentiment_long"
+    print(f"Parity: {sum(map(len, decisions))} decisions over {len(signals)} signals match the per-strategy loop")
+
+    began = time.perf_counter()
+    for agg in signals:
+        loop_decisions(strategies, agg)
+    loop_us = (time.perf_counter() - began) * 1e6 / len(signals)
+    began = time.perf_counter()
+    for agg in signals:
+        registry.evaluate([agg])
+    single_us = (time.perf_counter() - began) * 1e6 / len(signals)
+    began = time.perf_counter()
+    for i in range(0, len(signals), 64):
+        registry.evaluate(signals[i:i + 64])
+    batch_us = (time.perf_counter() - began) * 1e6 / len(signals)
+    print(f"{len(strategies)} strategies: loop {loop_us:.1f} us/signal, registry {single_us:.1f} us/signal, "
+          f"registry in batches of 64 {batch_us:.1f} us/signal")
+    for line in registry.report()[:4]:
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
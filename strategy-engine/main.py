@@ -3,6 +3,8 @@ import json
 import os
 import logging
 import time
+from registry import StrategyRegistry, load_strategies
+from rules import rsi_sentiment_long_strategy
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger("StrategyEngine")
@@ -11,6 +13,12 @@ RABBITMQ_HOST = os.environ.get("RABBITMQ_HOST", "rabbitmq")
 AGG_QUEUE = os.environ.get("AGGREGATED_SIGNAL_QUEUE", "aggregated_signals")
 ORDER_QUEUE = os.environ.get("RAW_ORDER_QUEUE", "raw_orders")
 USE_DL_STRATEGY = os.environ.get("USE_DL_STRATEGY", "false").lower() == "true"
+RSI_BELOW = float(os.environ.get("STRATEGY_RSI_BELOW", 30))
+SENTIMENT_ABOVE = float(os.environ.get("STRATEGY_SENTIMENT_ABOVE", 0.6))
+# JSON list of strategies (see registry.load_strategies); unset runs the built-in rule alone
+STRATEGY_CONFIG_PATH = os.environ.get("STRATEGY_CONFIG_PATH")
+STRATEGY_PREFETCH = int(os.environ.get("STRATEGY_PREFETCH", 1))
+STRATEGY_STATS_INTERVAL = int(os.environ.get("STRATEGY_STATS_INTERVAL", 60))
 
 # Placeholder for DL strategy integration
 def load_dl_strategy():
@@ -30,43 +38,52 @@ def get_rabbitmq_channel():
             time.sleep(2 ** attempt)
     raise Exception("Failed to connect to RabbitMQ after multiple attempts.")
 
-def main():
+def build_registry():
+    if USE_DL_STRATEGY and not STRATEGY_CONFIG_PATH:
+        # As before, the DL strategy replaces the built-in rule
+        default = []
+    else:
+        default = [rsi_sentiment_long_strategy(RSI_BELOW, SENTIMENT_ABOVE)]
+    registry = StrategyRegistry(load_strategies(STRATEGY_CONFIG_PATH, default))
+    if USE_DL_STRATEGY:
+        registry.add({"name": "dl_strategy", "tags": ["dl"]}, load_dl_strategy())
+    logger.info(f"Registered {len(registry)} strategies: {list(registry.stats)}")
+    return registry
+
+def main(registry=None):
     logger.info("Starting Strategy Engine...")
+    if registry is None:
+        registry = build_registry()
     connection, channel = get_rabbitmq_channel()
-    dl_strategy = load_dl_strategy() if USE_DL_STRATEGY else None
-    channel.basic_qos(prefetch_count=1)
+    channel.basic_qos(prefetch_count=STRATEGY_PREFETCH)
+
+    def on_timer():
+        for line in registry.report():
+            logger.info(f"Strategy {line}")
+        connection.call_later(STRATEGY_STATS_INTERVAL, on_timer)
+
+    connection.call_later(STRATEGY_STATS_INTERVAL, on_timer)
 
     def callback(ch, method, properties, body):
         try:
             agg = json.loads(body)
-            ta = agg.get("ta", {})
-            sentiment = agg.get("sentiment", {})
-            asset = agg.get("asset", "unknown")
-            rsi = ta.get("value", 50)
-            sentiment_score = sentiment.get("sentiment_score", 0)
-            if USE_DL_STRATEGY and dl_strategy:
-                asset, side, reason = dl_strategy(agg)
-            else:
-                # Simple rule: LONG if RSI < 30 and sentiment > 0.6
-                if rsi < 30 and sentiment_score > 0.6:
-                    side = "LONG"
-                    reason = f"RSI={rsi}, sentiment={sentiment_score}"
-                else:
-                    ch.basic_ack(delivery_tag=method.delivery_tag)
-                    return
-            order = {
-                "asset": asset,
-                "side": side,
-                "reason": reason,
-                "timestamp": agg.get("timestamp")
-            }
-            channel.basic_publish(
-                exchange='',
-                routing_key=ORDER_QUEUE,
-                body=json.dumps(order),
-                properties=pika.BasicProperties(delivery_mode=2)
-            )
-            logger.info(f"Published order: {order}")
+            # Every registered strategy in one pass; each one that fires gets its own tagged order
+            for config, asset, side, reason in registry.evaluate([agg])[0]:
+                order = {
+                    "asset": asset,
+                    "side": side,
+                    "reason": reason,
+                    "strategy": config["name"],
+                    "tags": config.get("tags", []),
+                    "timestamp": agg.get("timestamp")
+                }
+                channel.basic_publish(
+                    exchange='',
+                    routing_key=ORDER_QUEUE,
+                    body=json.dumps(order),
+                    properties=pika.BasicProperties(delivery_mode=2)
+                )
+                logger.info(f"Published order: {order}")
             ch.basic_ack(delivery_tag=method.delivery_tag)
         except Exception as e:
             logger.error(f"Strategy callback error: {e}")
@@ -79,7 +96,7 @@ def main():
     except Exception as e:
         logger.error(f"Strategy engine error: {e}")
         time.sleep(10)
-        main()
+        main(registry)
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,201 @@
+import importlib
+import json
+import logging
+import math
+import time
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Threshold operators for declarative strategies, with the bound that never fails
+OPERATORS = {"gt": -math.inf, "ge": -math.inf, "lt": math.inf, "le": math.inf}
+
+
+def load_strategies(path=None, default=None):
+    """Strategy configs from a JSON list, or ``default`` when no path is given.
+
+    A declarative strategy compares numeric fields of the aggregated signal,
+    addressed by dotted paths, against thresholds:
+
+        {"name": "oversold_bullish", "side": "LONG", "tags": ["mean-reversion"],
+         "when": {"ta.value": {"lt": 30}, "sentiment.sentiment_score": {"gt": 0.6}},
+         "defaults": {"ta.value": 50},
+         "reason": "RSI={ta.value}, sentiment={sentiment.sentiment_score}"}
+
+    A Python strategy names a factory returning ``fn(agg) -> (asset, side,
+    reason) or None``: {"name": "dl", "factory": "module:function", "params": {}}.
+    """
+    if not path:
+        return default or []
+    with open(path, "r") as f:
+        strategies = json.load(f)
+    logger.info(f"Loaded {len(strategies)} strategies from {path}")
+    return strategies
+
+
+def lookup(agg, field):
+    """Value at a dotted path such as "ta.value", or None."""
+    value = agg
+    for key in field.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def field_value(agg, field):
+    value = lookup(agg, field)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return math.nan
+    return float(value)
+
+
+class StrategyRegistry:
+    """Evaluates every registered strategy against each aggregated signal.
+
+    All declarative strategies are compiled into threshold matrices over the
+    union of their fields, so one signal is checked against all of them in a
+    single numpy pass whose cost barely grows with the number of strategies.
+    Python strategies run one by one after it; one that raises is counted
+    under ``errors`` and skipped for that signal. ``stats`` keeps per-strategy
+    evaluation counts, fires and latency (refreshed by ``report``);
+    declarative strategies are charged an equal share of the shared pass's
+    total, and the pass's own worst case is reported once, undivided.
+    """
+
+    def __init__(self, strategies=()):
+        self.declarative = []
+        self.callables = []
+        self.stats = {}
+        self._pass = {"evaluated": 0, "latency_us_total": 0.0, "latency_us_max": 0.0}
+        self._fired = np.zeros(0, dtype=np.int64)
+        for config in strategies:
+            self.add(config)
+
+    def add(self, config, fn=None):
+        """Register a strategy config; ``fn`` registers a Python strategy directly."""
+        name = config["name"]
+        if name in self.stats:
+            raise ValueError(f"Duplicate strategy name {name!r}")
+        if fn is None and "factory" in config:
+            module, _, function = config["factory"].partition(":")
+            fn = getattr(importlib.import_module(module), function)(**config.get("params", {}))
+        if fn is not None:
+            self.callables.append((config, fn))
+        else:
+            for field, bounds in config["when"].items():
+                unknown = set(bounds) - set(OPERATORS)
+                if unknown:
+                    raise ValueError(f"Strategy {name!r}: unknown operators {sorted(unknown)} for {field}")
+            self.declarative.append(config)
+            self._fired = np.append(self._fired, 0)
+            self._compile()
+            self.stats[name] = {"evaluated": 0, "fired": 0, "latency_us_total": 0.0}
+            return
+        self.stats[name] = {"evaluated": 0, "fired": 0, "errors": 0, "latency_us_total": 0.0, "latency_us_max": 0.0}
+
+    def _compile(self):
+        self.fields = sorted({field for config in self.declarative for field in config["when"]})
+        column = self._column = {field: i for i, field in enumerate(self.fields)}
+        shape = (len(self.declarative), len(self.fields))
+        self.bounds = {op: np.full(shape, neutral) for op, neutral in OPERATORS.items()}
+        self.uses = np.zeros(shape, dtype=bool)
+        self.defaults = np.full(shape, np.nan)
+        for row, config in enumerate(self.declarative):
+            for field, bounds in config["when"].items():
+                self.uses[row, column[field]] = True
+                for op, threshold in bounds.items():
+                    self.bounds[op][row, column[field]] = threshold
+            for field, value in config.get("defaults", {}).items():
+                if field in column:
+                    self.defaults[row, column[field]] = value
+
+    def _fires(self, values):
+        """(signals x strategies) bool matrix for a (signals x fields) value matrix, plus the values used."""
+        # A missing field takes the strategy's default, if it has one, else fails the strategy
+        values = np.where(np.isnan(values)[:, None, :], self.defaults[None], values[:, None, :])
+        with np.errstate(invalid="ignore"):
+            ok = ((values > self.bounds["gt"]) & (values >= self.bounds["ge"])
+                  & (values < self.bounds["lt"]) & (values <= self.bounds["le"]))
+        return (ok | ~self.uses).all(axis=2), values
+
+    def _reason(self, row, agg):
+        """Reason text for a declarative strategy, with each field as it appears
+        in the signal, or the strategy's default where the signal lacks it."""
+        config = self.declarative[row]
+        defaults = config.get("defaults", {})
+        used = []
+        for field in config["when"]:
+            value = lookup(agg, field)
+            used.append((field, defaults.get(field) if math.isnan(field_value(agg, field)) else value))
+        template = config.get("reason")
+        if template is None:
+            return ", ".join(f"{field}={value}" for field, value in used)
+        for field, value in used:
+            template = template.replace("{" + field + "}", str(value))
+        return template
+
+    def _record(self, name, fired, latency_us):
+        stats = self.stats[name]
+        stats["evaluated"] += 1
+        stats["fired"] += fired
+        stats["latency_us_total"] += latency_us
+        stats["latency_us_max"] = max(stats["latency_us_max"], latency_us)
+
+    def evaluate(self, aggs):
+        """For each aggregated signal, the list of (strategy config, asset, side, reason) that fire."""
+        results = [[] for _ in aggs]
+        if self.declarative and aggs:
+            start = time.perf_counter()
+            values = np.array([[field_value(agg, field) for field in self.fields] for agg in aggs])
+            fires, _ = self._fires(values)
+            # Per-strategy counters are updated as arrays so bookkeeping stays one pass too
+            self._fired += fires.sum(axis=0)
+            for i, row in zip(*np.nonzero(fires)):
+                config = self.declarative[row]
+                results[i].append((config, aggs[i].get("asset", "unknown"), config.get("side", "LONG"),
+                                   self._reason(row, aggs[i])))
+            elapsed_us = (time.perf_counter() - start) * 1e6
+            self._pass["evaluated"] += len(aggs)
+            self._pass["latency_us_total"] += elapsed_us
+            self._pass["latency_us_max"] = max(self._pass["latency_us_max"], elapsed_us / len(aggs))
+        for config, fn in self.callables:
+            for i, agg in enumerate(aggs):
+                start = time.perf_counter()
+                try:
+                    decision = fn(agg)
+                except Exception as e:
+                    self.stats[config["name"]]["errors"] += 1
+                    logger.error(f"Strategy {config['name']} failed on {agg.get('asset', 'unknown')}: {e}")
+                    decision = None
+                self._record(config["name"], decision is not None, (time.perf_counter() - start) * 1e6)
+                if decision is not None:
+                    asset, side, reason = decision
+                    results[i].append((config, asset, side, reason))
+        return results
+
+    def _sync_declarative_stats(self):
+        share = len(self.declarative) or 1
+        for row, config in enumerate(self.declarative):
+            self.stats[config["name"]].update({
+                "evaluated": self._pass["evaluated"],
+                "fired": int(self._fired[row]),
+                "latency_us_total": self._pass["latency_us_total"] / share
+            })
+
+    def report(self):
+        self._sync_declarative_stats()
+        per_signal = self._pass["latency_us_total"] / self._pass["evaluated"] if self._pass["evaluated"] else 0.0
+        lines = [f"declarative pass: strategies={len(self.declarative)} signals={self._pass['evaluated']} "
+                 f"avg_us={per_signal:.1f} max_us={self._pass['latency_us_max']:.1f}"]
+        for name, stats in self.stats.items():
+            evaluated = stats["evaluated"]
+            avg = stats["latency_us_total"] / evaluated if evaluated else 0.0
+            line = f"{name}: evaluated={evaluated} fired={stats['fired']} avg_us={avg:.1f}"
+            if "latency_us_max" in stats:
+                line += f" max_us={stats['latency_us_max']:.1f} errors={stats['errors']}"
+            lines.append(line)
+        return lines
+
+    def __len__(self):
+        return len(self.stats)
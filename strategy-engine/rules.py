@@ -0,0 +1,25 @@
+# Entry rules shared by the live strategy engine and the backtester. Each rule
+# works on scalars and on numpy arrays alike, so the backtester can evaluate it
+# over every bar at once; comparisons with NaN are False, so missing inputs
+# never open a position.
+
+RSI_BELOW = 30
+SENTIMENT_ABOVE = 0.6
+
+
+def rsi_sentiment_long(rsi, sentiment_score, rsi_below=RSI_BELOW, sentiment_above=SENTIMENT_ABOVE):
+    """LONG when RSI is oversold and sentiment is strongly positive."""
+    return (rsi < rsi_below) & (sentiment_score > sentiment_above)
+
+
+def rsi_sentiment_long_strategy(rsi_below=RSI_BELOW, sentiment_above=SENTIMENT_ABOVE):
+    """``rsi_sentiment_long`` as a declarative strategy for the registry."""
+    return {
+        "name": "rsi_sentiment_long",
+        "side": "LONG",
+        "tags": ["rsi", "sentiment"],
+        "when": {"ta.value": {"lt": rsi_below}, "sentiment.sentiment_score": {"gt": sentiment_above}},
+        # The same fallbacks the engine has always used for a missing RSI or score
+        "defaults": {"ta.value": 50, "sentiment.sentiment_score": 0},
+        "reason": "RSI={ta.value}, sentiment={sentiment.sentiment_score}"
+    }
@@ -0,0 +1,105 @@
+"""Parity check and benchmark: streaming indicators vs. the pandas implementations.
+
+Usage: python bench_indicators.py [--points 50000]
+
+Feeds one random-walk price series through the incremental indicators in
+indicators.py and through pandas (compute_rsi from main.py plus reference
+Wilder RSI, EMA, MACD; exact two-pass Bollinger bands), asserts the results agree, then
+reports per-update cost of the streaming path against recomputing the pandas
+window on every new price, as the polling loop does.
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from indicators import RSI, EMA, MACD, BollingerBands, WilderRSI
+from main import compute_rsi
+
+TOLERANCE = 1e-8
+
+
+def wilder_rsi(prices, period=14):
+    delta = prices.diff()
+    gain = delta.clip(lower=0)
+    loss = (-delta).clip(upper=None, lower=0)
+
+    def smooth(series):
+        seed = series.iloc[1:period + 1].mean()
+        tail = series.iloc[period + 1:]
+        values = pd.concat([pd.Series([seed], index=[series.index[period]]), tail])
+        return values.ewm(alpha=1 / period, adjust=False).mean().reindex(series.index)
+
+    avg_gain, avg_loss = smooth(gain), smooth(loss)
+    return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+def stream(indicator, prices):
+    out = []
+    for price in prices:
+        value = indicator.update(price)
+        out.append(np.nan if value is None else value)
+    return np.array(out, dtype=float)
+
+
+def assert_close(name, streamed, expected):
+    expected = np.asarray(expected, dtype=float)
+    both_nan = np.isnan(streamed) & np.isnan(expected)
+    diff = np.where(both_nan, 0.0, np.abs(streamed - expected))
+    worst = np.nanmax(diff) if len(diff) else 0.0
+    if not (worst <= TOLERANCE and not np.isnan(diff).any()):
+        raise AssertionError(f"{name}: max abs diff {worst}")
+    print(f"parity {name:<16} max abs diff {worst:.2e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=50_000)
+    parser.add_argument("--window", type=int, default=3600, help="pandas window recomputed per update")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    raw = 65000 + np.cumsum(rng.normal(0, 10, args.points))
+    # Repeated prices exercise the zero gain/loss edge cases
+    raw[1000:1030] = raw[1000]
+    prices = pd.Series(raw)
+    values = raw.tolist()
+
+    assert_close("RSI (rolling)", stream(RSI(14), values), compute_rsi(prices, 14))
+    assert_close("RSI (Wilder)", stream(WilderRSI(14), values), wilder_rsi(prices, 14))
+    assert_close("EMA(20)", stream(EMA(20), values), prices.ewm(span=20, adjust=False).mean())
+    macd = MACD()
+    macd_out = np.array([macd.update(p) for p in values])
+    fast = prices.ewm(span=12, adjust=False).mean()
+    slow = prices.ewm(span=26, adjust=False).mean()
+    ref_macd = fast - slow
+    assert_close("MACD", macd_out[:, 0], ref_macd)
+    assert_close("MACD signal", macd_out[:, 1], ref_macd.ewm(span=9, adjust=False).mean())
+    bb = BollingerBands(20, 2.0)
+    bb_out = np.array([(np.nan,) * 3 if v is None else v for v in (bb.update(p) for p in values)])
+    # pandas' own rolling std is an online algorithm that drifts by ~1e-4 on
+    # prices this large, so the bands are checked against an exact two-pass std
+    windows = sliding_window_view(raw, 20)
+    pad = np.full(19, np.nan)
+    mid = np.concatenate([pad, windows.mean(axis=1)])
+    std = np.concatenate([pad, windows.std(axis=1, ddof=1)])
+    assert_close("Bollinger lower", bb_out[:, 0], mid - 2 * std)
+    assert_close("Bollinger upper", bb_out[:, 2], mid + 2 * std)
+
+    rsi = RSI(14)
+    start = time.perf_counter()
+    for price in values:
+        rsi.update(price)
+    streaming_us = (time.perf_counter() - start) / len(values) * 1e6
+
+    samples = 200
+    start = time.perf_counter()
+    for end in range(args.window, args.window + samples):
+        compute_rsi(prices.iloc[end - args.window:end], 14).iloc[-1]
+    pandas_us = (time.perf_counter() - start) / samples * 1e6
+    print(f"streaming RSI update: {streaming_us:8.2f} us")
+    print(f"pandas RSI over {args.window} prices: {pandas_us:8.2f} us ({pandas_us / streaming_us:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import math
+from collections import deque
+
+# Incremental indicators with O(1) work per update and fixed-size state.
+# Each update() takes the next price and returns the current value, or None
+# while the indicator is still warming up. Values match the pandas formulas
+# in main.py and bench_indicators.py: rolling means for SMA-RSI, Wilder smoothing
+# seeded with a simple average, ewm(span, adjust=False) for EMA, and
+# the sample standard deviation (ddof=1) for Bollinger bands.
+
+# Running sums are recomputed from the ring buffer this often to stop
+# floating-point drift from accumulating.
+_RESUM_EVERY = 256
+
+
+class RollingMean:
+    """Mean of the last ``period`` values over a ring buffer."""
+
+    def __init__(self, period):
+        self.period = period
+        self.values = deque(maxlen=period)
+        self.total = 0.0
+        self.nonzero = 0
+        self._updates = 0
+
+    def update(self, value):
+        if len(self.values) == self.period:
+            old = self.values[0]
+            self.total -= old
+            if old != 0:
+                self.nonzero -= 1
+        self.values.append(value)
+        self.total += value
+        if value != 0:
+            self.nonzero += 1
+        self._updates += 1
+        if self.nonzero == 0:
+            # An all-zero window must give exactly zero, not a rounding residue
+            self.total = 0.0
+        elif self._updates % _RESUM_EVERY == 0:
+            self.total = math.fsum(self.values)
+        if len(self.values) < self.period:
+            return None
+        return self.total / self.period
+
+
+class RSI:
+    """RSI over rolling-mean gains and losses, the same as ``compute_rsi``."""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.prev = None
+        self.gain = RollingMean(period)
+        self.loss = RollingMean(period)
+
+    def update(self, price):
+        # compute_rsi counts the undefined first change as zero, so the first
+        # price already occupies a slot in the window
+        delta = 0.0 if self.prev is None else price - self.prev
+        self.prev = price
+        gain = self.gain.update(delta if delta > 0 else 0.0)
+        loss = self.loss.update(-delta if delta < 0 else 0.0)
+        if gain is None:
+            return None
+        if loss == 0:
+            return 100.0 if gain > 0 else float("nan")
+        return 100 - 100 / (1 + gain / loss)
+
+
+class WilderRSI:
+    """RSI with Wilder smoothing, seeded with the simple average of the first ``period`` moves."""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.prev = None
+        self.count = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def update(self, price):
+        if self.prev is None:
+            self.prev = price
+            return None
+        delta = price - self.prev
+        self.prev = price
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        self.count += 1
+        if self.count <= self.period:
+            self.avg_gain += gain / self.period
+            self.avg_loss += loss / self.period
+            if self.count < self.period:
+                return None
+        else:
+            self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+        if self.avg_loss == 0:
+            return 100.0 if self.avg_gain > 0 else float("nan")
+        return 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+
+
+class EMA:
+    """Exponential moving average, equal to ``ewm(span=period, adjust=False)``."""
+
+    def __init__(self, period):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.value = None
+
+    def update(self, price):
+        if self.value is None:
+            self.value = price
+        else:
+            self.value += self.alpha * (price - self.value)
+        return self.value
+
+
+class MACD:
+    """MACD line, signal line and histogram from fast/slow/signal EMAs."""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+
+    def update(self, price):
+        macd = self.fast.update(price) - self.slow.update(price)
+        signal = self.signal.update(macd)
+        return macd, signal, macd - signal
+
+
+class BollingerBands:
+    """Rolling mean +/- ``k`` sample standard deviations over ``period`` values."""
+
+    def __init__(self, period=20, k=2.0):
+        self.period = period
+        self.k = k
+        self.values = deque(maxlen=period)
+        # Values are kept relative to ``shift`` (re-centred on every resum) so
+        # the running moments stay small and cancellation error stays low
+        self.shift = None
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._updates = 0
+
+    def update(self, price):
+        if self.shift is None:
+            self.shift = price
+        x = price - self.shift
+        n = len(self.values)
+        if n < self.period:
+            # Welford's algorithm while the window fills
+            self.values.append(x)
+            delta = x - self.mean
+            self.mean += delta / (n + 1)
+            self.m2 += delta * (x - self.mean)
+        else:
+            # Replace the oldest value in a full window
+            old = self.values[0]
+            self.values.append(x)
+            old_mean = self.mean
+            self.mean += (x - old) / self.period
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+        self._updates += 1
+        if self._updates % _RESUM_EVERY == 0:
+            self._resum()
+        if len(self.values) < self.period:
+            return None
+        mean = self.mean + self.shift
+        std = math.sqrt(max(self.m2, 0.0) / (self.period - 1))
+        return mean - self.k * std, mean, mean + self.k * std
+
+    def _resum(self):
+        centre = self.shift + math.fsum(self.values) / len(self.values)
+        values = [v + self.shift - centre for v in self.values]
+        self.values.clear()
+        self.values.extend(values)
+        self.shift = centre
+        self.mean = math.fsum(values) / len(values)
+        self.m2 = math.fsum((v - self.mean) ** 2 for v in values)
+
+
+class IndicatorState:
+    """All streaming indicators for one symbol, updated once per bar close."""
+
+    def __init__(self, rsi_period=14, rsi_method="wilder", ema_period=20, macd=(12, 26, 9),
+                 bollinger_period=20, bollinger_k=2.0):
+        self.rsi_method = rsi_method
+        self.rsi = WilderRSI(rsi_period) if rsi_method == "wilder" else RSI(rsi_period)
+        self.ema = EMA(ema_period)
+        self.macd = MACD(*macd)
+        self.bollinger = BollingerBands(bollinger_period, bollinger_k)
+
+    def update(self, price):
+        rsi = self.rsi.update(price)
+        ema = self.ema.update(price)
+        macd, macd_signal, macd_hist = self.macd.update(price)
+        bands = self.bollinger.update(price)
+        values = {"rsi": rsi, "ema": ema, "macd": macd, "macd_signal": macd_signal, "macd_hist": macd_hist}
+        if bands is not None:
+            values["bb_lower"], values["bb_middle"], values["bb_upper"] = bands
+        return values
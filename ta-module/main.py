@@ -7,6 +7,11 @@ from influxdb_client import InfluxDBClient
 from datetime import datetime, timedelta
 import logging
 import time
+from price_cache import PriceCache
+from streaming import StreamingTA
+from snapshot import SnapshotWriter, load_snapshot
+from vectorized import compute_indicators, latest_values, parse_indicator_spec
+from tick_frame import FRAME_CONTENT_TYPE, decode_frame
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger("TAModule")
@@ -19,6 +24,27 @@ INFLUXDB_ORG = os.environ.get("INFLUXDB_ORG", "my-org")
 INFLUXDB_BUCKET = os.environ.get("INFLUXDB_BUCKET", "market_data")
 SYMBOL = os.environ.get("TA_SYMBOL", "BTCUSDT")
 USE_DL_TA = os.environ.get("USE_DL_TA", "false").lower() == "true"
+TA_MODE = os.environ.get("TA_MODE", "poll").lower()
+TA_STREAM_QUEUE = os.environ.get("TA_STREAM_QUEUE", "ta_ticks")
+MARKET_DATA_EXCHANGE = os.environ.get("MARKET_DATA_EXCHANGE", "market_data")
+TA_BINDING_KEY = os.environ.get("TA_BINDING_KEY", "binance.#")
+TA_BAR_SECONDS = int(os.environ.get("TA_BAR_SECONDS", 60))
+TA_RSI_PERIOD = int(os.environ.get("TA_RSI_PERIOD", 14))
+TA_RSI_METHOD = os.environ.get("TA_RSI_METHOD", "wilder").lower()
+TA_SYMBOLS = [s.strip().upper() for s in os.environ.get("TA_SYMBOLS", "").split(",") if s.strip()]
+TA_INDICATORS = os.environ.get("TA_INDICATORS", "rsi:14,rsi:7,ema:20,ema:50,macd:12/26/9,bb:20/2")
+TA_LOOKBACK = os.environ.get("TA_LOOKBACK", "6h")
+TA_INTERVAL = int(os.environ.get("TA_INTERVAL", 60))
+TA_POLL_LOOKBACK_SECONDS = int(os.environ.get("TA_POLL_LOOKBACK_SECONDS", 3600))
+TA_CACHE_OVERLAP_SECONDS = int(os.environ.get("TA_CACHE_OVERLAP_SECONDS", 5))
+# Warm restart of streaming mode: indicator state is snapshotted periodically and loaded on startup;
+# /data is the ta_module_data volume in docker-compose.yml
+TA_SNAPSHOT_PATH = os.environ.get("TA_SNAPSHOT_PATH", "/data/ta_state.snapshot")
+TA_SNAPSHOT_INTERVAL = int(os.environ.get("TA_SNAPSHOT_INTERVAL", 30))
+
+_influxdb_client = None
+_price_cache = None
+_snapshot_writer = None
 
 # Placeholder for DL model integration
 def load_dl_ta_model():
@@ -35,21 +61,121 @@ def compute_rsi(prices, period=14):
     rsi = 100 - (100 / (1 + rs))
     return rsi
 
+def get_influxdb_client():
+    # One pooled client for the life of the process instead of one per query
+    global _influxdb_client
+    if _influxdb_client is None:
+        _influxdb_client = InfluxDBClient(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG)
+    return _influxdb_client
+
+def get_price_cache():
+    global _price_cache
+    if _price_cache is None:
+        _price_cache = PriceCache(
+            get_influxdb_client().query_api(),
+            INFLUXDB_BUCKET,
+            lookback_seconds=TA_POLL_LOOKBACK_SECONDS,
+            overlap_seconds=TA_CACHE_OVERLAP_SECONDS
+        )
+    return _price_cache
+
+def get_snapshot_writer(meta):
+    # One writer thread for the process, kept across streaming reconnects
+    global _snapshot_writer
+    if _snapshot_writer is None:
+        _snapshot_writer = SnapshotWriter(TA_SNAPSHOT_PATH, meta=meta)
+    return _snapshot_writer
+
 def fetch_prices():
     for attempt in range(5):
         try:
-            client = InfluxDBClient(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG)
-            query = f'''from(bucket: "{INFLUXDB_BUCKET}")\n  |> range(start: -1h)\n  |> filter(fn: (r) => r["_measurement"] == "price_tick" and r["symbol"] == "{SYMBOL}")\n  |> filter(fn: (r) => r["_field"] == "price")\n  |> sort(columns: ["_time"])\n'''
-            tables = client.query_api().query(query)
-            prices = [record.get_value() for table in tables for record in table.records]
-            times = [record.get_time() for table in tables for record in table.records]
-            df = pd.DataFrame({"price": prices}, index=pd.to_datetime(times))
-            return df
+            cache = get_price_cache()
+            cache.refresh([SYMBOL])
+            return cache.frame(SYMBOL)
         except Exception as e:
             logger.error(f"InfluxDB fetch error (attempt {attempt+1}): {e}")
             time.sleep(2 ** attempt)
     return pd.DataFrame()
 
+def fetch_price_matrix(symbols):
+    """Return (symbols, bar times, prices) with one row of bar closes per symbol.
+
+    An empty ``symbols`` list selects every symbol in the bucket. Gaps are
+    forward-filled and a symbol's leading gap is back-filled with its first close.
+    """
+    symbol_filter = ""
+    if symbols:
+        symbol_filter = " and (" + " or ".join(f'r["symbol"] == "{s}"' for s in symbols) + ")"
+    query = f'''from(bucket: "{INFLUXDB_BUCKET}")
+  |> range(start: -{TA_LOOKBACK})
+  |> filter(fn: (r) => r["_measurement"] == "price_tick" and r["_field"] == "price"{symbol_filter})
+  |> aggregateWindow(every: {TA_BAR_SECONDS}s, fn: last, createEmpty: false)
+  |> keep(columns: ["_time", "symbol", "_value"])
+'''
+    for attempt in range(5):
+        try:
+            df = get_influxdb_client().query_api().query_data_frame(query)
+            if isinstance(df, list):
+                df = pd.concat(df, ignore_index=True)
+            if df.empty:
+                return [], [], np.empty((0, 0))
+            wide = df.pivot_table(index="symbol", columns="_time", values="_value", aggfunc="last")
+            wide = wide.ffill(axis=1).bfill(axis=1)
+            return list(wide.index), list(wide.columns), wide.to_numpy(dtype=float)
+        except Exception as e:
+            logger.error(f"InfluxDB fetch error (attempt {attempt+1}): {e}")
+            time.sleep(2 ** attempt)
+    return [], [], np.empty((0, 0))
+
+def build_batch_signals(symbols, prices, indicators):
+    """One TA signal per symbol carrying every configured indicator's latest value."""
+    latest = latest_values(compute_indicators(prices, indicators))
+    primary = f"rsi_{TA_RSI_PERIOD}"
+    timestamp = datetime.utcnow().isoformat() + "Z"
+    signals = []
+    for i, symbol in enumerate(symbols):
+        # Indicators still warming up are None, as in streaming mode; NaN is not valid JSON
+        values = {label: None if np.isnan(column[i]) else float(column[i]) for label, column in latest.items()}
+        value = values.get(primary)
+        if value is None:
+            continue
+        signals.append({
+            "symbol": symbol,
+            "indicator": "RSI",
+            "value": value,
+            "indicators": values,
+            "timestamp": timestamp
+        })
+    return signals
+
+def run_batch():
+    indicators = parse_indicator_spec(TA_INDICATORS)
+    if ("rsi", (TA_RSI_PERIOD,)) not in indicators:
+        indicators.append(("rsi", (TA_RSI_PERIOD,)))
+    logger.info(f"Starting batch TA for {TA_SYMBOLS or 'all symbols'} with {indicators}...")
+    connection, channel = get_rabbitmq_channel()
+    while True:
+        try:
+            started = time.monotonic()
+            symbols, _, prices = fetch_price_matrix(TA_SYMBOLS)
+            if prices.size == 0:
+                logger.warning("Not enough data for TA.")
+            else:
+                signals = build_batch_signals(symbols, prices, indicators)
+                for ta_signal in signals:
+                    channel.basic_publish(
+                        exchange='',
+                        routing_key=QUEUE_NAME,
+                        body=json.dumps(ta_signal),
+                        properties=pika.BasicProperties(delivery_mode=2)
+                    )
+                logger.info(f"Published {len(signals)} TA signals for {prices.shape[0]} symbols x "
+                            f"{prices.shape[1]} bars in {time.monotonic() - started:.2f}s")
+            time.sleep(TA_INTERVAL)
+        except Exception as e:
+            logger.error(f"Batch TA loop error: {e}")
+            time.sleep(10)
+
 def get_rabbitmq_channel():
     for attempt in range(5):
         try:
@@ -62,7 +188,65 @@ def get_rabbitmq_channel():
             time.sleep(2 ** attempt)
     raise Exception("Failed to connect to RabbitMQ after multiple attempts.")
 
+def run_streaming():
+    logger.info(f"Starting streaming TA on {TA_BAR_SECONDS}s bars from {MARKET_DATA_EXCHANGE}/{TA_BINDING_KEY}...")
+    connection, channel = get_rabbitmq_channel()
+    channel.exchange_declare(exchange=MARKET_DATA_EXCHANGE, exchange_type='topic', durable=True)
+    channel.queue_declare(queue=TA_STREAM_QUEUE, durable=True)
+    channel.queue_bind(queue=TA_STREAM_QUEUE, exchange=MARKET_DATA_EXCHANGE, routing_key=TA_BINDING_KEY)
+
+    def emit(ta_signal):
+        channel.basic_publish(
+            exchange='',
+            routing_key=QUEUE_NAME,
+            body=json.dumps(ta_signal),
+            properties=pika.BasicProperties(delivery_mode=2)
+        )
+        logger.info(f"Published TA signal: {ta_signal}")
+
+    engine = StreamingTA(emit, bar_seconds=TA_BAR_SECONDS, rsi_period=TA_RSI_PERIOD, rsi_method=TA_RSI_METHOD)
+    symbols = load_snapshot(TA_SNAPSHOT_PATH, meta=engine.snapshot_meta())
+    if symbols:
+        logger.info(f"Restored indicator state for {engine.restore(symbols)} symbols from snapshot")
+    snapshots = get_snapshot_writer(engine.snapshot_meta())
+    last_snapshot = time.monotonic()
+
+    def on_tick_message(ch, method, properties, body):
+        try:
+            if properties.content_type == FRAME_CONTENT_TYPE:
+                _, symbol, timestamps, prices, _ = decode_frame(body)
+                for ts, price in zip(timestamps, prices):
+                    engine.on_tick(symbol, price, ts)
+            else:
+                tick = json.loads(body)
+                engine.on_tick(tick["symbol"], tick["price"], tick["timestamp"])
+        except Exception as e:
+            logger.error(f"Error processing tick: {e}")
+
+    def on_timer():
+        nonlocal last_snapshot
+        engine.close_idle_bars(int(time.time() * 1000))
+        if time.monotonic() - last_snapshot >= TA_SNAPSHOT_INTERVAL:
+            # Copied on the consume thread; pickling and the disk write run on the writer thread
+            snapshots.submit(engine.snapshot())
+            last_snapshot = time.monotonic()
+        connection.call_later(1, on_timer)
+
+    connection.call_later(1, on_timer)
+    channel.basic_qos(prefetch_count=1000)
+    channel.basic_consume(queue=TA_STREAM_QUEUE, on_message_callback=on_tick_message, auto_ack=True)
+    channel.start_consuming()
+
 def main():
+    if TA_MODE == "batch":
+        run_batch()
+    if TA_MODE == "stream":
+        while True:
+            try:
+                run_streaming()
+            except Exception as e:
+                logger.error(f"Streaming TA error: {e}")
+                time.sleep(10)
     logger.info("Starting TA analysis loop...")
     connection, channel = get_rabbitmq_channel()
     dl_ta_predict = load_dl_ta_model() if USE_DL_TA else None
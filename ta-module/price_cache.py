@@ -0,0 +1,95 @@
+import logging
+import time
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("TAModule")
+
+
+def _rfc3339(ns):
+    seconds, nanos = divmod(int(ns), 1_000_000_000)
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds)) + f".{nanos:09d}Z"
+
+
+class PriceCache:
+    """Per-symbol window of recent tick prices, refreshed incrementally from InfluxDB.
+
+    A symbol's first refresh bulk-loads the whole lookback window. Later
+    refreshes only query from the last cached timestamp minus ``overlap_seconds``
+    (so late-written ticks are still picked up) and replace the cached tail from
+    that point. Prices older than the lookback are evicted on every refresh.
+    Times are kept as int64 nanoseconds next to a float64 price column.
+    """
+
+    def __init__(self, query_api, bucket, lookback_seconds=3600, overlap_seconds=5):
+        self.query_api = query_api
+        self.bucket = bucket
+        self.lookback_ns = int(lookback_seconds * 1e9)
+        self.overlap_ns = int(overlap_seconds * 1e9)
+        self.times = {}
+        self.prices = {}
+
+    def refresh(self, symbols):
+        now_ns = time.time_ns()
+        cold = [s for s in symbols if s not in self.times]
+        warm = [s for s in symbols if s in self.times]
+        if cold:
+            start_ns = now_ns - self.lookback_ns
+            fetched = self._query(cold, start_ns)
+            for symbol in cold:
+                self.times[symbol], self.prices[symbol] = fetched.get(symbol, (np.empty(0, np.int64), np.empty(0)))
+            logger.info(f"Cold-loaded {sum(len(self.times[s]) for s in cold)} prices for {len(cold)} symbols")
+        if warm:
+            starts = {s: self._resume_from(s, now_ns) for s in warm}
+            fetched = self._query(warm, min(starts.values()))
+            for symbol in warm:
+                times, prices = fetched.get(symbol, (np.empty(0, np.int64), np.empty(0)))
+                start_ns = starts[symbol]
+                keep_new = times >= start_ns
+                keep_old = np.searchsorted(self.times[symbol], start_ns, side="left")
+                self.times[symbol] = np.concatenate([self.times[symbol][:keep_old], times[keep_new]])
+                self.prices[symbol] = np.concatenate([self.prices[symbol][:keep_old], prices[keep_new]])
+        self._evict(symbols, now_ns - self.lookback_ns)
+
+    def frame(self, symbol):
+        """Cached prices for ``symbol`` as a time-indexed DataFrame, like fetch_prices returned."""
+        times = self.times.get(symbol, np.empty(0, np.int64))
+        prices = self.prices.get(symbol, np.empty(0))
+        return pd.DataFrame({"price": prices}, index=pd.to_datetime(times, unit="ns", utc=True))
+
+    def _resume_from(self, symbol, now_ns):
+        times = self.times[symbol]
+        if len(times) == 0:
+            return now_ns - self.lookback_ns
+        return max(int(times[-1]) - self.overlap_ns, now_ns - self.lookback_ns)
+
+    def _evict(self, symbols, cutoff_ns):
+        for symbol in symbols:
+            cut = np.searchsorted(self.times[symbol], cutoff_ns, side="left")
+            if cut:
+                self.times[symbol] = self.times[symbol][cut:]
+                self.prices[symbol] = self.prices[symbol][cut:]
+
+    def _query(self, symbols, start_ns):
+        """Fetch prices since ``start_ns`` as columns, returning {symbol: (times, prices)}."""
+        symbol_filter = " or ".join(f'r["symbol"] == "{s}"' for s in symbols)
+        query = f'''from(bucket: "{self.bucket}")
+  |> range(start: {_rfc3339(start_ns)})
+  |> filter(fn: (r) => r["_measurement"] == "price_tick" and r["_field"] == "price")
+  |> filter(fn: (r) => {symbol_filter})
+  |> keep(columns: ["_time", "_value", "symbol"])
+'''
+        df = self.query_api.query_data_frame(query)
+        if isinstance(df, list):
+            df = pd.concat(df, ignore_index=True) if df else pd.DataFrame()
+        if df.empty:
+            return {}
+        df = df.sort_values("_time", kind="stable")
+        times = pd.DatetimeIndex(df["_time"]).as_unit("ns").asi8
+        prices = df["_value"].to_numpy(dtype=float)
+        symbol_column = df["symbol"].to_numpy()
+        result = {}
+        for symbol in pd.unique(symbol_column):
+            mask = symbol_column == symbol
+            result[symbol] = (times[mask], prices[mask])
+        return result
@@ -0,0 +1,78 @@
+import copy
+from datetime import datetime, timezone
+from indicators import IndicatorState
+
+
+class _SymbolBars:
+    __slots__ = ("bar_start", "close", "indicators")
+
+    def __init__(self, indicators):
+        self.bar_start = None
+        self.close = None
+        self.indicators = indicators
+
+
+class StreamingTA:
+    """Builds time bars from ticks and updates per-symbol indicators on each bar close.
+
+    A bar closes when a tick for a later bar arrives, or when ``close_idle_bars``
+    runs after the bar's end plus ``grace_ms`` has passed. ``emit`` is called
+    with one TA signal per closed bar.
+    """
+
+    def __init__(self, emit, bar_seconds=60, grace_ms=2000, **indicator_params):
+        self.emit = emit
+        self.bar_ms = int(bar_seconds * 1000)
+        self.grace_ms = grace_ms
+        self.indicator_params = indicator_params
+        self.symbols = {}
+
+    def on_tick(self, symbol, price, timestamp):
+        state = self.symbols.get(symbol)
+        if state is None:
+            state = self.symbols[symbol] = _SymbolBars(IndicatorState(**self.indicator_params))
+        bar_start = timestamp - timestamp % self.bar_ms
+        if state.bar_start is None:
+            state.bar_start = bar_start
+        elif bar_start > state.bar_start:
+            self._close_bar(symbol, state)
+            state.bar_start = bar_start
+        elif bar_start < state.bar_start:
+            # Late tick for a bar that is already closed
+            return
+        state.close = price
+
+    def snapshot(self):
+        """Deep copy of the per-symbol bar and indicator state, safe to serialize elsewhere."""
+        return copy.deepcopy(self.symbols)
+
+    def snapshot_meta(self):
+        """Settings a snapshot is only valid under."""
+        return {"bar_ms": self.bar_ms, "indicator_params": self.indicator_params}
+
+    def restore(self, symbols):
+        self.symbols.update(symbols)
+        return len(self.symbols)
+
+    def close_idle_bars(self, now_ms):
+        for symbol, state in self.symbols.items():
+            if state.close is not None and state.bar_start + self.bar_ms + self.grace_ms <= now_ms:
+                self._close_bar(symbol, state)
+                state.bar_start += self.bar_ms
+
+    def _close_bar(self, symbol, state):
+        if state.close is None:
+            return
+        values = state.indicators.update(state.close)
+        state.close = None
+        if values["rsi"] is None:
+            return
+        bar_end = datetime.fromtimestamp((state.bar_start + self.bar_ms) / 1000, tz=timezone.utc)
+        self.emit({
+            "symbol": symbol,
+            "indicator": "RSI",
+            "value": float(values["rsi"]),
+            "indicators": values,
+            "bar_seconds": self.bar_ms / 1000,
+            "timestamp": bar_end.replace(tzinfo=None).isoformat() + "Z"
+        })
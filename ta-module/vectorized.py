@@ -0,0 +1,158 @@
+import numpy as np
+
+# Vectorized indicators over a 2-D price matrix (symbols x time). Every
+# function returns a matrix of the same shape, NaN where the indicator is not
+# defined yet. Rolling indicators run as one pass over the whole matrix;
+# recursive ones (EMA, Wilder) loop over time with each step vectorized
+# across all symbols.
+
+
+def _window_sums(values, period):
+    """Sum of each trailing ``period`` window via one cumulative sum per row."""
+    csum = np.cumsum(values, axis=1)
+    sums = csum[:, period - 1:].copy()
+    sums[:, 1:] -= csum[:, :-period]
+    return sums
+
+
+def rolling_mean(values, period):
+    out = np.full(values.shape, np.nan)
+    if values.shape[1] >= period:
+        out[:, period - 1:] = _window_sums(values, period) / period
+    return out
+
+
+def rsi(prices, period=14):
+    """Rolling-mean RSI per row, the same as ``compute_rsi`` applied to each symbol."""
+    delta = np.diff(prices, axis=1, prepend=np.nan)
+    # compute_rsi turns the undefined first change into 0 via where()
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+    gain = rolling_mean(gains, period)
+    loss = rolling_mean(losses, period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - 100 / (1 + gain / loss)
+
+
+def ema(prices, period):
+    """``ewm(span=period, adjust=False)`` per row."""
+    alpha = 2.0 / (period + 1)
+    # Time-major copy so every step reads and writes one contiguous row
+    columns = np.ascontiguousarray(prices.T)
+    out = np.empty(columns.shape)
+    current = columns[0].copy()
+    out[0] = current
+    step = np.empty_like(current)
+    for t in range(1, columns.shape[0]):
+        np.subtract(columns[t], current, out=step)
+        step *= alpha
+        current += step
+        out[t] = current
+    return out.T
+
+
+def wilder_rsi(prices, period=14):
+    """Wilder-smoothed RSI per row, seeded with the simple average of the first ``period`` moves."""
+    # Time-major so each smoothing step works on contiguous rows
+    delta = np.diff(prices, axis=1).T
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+    out = np.full(prices.shape[::-1], np.nan)
+    if delta.shape[0] < period:
+        return out.T
+    avg_gain = gains[:period].mean(axis=0)
+    avg_loss = losses[:period].mean(axis=0)
+    keep = (period - 1) / period
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[period] = avg_gain / avg_loss
+        for t in range(period, delta.shape[0]):
+            avg_gain = avg_gain * keep + gains[t] / period
+            avg_loss = avg_loss * keep + losses[t] / period
+            np.divide(avg_gain, avg_loss, out=out[t + 1])
+        out[period:] = 100 - 100 / (1 + out[period:])
+    return out.T
+
+
+def macd(prices, fast=12, slow=26, signal=9):
+    line = ema(prices, fast) - ema(prices, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(prices, period=20, k=2.0):
+    lower = np.full(prices.shape, np.nan)
+    upper = np.full(prices.shape, np.nan)
+    middle = np.full(prices.shape, np.nan)
+    if prices.shape[1] >= period:
+        # Centre each row on its own mean so the sums of squares stay small
+        # enough that the one-pass variance does not lose precision
+        centre = np.nanmean(prices, axis=1, keepdims=True)
+        shifted = prices - centre
+        sums = _window_sums(shifted, period)
+        squares = _window_sums(shifted * shifted, period)
+        mean = sums / period
+        var = np.maximum(squares - sums * mean, 0.0) / (period - 1)
+        std = np.sqrt(var)
+        middle[:, period - 1:] = mean + centre
+        lower[:, period - 1:] = middle[:, period - 1:] - k * std
+        upper[:, period - 1:] = middle[:, period - 1:] + k * std
+    return lower, middle, upper
+
+
+def parse_indicator_spec(spec):
+    """Parse e.g. "rsi:14,rsi:7,ema:20,macd:12/26/9,bb:20/2" into (name, params) pairs."""
+    indicators = []
+    for item in spec.split(","):
+        item = item.strip().lower()
+        if not item:
+            continue
+        name, _, params = item.partition(":")
+        values = tuple(float(p) if "." in p else int(p) for p in params.split("/") if p)
+        if name not in INDICATORS:
+            raise ValueError(f"Unknown indicator {name!r}")
+        indicators.append((name, values))
+    return indicators
+
+
+def _label(name, params):
+    return "_".join([name] + [str(p) for p in params])
+
+
+def _rsi(prices, period=14):
+    return {f"rsi_{period}": rsi(prices, period)}
+
+
+def _wilder(prices, period=14):
+    return {f"wilder_rsi_{period}": wilder_rsi(prices, period)}
+
+
+def _ema(prices, period=20):
+    return {f"ema_{period}": ema(prices, period)}
+
+
+def _macd(prices, fast=12, slow=26, signal=9):
+    label = _label("macd", (fast, slow, signal))
+    line, signal_line, hist = macd(prices, fast, slow, signal)
+    return {label: line, f"{label}_signal": signal_line, f"{label}_hist": hist}
+
+
+def _bb(prices, period=20, k=2):
+    label = _label("bb", (period, k))
+    lower, middle, upper = bollinger(prices, period, k)
+    return {f"{label}_lower": lower, f"{label}_middle": middle, f"{label}_upper": upper}
+
+
+INDICATORS = {"rsi": _rsi, "wilder": _wilder, "ema": _ema, "macd": _macd, "bb": _bb}
+
+
+def compute_indicators(prices, indicators):
+    """Compute every configured indicator for all rows; returns {label: matrix}."""
+    results = {}
+    for name, params in indicators:
+        results.update(INDICATORS[name](prices, *params))
+    return results
+
+
+def latest_values(results):
+    """Reduce {label: matrix} to {label: last column}."""
+    return {label: matrix[:, -1] for label, matrix in results.items()}
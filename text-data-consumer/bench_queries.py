@@ -0,0 +1,101 @@
+"""Benchmark: raw data lake query paths with and without the bootstrap indexes.
+
+Usage: python bench_queries.py [--docs 10000000] [--db raw_data_lake_bench] [--keep]
+
+Needs a running MongoDB (MONGODB_HOST/MONGODB_PORT). Fills a scratch
+database with synthetic social posts spread over 30 days, then times and
+explains the sentiment module's queries, first on the bare collection and
+again after ``schema.bootstrap``:
+
+  - the incremental fetch: _id > watermark, sorted by _id, limit 500
+  - the last hour by published_at
+  - the last hour for one source by published_at
+  - the old full-range scan by created_utc
+"""
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from pymongo import MongoClient
+from schema import bootstrap, normalize_document
+
+SPAN_DAYS = 30
+
+
+def fill(collection, count, batch=10000):
+    rng = random.Random(19)
+    now = datetime.now(timezone.utc)
+    start = now - timedelta(days=SPAN_DAYS)
+    step = SPAN_DAYS * 86400 / count
+    inserted = 0
+    began = time.perf_counter()
+    while inserted < count:
+        docs = []
+        for i in range(inserted, min(count, inserted + batch)):
+            created = start + timedelta(seconds=i * step)
+            doc = {
+                # Time-ordered like driver-generated ids, unique via the counter bytes
+                "_id": ObjectId(int(created.timestamp()).to_bytes(4, "big") + i.to_bytes(8, "big")),
+                "source": rng.choice(["reddit", "reddit", "reddit", "newsapi"]),
+                "kind": "submission",
+                "id": f"p{i}",
+                "title": f"Post {i} about bitcoin",
+                "text": "lorem ipsum " * rng.randint(1, 20),
+                "created_utc": created.timestamp(),
+            }
+            docs.append(normalize_document(doc, now=created))
+        collection.insert_many(docs, ordered=False)
+        inserted += len(docs)
+        if inserted % (batch * 50) == 0:
+            print(f"  inserted {inserted}/{count} ({inserted / (time.perf_counter() - began):.0f} docs/s)")
+
+
+def run_queries(collection):
+    now = datetime.now(timezone.utc)
+    hour_ago = now - timedelta(hours=1)
+    watermark = ObjectId.from_datetime(now - timedelta(minutes=10))
+    queries = {
+        "incremental _id fetch": lambda: collection.find({"_id": {"$gt": watermark}}).sort("_id", 1).limit(500),
+        "last hour by published_at": lambda: collection.find({"published_at": {"$gte": hour_ago}}),
+        "last hour, one source": lambda: collection.find({"source": "newsapi", "published_at": {"$gte": hour_ago}}),
+        "last hour by created_utc": lambda: collection.find({"created_utc": {"$gte": hour_ago.timestamp()}}),
+    }
+    for name, query in queries.items():
+        began = time.perf_counter()
+        count = len(list(query()))
+        elapsed = (time.perf_counter() - began) * 1000
+        stats = query().explain().get("executionStats", {})
+        print(f"  {name:28s} {elapsed:9.1f} ms  returned={count:6d} "
+              f"keys_examined={stats.get('totalKeysExamined', '?'):>9} "
+              f"docs_examined={stats.get('totalDocsExamined', '?'):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=10_000_000)
+    parser.add_argument("--db", default="raw_data_lake_bench")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch database afterwards")
+    args = parser.parse_args()
+
+    client = MongoClient(os.environ.get("MONGODB_HOST", "localhost"), int(os.environ.get("MONGODB_PORT", 27017)))
+    client.drop_database(args.db)
+    db = client[args.db]
+    collection = db["social_posts"]
+    print(f"Inserting {args.docs} documents over {SPAN_DAYS} days...")
+    fill(collection, args.docs)
+
+    print("Without indexes (only _id):")
+    run_queries(collection)
+    began = time.perf_counter()
+    bootstrap(db)
+    print(f"Bootstrap indexes built in {time.perf_counter() - began:.1f} s")
+    print("With bootstrap indexes:")
+    run_queries(collection)
+    if not args.keep:
+        client.drop_database(args.db)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import functools
+import logging
+import queue
+import threading
+import time
+from pymongo.errors import BulkWriteError, ConnectionFailure, ExecutionTimeout, WTimeoutError
+
+logger = logging.getLogger("TextDataConsumer")
+
+DUPLICATE_KEY = 11000
+# MongoDB being unreachable or slow, as opposed to rejecting the documents
+TRANSIENT_ERRORS = (ConnectionFailure, ExecutionTimeout, WTimeoutError)
+
+
+def _is_transient(error):
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+    if isinstance(error, BulkWriteError):
+        # Only duplicates and write concern errors: nothing was rejected
+        errors = error.details.get("writeErrors", [])
+        return all(err.get("code") == DUPLICATE_KEY for err in errors)
+    return False
+
+
+class BulkInserter:
+    """Buffers documents for one collection and inserts them with unordered
+    ``insert_many`` calls from a writer thread.
+
+    A batch is flushed when it reaches ``batch_size`` documents or every
+    ``flush_interval`` seconds. Duplicate-key errors count as success: the
+    document is already stored, so a redelivered message or a retried batch is
+    idempotent under the collection's unique index. Once a batch is stored,
+    every delivery up to its last tag is acked with ``multiple=True``.
+    Connection and timeout errors are retried for as long as it takes, with
+    backoff capped at 30 s, so an outage only holds deliveries unacked. A
+    batch MongoDB rejects for any other reason is nacked the same way after
+    ``max_retries`` attempts and dropped; on ``stop`` unwritten batches are
+    requeued.
+    The channel must only carry this collection's queue, since multiple-acks
+    cover every earlier delivery tag on the channel.
+    """
+
+    def __init__(self, collection, connection, channel, batch_size=1000, flush_interval=1.0,
+                 max_retries=5, stats_interval=30):
+        self.collection = collection
+        self.connection = connection
+        self.channel = channel
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.stats_interval = stats_interval
+        self.stats = {
+            "batches": 0,
+            "inserted": 0,
+            "duplicates": 0,
+            "retries": 0,
+            "failed_batches": 0,
+            "dropped": 0,
+            "write_latency_ms_total": 0.0,
+            "write_latency_ms_max": 0.0,
+        }
+        self._buffer = []
+        self._last_tag = None
+        self._batches = queue.Queue()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._last_stats = time.monotonic()
+
+    def start(self):
+        self._thread.start()
+        self.connection.call_later(self.flush_interval, self._on_timer)
+
+    def stop(self):
+        self._stopped.set()
+        self._batches.put(None)
+
+    def add(self, doc, delivery_tag):
+        """Buffer one decoded delivery (``doc`` may be None). Call from the connection thread."""
+        if doc is not None:
+            self._buffer.append(doc)
+        self._last_tag = delivery_tag
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self._last_tag is None:
+            return
+        self._batches.put((self._buffer, self._last_tag))
+        self._buffer = []
+        self._last_tag = None
+
+    def _on_timer(self):
+        if self._stopped.is_set():
+            return
+        self.flush()
+        now = time.monotonic()
+        if now - self._last_stats >= self.stats_interval:
+            self._last_stats = now
+            self._log_stats()
+        self.connection.call_later(self.flush_interval, self._on_timer)
+
+    def _log_stats(self):
+        batches = self.stats["batches"]
+        avg_latency = self.stats["write_latency_ms_total"] / batches if batches else 0.0
+        logger.info(f"Bulk inserter {self.collection.name}: pending_batches={self._batches.qsize()} "
+                    f"avg_write_ms={avg_latency:.1f} {self.stats}")
+
+    def _run(self):
+        while not self._stopped.is_set():
+            item = self._batches.get()
+            if item is None:
+                break
+            docs, last_tag = item
+            outcome = self._insert_with_retry(docs)
+            callback = functools.partial(self._settle, last_tag, outcome, len(docs))
+            try:
+                self.connection.add_callback_threadsafe(callback)
+            except Exception as e:
+                logger.error(f"Could not schedule ack for delivery {last_tag}: {e}")
+
+    def _insert(self, docs):
+        """Insert ``docs``; returns (inserted, duplicates) or raises on any other error."""
+        try:
+            result = self.collection.insert_many(docs, ordered=False)
+            return len(result.inserted_ids), 0
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            duplicates = sum(1 for err in errors if err.get("code") == DUPLICATE_KEY)
+            if duplicates < len(errors) or e.details.get("writeConcernErrors"):
+                raise
+            return e.details.get("nInserted", 0), duplicates
+
+    def _insert_with_retry(self, docs):
+        """Returns "written", "rejected" (after ``max_retries`` non-transient
+        failures) or "stopped"."""
+        attempt = rejected = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                inserted, duplicates = self._insert(docs) if docs else (0, 0)
+            except Exception as e:
+                # Documents that did go in come back as duplicates on the retry
+                self.stats["retries"] += 1
+                transient = _is_transient(e)
+                if not transient:
+                    rejected += 1
+                logger.error(f"MongoDB bulk insert into {self.collection.name} failed "
+                             f"(attempt {attempt+1}, {len(docs)} docs, "
+                             f"{'transient' if transient else 'rejected'}): {e}")
+                if rejected >= self.max_retries:
+                    self.stats["failed_batches"] += 1
+                    return "rejected"
+                if self._stopped.wait(min(2 ** attempt, 30)):
+                    return "stopped"
+                attempt += 1
+                continue
+            latency_ms = (time.perf_counter() - start) * 1000
+            self.stats["batches"] += 1
+            self.stats["inserted"] += inserted
+            self.stats["duplicates"] += duplicates
+            self.stats["write_latency_ms_total"] += latency_ms
+            self.stats["write_latency_ms_max"] = max(self.stats["write_latency_ms_max"], latency_ms)
+            return "written"
+
+    def _settle(self, last_tag, outcome, count):
+        if outcome == "written":
+            self.channel.basic_ack(delivery_tag=last_tag, multiple=True)
+        elif outcome == "stopped":
+            self.channel.basic_nack(delivery_tag=last_tag, multiple=True, requeue=True)
+        else:
+            self.stats["dropped"] += count
+            logger.error(f"Dropping {count} documents in the batch ending at delivery {last_tag} "
+                         f"after {self.max_retries} rejected inserts")
+            self.channel.basic_nack(delivery_tag=last_tag, multiple=True, requeue=False)
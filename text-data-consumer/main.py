@@ -3,7 +3,10 @@ import json
 import os
 import logging
 from pymongo import MongoClient
+from pymongo.errors import DuplicateKeyError
 import time
+from bulk_writer import BulkInserter
+from schema import bootstrap, normalize_document
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger("TextDataConsumer")
@@ -11,19 +14,29 @@ logger = logging.getLogger("TextDataConsumer")
 RABBITMQ_HOST = os.environ.get("RABBITMQ_HOST", "rabbitmq")
 SOCIAL_QUEUE = os.environ.get("SOCIAL_DATA_QUEUE", "raw_social_data")
 NEWS_QUEUE = os.environ.get("NEWS_DATA_QUEUE", "raw_news_data")
+SOCIAL_EXCHANGE = os.environ.get("SOCIAL_DATA_EXCHANGE", "social_data")
+NEWS_EXCHANGE = os.environ.get("NEWS_DATA_EXCHANGE", "news_data")
+MONGO_BULK_MODE = os.environ.get("MONGO_BULK_MODE", "false").lower() == "true"
+MONGO_BATCH_SIZE = int(os.environ.get("MONGO_BATCH_SIZE", 1000))
+MONGO_FLUSH_INTERVAL = float(os.environ.get("MONGO_FLUSH_INTERVAL", 1.0))
+MONGO_PREFETCH = int(os.environ.get("MONGO_PREFETCH", 5000))
+MONGO_WRITE_RETRIES = int(os.environ.get("MONGO_WRITE_RETRIES", 5))
+MONGO_STATS_INTERVAL = int(os.environ.get("MONGO_STATS_INTERVAL", 30))
 MONGODB_HOST = os.environ.get("MONGODB_HOST", "mongodb")
 MONGODB_PORT = int(os.environ.get("MONGODB_PORT", 27017))
 MONGODB_DB = os.environ.get("MONGODB_DB", "raw_data_lake")
+MONGO_TIME_SERIES = os.environ.get("MONGO_TIME_SERIES", "false").lower() == "true"
+MONGO_RETENTION_DAYS = float(os.environ.get("MONGO_RETENTION_DAYS", 0))
 
 # MongoDB setup
-def get_mongo_collection(collection_name):
+def get_mongo_db():
     for attempt in range(5):
         try:
             client = MongoClient(MONGODB_HOST, MONGODB_PORT, serverSelectionTimeoutMS=5000)
             db = client[MONGODB_DB]
             # Test connection
             db.command("ping")
-            return db[collection_name]
+            return db
         except Exception as e:
             logger.error(f"MongoDB connection failed (attempt {attempt+1}): {e}")
             time.sleep(2 ** attempt)
@@ -34,8 +47,10 @@ def get_rabbitmq_channel():
         try:
             connection = pika.BlockingConnection(pika.ConnectionParameters(host=RABBITMQ_HOST))
             channel = connection.channel()
-            channel.queue_declare(queue=SOCIAL_QUEUE, durable=True)
-            channel.queue_declare(queue=NEWS_QUEUE, durable=True)
+            for exchange, queue in ((SOCIAL_EXCHANGE, SOCIAL_QUEUE), (NEWS_EXCHANGE, NEWS_QUEUE)):
+                channel.exchange_declare(exchange=exchange, exchange_type='fanout', durable=True)
+                channel.queue_declare(queue=queue, durable=True)
+                channel.queue_bind(queue=queue, exchange=exchange)
             return connection, channel
         except Exception as e:
             logger.error(f"RabbitMQ connection failed (attempt {attempt+1}): {e}")
@@ -45,28 +60,68 @@ def get_rabbitmq_channel():
 def make_callback(collection):
     def callback(ch, method, properties, body):
         try:
-            doc = json.loads(body)
-            collection.insert_one(doc)
-            logger.info(f"Inserted into {collection.name}: {doc}")
+            doc = normalize_document(json.loads(body))
+            try:
+                collection.insert_one(doc)
+                logger.debug(f"Inserted into {collection.name}: {doc}")
+            except DuplicateKeyError:
+                logger.debug(f"Already stored in {collection.name}: {doc.get('id') or doc.get('url')}")
             ch.basic_ack(delivery_tag=method.delivery_tag)
         except Exception as e:
             logger.error(f"Error processing message: {e}")
             ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
     return callback
 
+def make_bulk_callback(inserter):
+    def callback(ch, method, properties, body):
+        try:
+            doc = normalize_document(json.loads(body))
+        except Exception as e:
+            # Acked with the rest of the batch, like a nack without requeue
+            logger.error(f"Skipping undecodable message: {e}")
+            doc = None
+        inserter.add(doc, method.delivery_tag)
+    return callback
+
 def main():
     logger.info("Connecting to RabbitMQ and MongoDB...")
-    social_collection = get_mongo_collection("social_posts")
-    news_collection = get_mongo_collection("news_articles")
+    db = get_mongo_db()
+    bootstrap(db, time_series=MONGO_TIME_SERIES, retention_days=MONGO_RETENTION_DAYS)
+    social_collection = db["social_posts"]
+    news_collection = db["news_articles"]
     connection, channel = get_rabbitmq_channel()
-    channel.basic_qos(prefetch_count=1)
-    channel.basic_consume(queue=SOCIAL_QUEUE, on_message_callback=make_callback(social_collection))
-    channel.basic_consume(queue=NEWS_QUEUE, on_message_callback=make_callback(news_collection))
+    inserters = []
+    if MONGO_BULK_MODE:
+        logger.info(f"Bulk mode: up to {MONGO_BATCH_SIZE} documents or {MONGO_FLUSH_INTERVAL}s per insert")
+        # One channel per queue so a multiple-ack never covers the other collection's deliveries
+        for queue, collection in ((SOCIAL_QUEUE, social_collection), (NEWS_QUEUE, news_collection)):
+            queue_channel = connection.channel()
+            inserter = BulkInserter(
+                collection,
+                connection,
+                queue_channel,
+                batch_size=MONGO_BATCH_SIZE,
+                flush_interval=MONGO_FLUSH_INTERVAL,
+                max_retries=MONGO_WRITE_RETRIES,
+                stats_interval=MONGO_STATS_INTERVAL
+            )
+            inserter.start()
+            inserters.append(inserter)
+            queue_channel.basic_qos(prefetch_count=MONGO_PREFETCH)
+            queue_channel.basic_consume(queue=queue, on_message_callback=make_bulk_callback(inserter))
+    else:
+        channel.basic_qos(prefetch_count=1)
+        channel.basic_consume(queue=SOCIAL_QUEUE, on_message_callback=make_callback(social_collection))
+        channel.basic_consume(queue=NEWS_QUEUE, on_message_callback=make_callback(news_collection))
     logger.info("Waiting for messages...")
     try:
-        channel.start_consuming()
+        # Drives the connection, and with it the consumers on every channel
+        while True:
+            connection.process_data_events(time_limit=None)
     except Exception as e:
         logger.error(f"Consumer error: {e}")
+        for inserter in inserters:
+            inserter.stop()
         time.sleep(10)
         main()
 
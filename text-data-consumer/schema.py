@@ -0,0 +1,117 @@
+"""Raw data lake schema: timestamp normalization, indexes and retention.
+
+Run directly (python schema.py) to bootstrap the collections without starting
+the consumer; the consumer also runs ``bootstrap`` on start-up.
+"""
+import logging
+import os
+from datetime import datetime, timezone
+from pymongo import ASCENDING, DESCENDING, MongoClient
+from pymongo.errors import CollectionInvalid
+
+logger = logging.getLogger("TextDataConsumer")
+
+COLLECTIONS = ("social_posts", "news_articles")
+
+# Unique source ids make redelivered or re-published documents idempotent
+UNIQUE_KEYS = {
+    "social_posts": [("source", ASCENDING), ("kind", ASCENDING), ("id", ASCENDING)],
+    "news_articles": [("url", ASCENDING)],
+}
+
+
+def _parse_time(value):
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz=timezone.utc)
+    if isinstance(value, str) and value:
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    return None
+
+
+def normalize_document(doc, now=None):
+    """Add the shared time fields: ``published_at`` from the source's own
+    timestamp (Reddit ``created_utc``, NewsAPI ``publishedAt``) and
+    ``ingested_at``, both as UTC datetimes. Returns ``doc``."""
+    now = now or datetime.now(timezone.utc)
+    published_at = _parse_time(doc.get("created_utc")) or _parse_time(doc.get("publishedAt"))
+    doc["published_at"] = published_at or now
+    doc["ingested_at"] = now
+    return doc
+
+
+def _create_index(collection, keys, **kwargs):
+    try:
+        collection.create_index(keys, **kwargs)
+    except Exception as e:
+        # Usually duplicates stored before a unique index existed, or an
+        # index of the same name created with other options
+        logger.warning(f"Could not create index {kwargs.get('name')} on {collection.name}: {e}")
+
+
+def bootstrap(db, time_series=False, retention_days=0):
+    """Create the raw text collections and their indexes; safe to run repeatedly.
+
+    With ``time_series`` a collection that does not exist yet is created as a
+    MongoDB time-series collection on ``published_at`` with ``source`` as the
+    meta field. Those cannot carry unique indexes, so duplicates are then only
+    filtered by the collectors. ``retention_days`` expires documents after
+    that many days: through ``expireAfterSeconds`` on time-series collections,
+    otherwise through a TTL index on ``ingested_at``.
+    """
+    existing = set(db.list_collection_names())
+    retention_seconds = int(retention_days * 86400)
+    for name in COLLECTIONS:
+        collection = db[name]
+        is_time_series = False
+        if name in existing:
+            info = next(db.list_collections(filter={"name": name}), {})
+            is_time_series = info.get("type") == "timeseries"
+        elif time_series:
+            options = {"timeseries": {"timeField": "published_at", "metaField": "source", "granularity": "minutes"}}
+            if retention_seconds:
+                options["expireAfterSeconds"] = retention_seconds
+            try:
+                db.create_collection(name, **options)
+                is_time_series = True
+                logger.info(f"Created time-series collection {name}")
+            except CollectionInvalid:
+                pass
+        if is_time_series:
+            if retention_seconds:
+                db.command("collMod", name, expireAfterSeconds=retention_seconds)
+            # The sentiment module's _id watermark needs its own index here
+            _create_index(collection, [("_id", ASCENDING)], name="id_watermark")
+        else:
+            keys = UNIQUE_KEYS[name]
+            _create_index(collection, keys, name="unique_source_id", unique=True,
+                          # Documents without the id field are left out of the index
+                          partialFilterExpression={keys[-1][0]: {"$exists": True}})
+            _create_index(collection, [("published_at", DESCENDING)], name="published_at")
+            if retention_seconds:
+                _create_index(collection, [("ingested_at", ASCENDING)], name="ingested_at_ttl",
+                              expireAfterSeconds=retention_seconds)
+        _create_index(collection, [("source", ASCENDING), ("published_at", DESCENDING)],
+                      name="source_published_at")
+    logger.info(f"Bootstrapped {', '.join(COLLECTIONS)} (time_series={time_series}, "
+                f"retention_days={retention_days or 'off'})")
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    client = MongoClient(os.environ.get("MONGODB_HOST", "mongodb"), int(os.environ.get("MONGODB_PORT", 27017)),
+                         serverSelectionTimeoutMS=5000)
+    bootstrap(
+        client[os.environ.get("MONGODB_DB", "raw_data_lake")],
+        time_series=os.environ.get("MONGO_TIME_SERIES", "false").lower() == "true",
+        retention_days=float(os.environ.get("MONGO_RETENTION_DAYS", 0))
+    )
+
+
+if __name__ == "__main__":
+    main()